@@ -70,8 +70,8 @@ def client(
     app.dependency_overrides[get_snapshot_builder] = lambda: mock_snapshot_builder
     app.dependency_overrides[get_game_store] = lambda: mock_game_store
 
-    with TestClient(app) as c:
-        yield c
+    # Not entered, so that the lifespan of the app does not create the database nor start archiving
+    yield TestClient(app)
 
     app.dependency_overrides = {}
 
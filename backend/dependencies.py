@@ -1,13 +1,64 @@
-from backend.events.bus import EventBus
+from datetime import timedelta
+
+from backend.events.bus import EventBus, DEFAULT_MAX_QUEUE_SIZE
+from backend.events.queue import OverflowPolicy
+from backend.infra.event_store import EventStore, RetentionPolicy
+from backend.infra.file_event_store import FileEventStore, FsyncPolicy
 from backend.infra.memory_event_store import MemoryEventStore
 from backend.infra.memory_game_store import MemoryGameStore
-from backend.infra.snapshots import SnapshotBuilderBase
+from backend.infra.snapshots import SnapshotBuilderBase, DEFAULT_MAX_CHECKPOINTS
+from backend.infra.sqlite_event_store import SqliteEventStore
 from backend.state.connection_manager import ConnectionManager
+from backend.utils.env import get_env
+
+
+def create_retention_policy() -> RetentionPolicy | None:
+    max_events = get_env("ROOM_RETENTION_MAX_EVENTS", default="")
+    max_bytes = get_env("ROOM_RETENTION_MAX_BYTES", default="")
+    max_age = get_env("ROOM_RETENTION_MAX_AGE_S", default="")
+    max_chat_messages = get_env("SNAPSHOT_MAX_CHAT_MESSAGES", default="")
+    if not (max_events or max_bytes or max_age or max_chat_messages):
+        return None
+    return RetentionPolicy(
+        max_events=int(max_events) if max_events else None,
+        max_bytes=int(max_bytes) if max_bytes else None,
+        max_age=timedelta(seconds=int(max_age)) if max_age else None,
+        max_chat_messages=int(max_chat_messages) if max_chat_messages else None,
+    )
+
+
+def create_event_store(retention: RetentionPolicy | None = None) -> EventStore:
+    kind = get_env("EVENT_STORE", default="memory")
+    if kind == "memory":
+        return MemoryEventStore(
+            archive_dir=get_env("EVENT_STORE_ARCHIVE_PATH", default="data/archive"),
+            retention=retention,
+        )
+    if kind == "file":
+        return FileEventStore(
+            root=get_env("EVENT_STORE_PATH", default="data/events"),
+            fsync_policy=FsyncPolicy(get_env("EVENT_STORE_FSYNC", default=FsyncPolicy.INTERVAL.value)),
+            fsync_interval_ms=int(get_env("EVENT_STORE_FSYNC_INTERVAL_MS", default="50")),
+        )
+    if kind == "sqlite":
+        return SqliteEventStore(
+            path=get_env("EVENT_STORE_PATH", default="data/events.db"),
+        )
+    raise ValueError(f"Unsupported event store: {kind}")
+
 
 _connections = ConnectionManager()
-_store = MemoryEventStore()
-_snapshot_builder = SnapshotBuilderBase()
-_event_bus = EventBus()
+_retention = create_retention_policy()
+_store = create_event_store(_retention)
+_snapshot_builder = SnapshotBuilderBase(
+    max_chat_messages=_retention.max_chat_messages if _retention is not None else None,
+    checkpoint_interval=int(get_env("SNAPSHOT_CHECKPOINT_INTERVAL", default="1000")) or None,
+    max_checkpoints=int(get_env("SNAPSHOT_MAX_CHECKPOINTS", default=str(DEFAULT_MAX_CHECKPOINTS))),
+)
+_event_bus = EventBus(
+    max_queue_size=int(get_env("SUBSCRIBER_QUEUE_SIZE", default=str(DEFAULT_MAX_QUEUE_SIZE))),
+    overflow_policy=OverflowPolicy(get_env("SUBSCRIBER_OVERFLOW_POLICY", default=OverflowPolicy.DISCONNECT.value)),
+)
 _game_store = MemoryGameStore()
 
 
@@ -15,7 +66,7 @@ def get_connection_manager() -> ConnectionManager:
     return _connections
 
 
-def get_event_store() -> MemoryEventStore:
+def get_event_store() -> EventStore:
     return _store
 
 
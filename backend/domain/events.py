@@ -1,4 +1,5 @@
 import enum
+from dataclasses import dataclass
 from datetime import datetime, timezone
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -30,3 +31,12 @@ class BaseEvent(BaseModel):
     actor_id: str | None = None
     data: dict = Field(default_factory=lambda: {})
     target_id: str | None = None
+
+
+@dataclass(frozen=True)
+class EventDraft:
+    """An event which has not been appended yet, its seq is assigned by the event store."""
+    type: RoomEvent | GameEvent | str
+    data: dict | None = None
+    actor_id: str | None = None
+    target_id: str | None = None
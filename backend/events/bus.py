@@ -1,37 +1,68 @@
-import asyncio
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
 from backend.domain.events import BaseEvent
+from backend.events.queue import SubscriberQueue, OverflowPolicy, QueueStats, LATEST_WINS_EVENT_TYPES
 from backend.events.subscribers import QueueSubscribers
 
+DEFAULT_MAX_QUEUE_SIZE = 1000
+
 
 class EventBus:
-    _subscribers: QueueSubscribers[BaseEvent]
-    _lock: asyncio.Lock
+    """Fans events out to the queues of their subscribers, nothing here awaits so no lock is needed."""
+    _subscribers: QueueSubscribers[SubscriberQueue]
 
-    def __init__(self):
-        self._subscribers = QueueSubscribers[BaseEvent]()
-        self._lock = asyncio.Lock()
+    def __init__(
+            self,
+            max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+            overflow_policy: OverflowPolicy = OverflowPolicy.DISCONNECT,
+            latest_wins: frozenset[str] = LATEST_WINS_EVENT_TYPES,
+    ):
+        self._subscribers = QueueSubscribers[SubscriberQueue]()
+        self._max_queue_size = max_queue_size
+        self._overflow_policy = overflow_policy
+        self._latest_wins = latest_wins
+        self.stats = QueueStats()
 
     async def publish(self, event: BaseEvent) -> None:
-        async with self._lock:
-            if event.target_id:
-                q = self._subscribers.get_by_user_id(event.target_id)
-                if q is None:
-                    raise ValueError
+        self.deliver(event)
+
+    def deliver(self, event: BaseEvent) -> None:
+        if event.target_id:
+            for q in self._subscribers.get_by_user_id(event.target_id):
+                q.put_nowait(event)
+        else:
+            for q in self._subscribers.get_by_room_id(event.room_id):
                 q.put_nowait(event)
+
+    async def publish_batch(self, events: list[BaseEvent]) -> None:
+        self.deliver_batch(events)
+
+    def deliver_batch(self, events: list[BaseEvent]) -> None:
+        """Delivers events of a single room as one queue item per subscriber."""
+        if not events:
+            return
+        room_queues = self._subscribers.get_by_room_id(events[0].room_id)
+        batches: dict[SubscriberQueue, list[BaseEvent]] = {q: [] for q in room_queues}
+        for event in events:
+            if event.target_id:
+                for q in self._subscribers.get_by_user_id(event.target_id):
+                    batches.setdefault(q, []).append(event)
             else:
-                for q in list(self._subscribers.get_by_room_id(event.room_id)):
-                    q.put_nowait(event)
+                for q in room_queues:
+                    batches[q].append(event)
+
+        for q, batch in batches.items():
+            if len(batch) == 1:
+                q.put_nowait(batch[0])
+            elif batch:
+                q.put_nowait(batch)
 
     @asynccontextmanager
-    async def subscribe(self, room_id: int, user_id: str) -> AsyncIterator[asyncio.Queue[BaseEvent]]:
-        q: asyncio.Queue[BaseEvent] = asyncio.Queue()
-        async with self._lock:
-            self._subscribers.add(room_id, user_id, q)
+    async def subscribe(self, room_id: int, user_id: str) -> AsyncIterator[SubscriberQueue]:
+        q = SubscriberQueue(self._max_queue_size, self._overflow_policy, self.stats, self._latest_wins)
+        self._subscribers.add(room_id, user_id, q)
         try:
             yield q
         finally:
-            async with self._lock:
-                self._subscribers.remove(room_id, user_id, q)
+            self._subscribers.remove(room_id, user_id, q)
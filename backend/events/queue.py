@@ -0,0 +1,128 @@
+import asyncio
+import enum
+from collections import deque
+from dataclasses import dataclass
+from logging import getLogger
+
+from backend.domain.events import BaseEvent, GameEvent
+
+logger = getLogger(__name__)
+
+# Events delivered together (see `EventBus.deliver_batch`) are put on the queues as a single list
+QueueItem = BaseEvent | list[BaseEvent]
+
+
+class OverflowPolicy(str, enum.Enum):
+    # The subscriber is evicted, its stream is closed with the seq it can resume from
+    DISCONNECT = "disconnect"
+    # The oldest queued item is dropped to make room for the new one
+    DROP_OLDEST = "drop_oldest"
+
+
+# Events of these types only matter until a newer one of the same type is queued
+LATEST_WINS_EVENT_TYPES = frozenset({GameEvent.GAME_STATE_UPDATE})
+
+
+@dataclass
+class QueueStats:
+    dropped: int = 0
+    coalesced: int = 0
+    evicted: int = 0
+
+
+class SubscriberQueue:
+    """Bounded queue whose `put_nowait` never blocks the publisher, the overflow policy decides what to give up."""
+
+    # Last item handed out by an evicted queue, which ignores every new item
+    EVICTED = object()
+
+    def __init__(
+            self,
+            max_size: int,
+            policy: OverflowPolicy,
+            stats: QueueStats,
+            latest_wins: frozenset[str] = LATEST_WINS_EVENT_TYPES,
+    ) -> None:
+        self.max_size = max_size
+        self.policy = policy
+        self.stats = stats
+        self.latest_wins = latest_wins
+        self.evicted = False
+        self._items: deque[QueueItem] = deque()
+        # Set whenever an item is put, a consumer clears it before waiting on an empty queue
+        self._put_event = asyncio.Event()
+        # Queued latest-wins events by type, along with the item holding them
+        self._latest: dict[str, tuple[QueueItem, BaseEvent]] = {}
+
+    def put_nowait(self, item: QueueItem) -> None:
+        if self.evicted:
+            return
+        if self.latest_wins:
+            self._supersede(item)
+        if self.qsize() >= self.max_size:
+            if self.policy == OverflowPolicy.DROP_OLDEST:
+                self._forget(self._items.popleft())
+                self.stats.dropped += 1
+            else:
+                self._evict()
+                return
+        self._push(item)
+
+    def get_nowait(self) -> QueueItem:
+        if not self._items:
+            raise asyncio.QueueEmpty
+        item = self._items.popleft()
+        if self._latest:
+            self._forget(item)
+        return item
+
+    async def get(self) -> QueueItem:
+        # Items may be removed without being handed out, so the queue is checked again on each wakeup
+        while not self._items:
+            self._put_event.clear()
+            await self._put_event.wait()
+        return self.get_nowait()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def _push(self, item: QueueItem | object) -> None:
+        self._items.append(item)  # type: ignore[arg-type]
+        self._put_event.set()
+
+    def _supersede(self, item: QueueItem) -> None:
+        for event in item if isinstance(item, list) else [item]:
+            if event.type not in self.latest_wins:
+                continue
+            queued = self._latest.get(event.type)
+            self._latest[event.type] = (item, event)
+            if queued is None:
+                continue
+            holder, superseded = queued
+            if holder is item:
+                # Both events were delivered together, the batch is left as is
+                continue
+            self.stats.coalesced += 1
+            if isinstance(holder, list):
+                holder[:] = [e for e in holder if e is not superseded]
+                if holder:
+                    continue
+            # Queued items are compared by identity, events are shared by the queues of a room
+            index = next(i for i, queued_item in enumerate(self._items) if queued_item is holder)
+            del self._items[index]
+
+    def _forget(self, item: QueueItem) -> None:
+        for event_type, (holder, _) in list(self._latest.items()):
+            if holder is item:
+                del self._latest[event_type]
+
+    def _evict(self) -> None:
+        logger.warning(f"Evicting a slow subscriber with {self.qsize()} queued items")
+        self.evicted = True
+        self.stats.evicted += 1
+        self._items.clear()
+        self._latest.clear()
+        self._push(self.EVICTED)
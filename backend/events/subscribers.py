@@ -1,30 +1,38 @@
-import asyncio
+from collections.abc import Hashable
 from typing import Generic, TypeVar
 
-T = TypeVar("T")
+Q = TypeVar("Q", bound=Hashable)
 
 
-class QueueSubscribers(Generic[T]):
-    _subscribers_by_room_id: dict[int, set[asyncio.Queue[T]]]
-    _subscribers_by_user_id: dict[str, asyncio.Queue[T]]
+class QueueSubscribers(Generic[Q]):
+    """Subscriber queues by room and by user, kept in immutable sets so publishers iterate them without a lock."""
+    _subscribers_by_room_id: dict[int, frozenset[Q]]
+    _subscribers_by_user_id: dict[str, frozenset[Q]]
 
     def __init__(self):
         self._subscribers_by_user_id = {}
         self._subscribers_by_room_id = {}
 
-    def add(self, room_id: int, user_id: str, q: asyncio.Queue[T]):
-        self._subscribers_by_room_id.setdefault(room_id, set()).add(q)
-        self._subscribers_by_user_id[user_id] = q
+    def add(self, room_id: int, user_id: str, q: Q):
+        self._subscribers_by_room_id[room_id] = self.get_by_room_id(room_id) | {q}
+        self._subscribers_by_user_id[user_id] = self.get_by_user_id(user_id) | {q}
 
-    def get_by_room_id(self, room_id: int) -> set[asyncio.Queue[T]]:
-        return self._subscribers_by_room_id.get(room_id, set())
+    def get_by_room_id(self, room_id: int) -> frozenset[Q]:
+        return self._subscribers_by_room_id.get(room_id, frozenset())
 
-    def get_by_user_id(self, user_id: str) -> asyncio.Queue[T] | None:
-        return self._subscribers_by_user_id.get(user_id)
+    def get_by_user_id(self, user_id: str) -> frozenset[Q]:
+        return self._subscribers_by_user_id.get(user_id, frozenset())
 
-    def remove(self, room_id: int, user_id: str, queue: asyncio.Queue[T]) -> None:
-        self._subscribers_by_room_id[room_id].discard(queue)
-        if not self._subscribers_by_room_id[room_id]:
+    def remove(self, room_id: int, user_id: str, queue: Q) -> None:
+        queues = self.get_by_room_id(room_id) - {queue}
+        if queues:
+            self._subscribers_by_room_id[room_id] = queues
+        else:
             self._subscribers_by_room_id.pop(room_id, None)
 
-        self._subscribers_by_user_id.pop(user_id, None)
+        # Only this connection goes away, the other connections of the user keep receiving its events
+        queues = self.get_by_user_id(user_id) - {queue}
+        if queues:
+            self._subscribers_by_user_id[user_id] = queues
+        else:
+            self._subscribers_by_user_id.pop(user_id, None)
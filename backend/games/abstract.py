@@ -5,9 +5,9 @@ from typing import Literal, TypeVar, Generic
 
 from pydantic import BaseModel
 
-from backend.domain.events import BaseEvent, GameEvent
+from backend.domain.events import BaseEvent, GameEvent, EventDraft
 from backend.events.bus import EventBus
-from backend.infra.memory_event_store import MemoryEventStore
+from backend.infra.event_store import EventStore
 from backend.models.game_room_model import GameRoomModel
 
 
@@ -80,7 +80,7 @@ TGameState = TypeVar('TGameState', bound=GameState)
 
 
 class Game(abc.ABC, Generic[TGameState]):
-    event_store: MemoryEventStore
+    event_store: EventStore
     event_bus: EventBus
     game_room: GameRoomModel
     _player_count: int = 0
@@ -91,7 +91,7 @@ class Game(abc.ABC, Generic[TGameState]):
     def __init__(
             self,
             game_room: GameRoomModel,
-            event_store: MemoryEventStore,
+            event_store: EventStore,
             event_bus: EventBus
     ) -> None:
         self.game_room = game_room
@@ -116,14 +116,22 @@ class Game(abc.ABC, Generic[TGameState]):
     ) -> None:
         ...
 
-    async def broadcast_game_state_update(self, *, actor_id: str | None) -> None:
-        event = await self.event_store.append(
-            room_id=self.game_room.id,
-            event_type=GameEvent.GAME_STATE_UPDATE,
+    def game_state_update(self, *, actor_id: str | None) -> EventDraft:
+        return EventDraft(
+            type=GameEvent.GAME_STATE_UPDATE,
             actor_id=actor_id,
             data=self.state.model_dump(mode="json"),
         )
-        await self.event_bus.publish(event=event)
+
+    async def broadcast_game_state_update(self, *, actor_id: str | None) -> None:
+        update = self.game_state_update(actor_id=actor_id)
+        await self.event_store.commit(
+            room_id=self.game_room.id,
+            event_type=update.type,
+            actor_id=update.actor_id,
+            data=update.data,
+            event_bus=self.event_bus,
+        )
 
     @property
     def current_players(self) -> list[GamePlayer]:
@@ -1,12 +1,11 @@
-import asyncio
 from random import randint
 
-from backend.domain.events import BaseEvent, GameEvent
+from backend.domain.events import BaseEvent, GameEvent, EventDraft
 from backend.events.bus import EventBus
 from backend.games.abstract import Game, Metadata, PlayerSpec, GameException, GameExceptionType, GameStatus
 from backend.games.connect_four.consts import ROWS, COLUMNS, EMPTY, P_2, P_1
 from backend.games.connect_four.schemas import ConnectFourState, ConnectFourActionData, ConnectFourPlayerData
-from backend.infra.memory_event_store import MemoryEventStore
+from backend.infra.event_store import EventStore
 from backend.models.game_room_model import GameRoomModel
 
 
@@ -30,7 +29,7 @@ class ConnectFour(Game[ConnectFourState]):
     def __init__(
             self,
             game_room: GameRoomModel,
-            event_store: MemoryEventStore,
+            event_store: EventStore,
             event_bus: EventBus,
     ) -> None:
         super().__init__(game_room, event_store, event_bus)
@@ -72,34 +71,26 @@ class ConnectFour(Game[ConnectFourState]):
             )
         self.state.status = GameStatus.ongoing
         self.state.current_player = randint(P_1, P_2)
-        await self.broadcast_game_state_update(actor_id=event.actor_id)
-        await self.send_game_started_events(actor_id=event.actor_id)
+        await self.event_store.commit_many(
+            room_id=self.game_room.id,
+            events=[
+                self.game_state_update(actor_id=event.actor_id),
+                *self.game_started_events(actor_id=event.actor_id),
+            ],
+            event_bus=self.event_bus,
+        )
 
-    async def send_game_started_events(self, actor_id: str) -> None:
-        await asyncio.gather(*[
-            self._send_game_started_event(
+    def game_started_events(self, actor_id: str | None) -> list[EventDraft]:
+        return [
+            EventDraft(
+                type=GameEvent.GAME_INIT,
                 actor_id=actor_id,
                 target_id=player.user_id,
-            ) for player in self.current_players
-        ])
-
-    async def _send_game_started_event(
-            self,
-            actor_id: str,
-            target_id: str
-    ) -> None:
-        event = await self.event_store.append(
-            room_id=self.game_room.id,
-            event_type=GameEvent.GAME_INIT,
-            actor_id=actor_id,
-            target_id=target_id,
-            data=ConnectFourPlayerData(
-                player=next(
-                    (index + 1) for index, player in enumerate(self.current_players) if player.user_id == target_id
-                ),
-            ).model_dump()
-        )
-        await self.event_bus.publish(event=event)
+                data=ConnectFourPlayerData(
+                    player=index + 1,
+                ).model_dump(),
+            ) for index, player in enumerate(self.current_players)
+        ]
 
     @staticmethod
     def _check_winner(grid: list[list[int]], player: int) -> tuple[bool, list[tuple[int, int]]]:
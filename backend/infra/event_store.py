@@ -0,0 +1,185 @@
+import abc
+import asyncio
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from backend.domain.events import BaseEvent, EventDraft
+from backend.events.bus import EventBus
+
+if TYPE_CHECKING:
+    from backend.infra.snapshots import Checkpoint
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    max_events: int | None = None
+    max_bytes: int | None = None
+    max_age: timedelta | None = None
+    max_chat_messages: int | None = None
+
+
+class EventStore(abc.ABC):
+    class SeqConflict(Exception):
+        pass
+
+    _locks: dict[int, asyncio.Lock]
+    # Number of coroutines holding or waiting for the lock of each room
+    _lock_users: dict[int, int]
+
+    def __init__(self) -> None:
+        self._locks = defaultdict(asyncio.Lock)
+        self._lock_users = defaultdict(int)
+
+    async def append(
+            self,
+            room_id: int,
+            event_type: str,
+            data: dict | None = None,
+            actor_id: str | None = None,
+            target_id: str | None = None,
+            *,
+            expected_seq: int | None = None,
+    ) -> BaseEvent:
+        """Raises `SeqConflict` when `expected_seq` is given and is not the last seq of the room."""
+        async with self._write_lock(room_id, expected_seq):
+            return await self._append(room_id, event_type, data, actor_id, target_id)
+
+    async def append_many(
+            self,
+            room_id: int,
+            events: list[EventDraft],
+            *,
+            expected_seq: int | None = None,
+    ) -> list[BaseEvent]:
+        async with self._write_lock(room_id, expected_seq):
+            return await self._append_many(room_id, events)
+
+    async def commit(
+            self,
+            room_id: int,
+            event_type: str,
+            data: dict | None = None,
+            actor_id: str | None = None,
+            target_id: str | None = None,
+            *,
+            event_bus: EventBus,
+            expected_seq: int | None = None,
+    ) -> BaseEvent:
+        """Appends and delivers the event under the room lock, so subscribers receive it in seq order."""
+        async with self._write_lock(room_id, expected_seq):
+            event = await self._append(room_id, event_type, data, actor_id, target_id)
+            event_bus.deliver(event)
+            return event
+
+    async def commit_many(
+            self,
+            room_id: int,
+            events: list[EventDraft],
+            *,
+            event_bus: EventBus,
+            expected_seq: int | None = None,
+    ) -> list[BaseEvent]:
+        """Same as `commit`, subscribers receive the events as a single batch."""
+        async with self._write_lock(room_id, expected_seq):
+            appended = await self._append_many(room_id, events)
+            event_bus.deliver_batch(appended)
+            return appended
+
+    @asynccontextmanager
+    async def _write_lock(self, room_id: int, expected_seq: int | None) -> AsyncIterator[None]:
+        # A writer whose room already moved on fails without queuing on the lock
+        await self._check_expected_seq(room_id, expected_seq)
+        async with self._room_lock(room_id):
+            await self._check_expected_seq(room_id, expected_seq)
+            yield
+
+    @asynccontextmanager
+    async def _room_lock(self, room_id: int) -> AsyncIterator[None]:
+        self._lock_users[room_id] += 1
+        try:
+            async with self._locks[room_id]:
+                yield
+        finally:
+            self._lock_users[room_id] -= 1
+            if not self._lock_users[room_id]:
+                del self._lock_users[room_id]
+
+    async def _check_expected_seq(self, room_id: int, expected_seq: int | None) -> None:
+        if expected_seq is None:
+            return
+        last_seq = await self.last_seq(room_id)
+        if last_seq != expected_seq:
+            raise EventStore.SeqConflict(
+                f"Room {room_id} is at seq {last_seq}, expected seq {expected_seq}"
+            )
+
+    @abc.abstractmethod
+    async def _append(
+            self,
+            room_id: int,
+            event_type: str,
+            data: dict | None,
+            actor_id: str | None,
+            target_id: str | None,
+    ) -> BaseEvent:
+        """Appends an event to the room, the caller holds the room lock."""
+
+    async def _append_many(self, room_id: int, events: list[EventDraft]) -> list[BaseEvent]:
+        return [
+            await self._append(room_id, e.type, e.data, e.actor_id, e.target_id)
+            for e in events
+        ]
+
+    @abc.abstractmethod
+    async def read_from(
+            self,
+            room_id: int,
+            after_seq: int | None = None,
+            limit: int = 500
+    ) -> tuple[
+        list[BaseEvent], int
+    ]:
+        ...
+
+    @abc.abstractmethod
+    async def last_seq(self, room_id: int) -> int:
+        ...
+
+    async def checkpoint(self, room_id: int) -> "Checkpoint | None":
+        """The projection of the events trimmed from the room, if any was trimmed."""
+        return None
+
+    def resident_rooms(self) -> list[int]:
+        return list(self._locks)
+
+    async def archive(self, room_id: int) -> bool:
+        """Frees the memory held for the room, its events are loaded back on the next access."""
+        self._release_lock(room_id)
+        return True
+
+    async def close(self) -> None:
+        """Makes every acknowledged write durable and releases what the store holds, on shutdown."""
+
+    def _release_lock(self, room_id: int) -> None:
+        # A coroutine already waiting on the lock must keep sharing it with the ones coming after it,
+        # so it is only dropped when nobody holds or waits for it.
+        if room_id in self._locks and room_id not in self._lock_users:
+            del self._locks[room_id]
+
+    async def iter_from(
+            self,
+            room_id: int,
+            after_seq: int = 0,
+            page_size: int = 500,
+    ) -> AsyncIterator[BaseEvent]:
+        while True:
+            page, _ = await self.read_from(room_id, after_seq=after_seq, limit=page_size)
+            for event in page:
+                yield event
+            if len(page) < page_size:
+                return
+            after_seq = page[-1].seq
@@ -0,0 +1,308 @@
+import asyncio
+import contextlib
+import enum
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable
+from logging import getLogger
+from pathlib import Path
+
+from backend.domain.events import BaseEvent, EventDraft
+from backend.infra.event_store import EventStore
+
+logger = getLogger(__name__)
+
+# Every record is prefixed with the payload length and its crc32, so a torn write at the end of a
+# segment can be detected (and truncated) when the log is recovered.
+RECORD_HEADER = struct.Struct(">II")
+SEGMENT_SUFFIX = ".seg"
+DEFAULT_MAX_SEGMENT_BYTES = 4 * 1024 * 1024
+
+
+class FsyncPolicy(str, enum.Enum):
+    ALWAYS = "always"
+    INTERVAL = "interval"
+    NEVER = "never"
+
+
+class Segment:
+    """Append-only file holding the events of a room from `first_seq`, read through a memory map."""
+
+    def __init__(self, path: Path, first_seq: int) -> None:
+        self.path = path
+        self.first_seq = first_seq
+        self.offsets = array("Q")
+        self.size = 0
+        self.sealed = False
+        self._fd: int | None = None
+        self._mmap: mmap.mmap | None = None
+
+    @property
+    def last_seq(self) -> int:
+        return self.first_seq + len(self.offsets) - 1
+
+    @classmethod
+    def recover(cls, path: Path, first_seq: int) -> "Segment":
+        segment = cls(path, first_seq)
+        data = path.read_bytes()
+        offset = 0
+        while offset + RECORD_HEADER.size <= len(data):
+            length, crc = RECORD_HEADER.unpack_from(data, offset)
+            start = offset + RECORD_HEADER.size
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            segment.offsets.append(offset)
+            offset = start + length
+
+        if offset < len(data):
+            logger.warning(f"Truncating torn record at offset {offset} in segment {path}")
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+        segment.size = offset
+        return segment
+
+    def append(self, payload: bytes) -> None:
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        record = RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        os.write(self._fd, record)
+        self.offsets.append(self.size)
+        self.size += len(record)
+
+    def read(self, seq: int) -> bytes:
+        view = self._view()
+        offset = self.offsets[seq - self.first_seq]
+        length, _ = RECORD_HEADER.unpack_from(view, offset)
+        start = offset + RECORD_HEADER.size
+        return view[start:start + length]
+
+    def fsync(self) -> None:
+        if self._fd is not None:
+            os.fsync(self._fd)
+
+    def close_writer(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def close(self) -> None:
+        self.close_writer()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _view(self) -> mmap.mmap:
+        if self._mmap is None or len(self._mmap) < self.size:
+            if self._mmap is not None:
+                self._mmap.close()
+            with open(self.path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+
+class RoomLog:
+    def __init__(self, directory: Path, segments: list[Segment]) -> None:
+        self.directory = directory
+        self.segments = segments
+        self.first_seqs = [s.first_seq for s in segments]
+        self.last_seq = segments[-1].last_seq if segments else 0
+
+    def add_segment(self, segment: Segment) -> None:
+        self.segments.append(segment)
+        self.first_seqs.append(segment.first_seq)
+
+    def read(self, first_seq: int, last_seq: int) -> list[bytes]:
+        payloads: list[bytes] = []
+        if first_seq > last_seq:
+            return payloads
+        index = bisect_right(self.first_seqs, first_seq) - 1
+        seq = first_seq
+        while seq <= last_seq:
+            segment = self.segments[index]
+            end = min(last_seq, segment.last_seq)
+            payloads.extend(segment.read(s) for s in range(seq, end + 1))
+            seq = end + 1
+            index += 1
+        return payloads
+
+
+def _fsync_all(segments: Iterable[Segment]) -> None:
+    for segment in segments:
+        segment.fsync()
+
+
+class FileEventStore(EventStore):
+    """Durable event store writing the events of each room to append-only segment files."""
+
+    _rooms: dict[int, RoomLog]
+
+    def __init__(
+            self,
+            root: Path | str,
+            fsync_policy: FsyncPolicy = FsyncPolicy.INTERVAL,
+            fsync_interval_ms: int = 50,
+            max_segment_bytes: int = DEFAULT_MAX_SEGMENT_BYTES,
+    ) -> None:
+        logger.info(f"Initializing FileEventStore in {root} with fsync_policy={fsync_policy.value}")
+        super().__init__()
+
+        self._root = Path(root)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._fsync_policy = fsync_policy
+        self._fsync_interval = fsync_interval_ms / 1000
+        self._max_segment_bytes = max_segment_bytes
+
+        self._rooms = {}
+        self._dirty: set[Segment] = set()
+        self._syncing: set[Segment] = set()
+        self._fsync_task: asyncio.Task | None = None
+
+    async def _append(
+            self,
+            room_id: int,
+            event_type: str,
+            data: dict | None,
+            actor_id: str | None,
+            target_id: str | None,
+    ) -> BaseEvent:
+        [event] = await self._append_many(room_id, [EventDraft(event_type, data, actor_id, target_id)])
+        return event
+
+    async def _append_many(self, room_id: int, events: list[EventDraft]) -> list[BaseEvent]:
+        room = self._room(room_id)
+        appended: list[BaseEvent] = []
+        segments: list[Segment] = []
+        for draft in events:
+            event = BaseEvent(
+                seq=room.last_seq + 1,
+                room_id=room_id,
+                type=draft.type,
+                actor_id=draft.actor_id,
+                target_id=draft.target_id,
+                data=draft.data or {}
+            )
+            payload = event.model_dump_json().encode()
+            segment = self._writable_segment(room, event.seq, len(payload))
+            segment.append(payload)
+            room.last_seq = event.seq
+            appended.append(event)
+            if segment not in segments:
+                segments.append(segment)
+        # A batch is synced once, whatever the number of events it holds
+        for segment in segments:
+            await self._sync(segment)
+        return appended
+
+    async def read_from(
+            self,
+            room_id: int,
+            after_seq: int | None = None,
+            limit: int = 500
+    ) -> tuple[
+        list[BaseEvent], int
+    ]:
+        room = self._room(room_id)
+        last_seq = room.last_seq
+        if after_seq is None:
+            start = max(last_seq - limit, 0)
+        else:
+            start = max(after_seq, 0)
+        payloads = room.read(start + 1, min(start + limit, last_seq))
+        return [BaseEvent.model_validate_json(p) for p in payloads], last_seq
+
+    async def last_seq(self, room_id: int) -> int:
+        return self._room(room_id).last_seq
+
+    def resident_rooms(self) -> list[int]:
+        return list(self._rooms)
+
+    async def archive(self, room_id: int) -> bool:
+        # The events are on disk already, only the open segments and their index are dropped
+        async with self._room_lock(room_id):
+            room = self._rooms.pop(room_id, None)
+            if room is not None:
+                await self.flush()
+                for segment in room.segments:
+                    segment.close()
+        return await super().archive(room_id)
+
+    async def flush(self) -> None:
+        dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return
+        # Segments are tracked until their fsync finished, so that sealing one meanwhile does not
+        # close the fd the thread is syncing
+        self._syncing.update(dirty)
+        sync = asyncio.ensure_future(asyncio.to_thread(_fsync_all, dirty))
+        try:
+            await asyncio.shield(sync)
+        except asyncio.CancelledError:
+            # The thread cannot be interrupted, the segments are still being synced until it returns
+            with contextlib.suppress(Exception):
+                await asyncio.shield(sync)
+            raise
+        finally:
+            self._syncing.difference_update(dirty)
+        for segment in dirty:
+            if segment.sealed and segment not in self._dirty and segment not in self._syncing:
+                segment.close_writer()
+
+    async def close(self) -> None:
+        fsync_task, self._fsync_task = self._fsync_task, None
+        if fsync_task is not None:
+            fsync_task.cancel()
+            # A flush in progress keeps syncing its segments, they must not be closed under it
+            with contextlib.suppress(asyncio.CancelledError):
+                await fsync_task
+        await self.flush()
+        for room in self._rooms.values():
+            for segment in room.segments:
+                segment.close()
+        self._rooms = {}
+
+    def _room(self, room_id: int) -> RoomLog:
+        room = self._rooms.get(room_id)
+        if room is None:
+            directory = self._root / str(room_id)
+            paths = sorted(directory.glob(f"*{SEGMENT_SUFFIX}")) if directory.exists() else []
+            segments = [Segment.recover(p, int(p.stem)) for p in paths]
+            room = RoomLog(directory, [s for s in segments if s.offsets])
+            self._rooms[room_id] = room
+        return room
+
+    def _writable_segment(self, room: RoomLog, seq: int, payload_size: int) -> Segment:
+        segment = room.segments[-1] if room.segments else None
+        record_size = RECORD_HEADER.size + payload_size
+        if segment is not None and (segment.size == 0 or segment.size + record_size <= self._max_segment_bytes):
+            return segment
+
+        if segment is not None:
+            self._seal(segment)
+        room.directory.mkdir(parents=True, exist_ok=True)
+        segment = Segment(room.directory / f"{seq:020d}{SEGMENT_SUFFIX}", seq)
+        room.add_segment(segment)
+        return segment
+
+    def _seal(self, segment: Segment) -> None:
+        segment.sealed = True
+        # Under the interval policy the pending fsync closes the writer once it ran
+        if segment not in self._dirty and segment not in self._syncing:
+            segment.close_writer()
+
+    async def _sync(self, segment: Segment) -> None:
+        if self._fsync_policy == FsyncPolicy.ALWAYS:
+            await asyncio.to_thread(segment.fsync)
+        elif self._fsync_policy == FsyncPolicy.INTERVAL:
+            self._dirty.add(segment)
+            if self._fsync_task is None or self._fsync_task.done():
+                self._fsync_task = asyncio.get_running_loop().create_task(self._fsync_periodically())
+
+    async def _fsync_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._fsync_interval)
+            await self.flush()
@@ -1,44 +1,129 @@
 import asyncio
+import json
+import shutil
+import sys
+import tempfile
+import time
+import zlib
 from collections import defaultdict
+from datetime import datetime, timedelta, timezone
 from logging import getLogger
+from pathlib import Path
 
-from backend.domain.events import BaseEvent
+from backend.domain.events import BaseEvent, RoomEvent, GameEvent
+from backend.infra.event_store import EventStore, RetentionPolicy
+from backend.infra.snapshots import Checkpoint, SnapshotBase
 
 logger = getLogger(__name__)
 
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ARCHIVE_SUFFIX = ".json.zlib"
+EVENT_TYPES = {e.value: e for e in (*RoomEvent, *GameEvent)}
+# Size of a record and its slots without the payload, see `scripts/benchmarks/event_memory.py`
+RECORD_SIZE = 120
 
-class MemoryEventStore:
-    _events: dict[int, list[BaseEvent]]
-    _locks: dict[int, asyncio.Lock]
 
-    def __init__(self):
+def _intern(value: str | None) -> str | None:
+    # Actor and target ids are repeated on every event of a room, only keep one copy of each
+    return sys.intern(value) if value is not None else None
+
+
+class StoredEvent:
+    """Compact record of an event, only materialized into a `BaseEvent` when it is read."""
+    __slots__ = ("seq", "type", "ts_ms", "actor_id", "target_id", "data")
+
+    def __init__(
+            self,
+            seq: int,
+            event_type: RoomEvent | GameEvent | str,
+            ts_ms: int,
+            actor_id: str | None,
+            target_id: str | None,
+            data: dict | None,
+    ) -> None:
+        self.seq = seq
+        # Enum members are singletons already, plain string types are interned
+        self.type = event_type if isinstance(event_type, (RoomEvent, GameEvent)) else sys.intern(event_type)
+        self.ts_ms = ts_ms
+        self.actor_id = _intern(actor_id)
+        self.target_id = _intern(target_id)
+        self.data = data or None
+
+    def to_event(self, room_id: int) -> BaseEvent:
+        # The record was built from a validated event, there is no need to validate it again
+        return BaseEvent.model_construct(
+            seq=self.seq,
+            room_id=room_id,
+            type=self.type,
+            ts=EPOCH + timedelta(milliseconds=self.ts_ms),
+            actor_id=self.actor_id,
+            data=self.data if self.data is not None else {},
+            target_id=self.target_id,
+        )
+
+    def size(self) -> int:
+        return RECORD_SIZE + (len(json.dumps(self.data)) if self.data is not None else 0)
+
+    def to_row(self) -> list:
+        event_type = self.type.value if isinstance(self.type, (RoomEvent, GameEvent)) else self.type
+        return [self.seq, event_type, self.ts_ms, self.actor_id, self.target_id, self.data]
+
+    @classmethod
+    def from_row(cls, row: list) -> "StoredEvent":
+        seq, event_type, ts_ms, actor_id, target_id, data = row
+        return cls(seq, EVENT_TYPES.get(event_type, event_type), ts_ms, actor_id, target_id, data)
+
+
+class MemoryEventStore(EventStore):
+
+    _events: dict[int, list[StoredEvent]]
+    _checkpoints: dict[int, Checkpoint]
+    _sizes: dict[int, int]
+    # Rooms with a blob in the archive directory, and the loads of those being read back
+    _archived: set[int]
+    _loading: dict[int, asyncio.Task[None]]
+
+    def __init__(self, archive_dir: Path | str | None = None, retention: RetentionPolicy | None = None):
         logger.info("Initializing MemoryEventStore")
+        super().__init__()
 
         self._events = defaultdict(list)
-        self._locks = defaultdict(asyncio.Lock)
+        self._checkpoints = {}
+        self._sizes = defaultdict(int)
+        self._retention = retention
+        self._archive_root = Path(archive_dir) if archive_dir is not None else None
+        # Created on the first archive. Each store gets its own directory, the blobs of another
+        # process belong to rooms whose ids may be given to new rooms here
+        self._archive_dir: Path | None = None
+        self._archived = set()
+        self._loading = {}
 
-    async def append(
+    async def _append(
             self,
             room_id: int,
             event_type: str,
-            data: dict | None = None,
-            actor_id: str | None = None,
-            target_id: str | None = None,
+            data: dict | None,
+            actor_id: str | None,
+            target_id: str | None,
     ) -> BaseEvent:
-        lock = self._locks[room_id]
-        async with lock:
-            seq = len(self._events[room_id]) + 1
-            event = BaseEvent(
-                seq=seq,
-                room_id=room_id,
-                type=event_type,
-                actor_id=actor_id,
-                target_id=target_id,
-                data=data or {}
-            )
-            logger.info(f"Appending event: {event.model_dump()}")
-            self._events[room_id].append(event)
-            return event
+        seq = await self.last_seq(room_id) + 1
+        events = self._events[room_id]
+        ts_ms = time.time_ns() // 1_000_000
+        event = BaseEvent(
+            seq=seq,
+            room_id=room_id,
+            type=event_type,
+            ts=EPOCH + timedelta(milliseconds=ts_ms),
+            actor_id=actor_id,
+            target_id=target_id,
+            data=data or {}
+        )
+        events.append(
+            StoredEvent(seq, event.type, ts_ms, event.actor_id, event.target_id, event.data)
+        )
+        if self._retention is not None:
+            self._enforce_retention(room_id, events)
+        return event
 
     async def read_from(
             self,
@@ -50,14 +135,125 @@ class MemoryEventStore:
         list[BaseEvent], int
     ]:
         logger.info(f"Reading events for room_id={room_id}")
-        events = self._events.get(room_id, [])
+        events = await self._records(room_id)
+        last_seq = await self.last_seq(room_id)
         if after_seq is None:
             slice_ = events[-limit:]
         else:
-            slice_ = [e for e in events if e.seq > after_seq][:limit]
-        last_seq = events[-1].seq if events else 0
-        return slice_, last_seq
+            # Seqs are dense, the event with seq N lives at index N - first_seq where the first
+            # retained seq follows the checkpoint of the room
+            first_seq = events[0].seq if events else last_seq + 1
+            start = max(after_seq - first_seq + 1, 0)
+            slice_ = events[start:start + limit]
+        return [e.to_event(room_id) for e in slice_], last_seq
 
     async def last_seq(self, room_id: int) -> int:
-        events = self._events.get(room_id, [])
-        return events[-1].seq if events else 0
+        events = await self._records(room_id)
+        if events:
+            return events[-1].seq
+        checkpoint = self._checkpoints.get(room_id)
+        return checkpoint.last_seq if checkpoint is not None else 0
+
+    async def checkpoint(self, room_id: int) -> Checkpoint | None:
+        await self._records(room_id)
+        return self._checkpoints.get(room_id)
+
+    def resident_rooms(self) -> list[int]:
+        return list(self._events)
+
+    async def archive(self, room_id: int) -> bool:
+        archive_root = self._archive_root
+        if archive_root is None:
+            return False
+        async with self._room_lock(room_id):
+            events = self._events.get(room_id)
+            checkpoint = self._checkpoints.get(room_id)
+            if events or checkpoint is not None:
+                blob = zlib.compress(json.dumps({
+                    "checkpoint": checkpoint.to_dict() if checkpoint is not None else None,
+                    "events": [e.to_row() for e in events or []],
+                }).encode())
+                await asyncio.to_thread(self._write_archive, archive_root, room_id, blob)
+                self._archived.add(room_id)
+                logger.info(f"Archived {len(events or [])} events of room_id={room_id} in {len(blob)} bytes")
+            self._events.pop(room_id, None)
+            self._checkpoints.pop(room_id, None)
+            self._sizes.pop(room_id, None)
+        return await super().archive(room_id)
+
+    def _enforce_retention(self, room_id: int, events: list[StoredEvent]) -> None:
+        policy = self._retention
+        if policy is None:
+            return
+        # Once a limit is exceeded the log is trimmed well below it, so that compaction runs once
+        # every few appends instead of on each of them.
+        trim = 0
+        if policy.max_events is not None and len(events) > policy.max_events:
+            trim = len(events) - policy.max_events + policy.max_events // 10
+
+        if policy.max_age is not None:
+            cutoff_ms = time.time_ns() // 1_000_000 - int(policy.max_age.total_seconds() * 1000)
+            while trim < len(events) and events[trim].ts_ms < cutoff_ms:
+                trim += 1
+
+        if policy.max_bytes is not None:
+            self._sizes[room_id] += events[-1].size()
+            trimmed_bytes = sum(e.size() for e in events[:trim])
+            if self._sizes[room_id] - trimmed_bytes > policy.max_bytes:
+                target = policy.max_bytes - policy.max_bytes // 10
+                while trim < len(events) and self._sizes[room_id] - trimmed_bytes > target:
+                    trimmed_bytes += events[trim].size()
+                    trim += 1
+            self._sizes[room_id] -= trimmed_bytes
+
+        if trim:
+            self._compact(room_id, events[:trim], policy.max_chat_messages)
+            del events[:trim]
+
+    def _compact(self, room_id: int, trimmed: list[StoredEvent], max_chat_messages: int | None) -> None:
+        checkpoint = self._checkpoints.get(room_id)
+        if checkpoint is None:
+            checkpoint = self._checkpoints[room_id] = Checkpoint(last_seq=0, state=SnapshotBase(room_id=room_id))
+        logger.info(f"Folding {len(trimmed)} events of room_id={room_id} into its checkpoint")
+        checkpoint.fold([e.to_event(room_id) for e in trimmed], max_chat_messages)
+
+    async def _records(self, room_id: int) -> list[StoredEvent]:
+        events = self._events.get(room_id)
+        if events is None and room_id in self._archived:
+            # Concurrent accesses share a single load, so the room is never installed twice
+            loading = self._loading.get(room_id)
+            if loading is None:
+                loading = self._loading[room_id] = asyncio.create_task(self._load_archive(room_id))
+                loading.add_done_callback(lambda _: self._loading.pop(room_id, None))
+            await asyncio.shield(loading)
+            events = self._events.get(room_id)
+        return events if events is not None else []
+
+    async def _load_archive(self, room_id: int) -> None:
+        logger.info(f"Loading archived events of room_id={room_id}")
+        # The blob is kept until the room is archived again, which overwrites it
+        archived = json.loads(zlib.decompress(await asyncio.to_thread(self._archive_path(room_id).read_bytes)))
+        if archived["checkpoint"] is not None:
+            self._checkpoints[room_id] = Checkpoint.from_dict(archived["checkpoint"])
+        events = [StoredEvent.from_row(row) for row in archived["events"]]
+        if self._retention is not None and self._retention.max_bytes is not None:
+            self._sizes[room_id] = sum(e.size() for e in events)
+        self._events[room_id] = events
+
+    def _write_archive(self, archive_root: Path, room_id: int, blob: bytes) -> None:
+        if self._archive_dir is None:
+            archive_root.mkdir(parents=True, exist_ok=True)
+            self._archive_dir = Path(tempfile.mkdtemp(prefix="rooms-", dir=archive_root))
+        self._archive_path(room_id).write_bytes(blob)
+
+    def _archive_path(self, room_id: int) -> Path:
+        archive_dir = self._archive_dir
+        if archive_dir is None:
+            raise ValueError("Nothing was archived yet")
+        return archive_dir / f"{room_id}{ARCHIVE_SUFFIX}"
+
+    async def close(self) -> None:
+        if self._archive_dir is not None:
+            await asyncio.to_thread(shutil.rmtree, self._archive_dir, ignore_errors=True)
+            self._archive_dir = None
+            self._archived.clear()
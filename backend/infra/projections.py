@@ -0,0 +1,41 @@
+from collections.abc import Callable, Iterable
+from typing import Any, ClassVar, TypeVar
+
+from backend.domain.events import BaseEvent, RoomEvent, GameEvent
+
+EventHandler = Callable[[Any, BaseEvent], None]
+H = TypeVar("H", bound=EventHandler)
+
+
+def handles(*event_types: RoomEvent | GameEvent | str) -> Callable[[H], H]:
+    """Registers the decorated method as the handler of the given event types."""
+
+    def decorator(handler: H) -> H:
+        handler.__handled_event_types__ = event_types  # type: ignore[attr-defined]
+        return handler
+
+    return decorator
+
+
+class Projection:
+    """Read model fed from the events of a room, events without a handler are ignored."""
+
+    _handlers: ClassVar[dict[str, EventHandler]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._handlers = dict(cls._handlers)
+        for attr in vars(cls).values():
+            for event_type in getattr(attr, "__handled_event_types__", ()):
+                cls._handlers[event_type] = attr
+
+    def apply(self, event: BaseEvent) -> None:
+        handler = self._handlers.get(event.type)
+        if handler is not None:
+            handler(self, event)
+
+
+def project(events: Iterable[BaseEvent], *projections: Projection) -> None:
+    for event in events:
+        for projection in projections:
+            projection.apply(event)
@@ -1,4 +1,6 @@
 import enum
+from collections import deque
+from dataclasses import dataclass, field
 from logging import getLogger
 from typing import Literal
 
@@ -6,6 +8,8 @@ from pydantic import BaseModel, Field
 
 from backend.domain.events import BaseEvent, RoomEvent, GameEvent
 from backend.games.connect_four.schemas import ConnectFourPlayerData
+from backend.infra.event_store import EventStore
+from backend.infra.projections import Projection, handles, project
 from backend.models.game_player_model import UserRole
 
 
@@ -49,53 +53,313 @@ class SnapshotBase(BaseModel):
 
 logger = getLogger(__name__)
 
+SNAPSHOT_READ_PAGE_SIZE = 1000
+DEFAULT_MAX_CHECKPOINTS = 100
+
 
 class SnapshotBuilderBase:
+    # Projection of each room shared by all of its users, see `Checkpoint.state_for`
+    _cache: dict[int, "Checkpoint"]
+    # Room-wide part of each room snapshot serialized to JSON, along with the seq it was built up to
+    _json_cache: dict[int, tuple[int, str]]
+
+    # Copies of the projection of each room kept every `checkpoint_interval` seqs, in seq order, the
+    # oldest ones are dropped past `max_checkpoints`
+    _history: dict[int, deque["Checkpoint"]]
+    # Seq of the newest checkpoint dropped from the history of each room
+    _dropped_seq: dict[int, int]
+
+    class SeqUnavailable(Exception):
+        pass
+
+    def __init__(
+            self,
+            max_chat_messages: int | None = None,
+            checkpoint_interval: int | None = None,
+            max_checkpoints: int = DEFAULT_MAX_CHECKPOINTS,
+    ) -> None:
+        self._cache = {}
+        self._json_cache = {}
+        self._history = {}
+        self._dropped_seq = {}
+        self._max_chat_messages = max_chat_messages
+        self._checkpoint_interval = checkpoint_interval
+        self._max_checkpoints = max_checkpoints
+
     async def build(
             self,
             room_id: int,
             events: list[BaseEvent],
             user_id: str | None = None
     ) -> SnapshotBase:
-        # A nice optimization would be to build snapshot incrementally and cache it
         logger.info(f"Building snapshot for room_id={room_id} with {len(events)} events")
         state = SnapshotBase(
             room_id=room_id,
         )
-        players: list[SnapshotPlayer] = []
-        for e in events:
-            if e.type == RoomEvent.PLAYER_JOINED:
-                players.append(
-                    SnapshotPlayer(
-                        id=e.data['id'],
-                        role=e.data['role'],
-                        user_name=e.data['user_name'],
-                        status=PlayerStatus.CONNECTED
-                    )
-                )
-            elif e.type == RoomEvent.PLAYER_LEFT:
-                player = next((_p for _p in players if _p.id == e.data['id']), None)
-                if player:
-                    player.status = PlayerStatus.DISCONNECTED
-            elif e.type == RoomEvent.ROOM_CLOSED:
-                state.status = RoomStatus.CLOSED
-            elif e.type == RoomEvent.MESSAGE_SENT:
-                state.chat_messages.append(
-                    SnapshotChatMessage(
-                        sender_id=e.data["sender_id"],
-                        value=e.data["value"],
-                    )
-                )
-            elif e.type == GameEvent.GAME_START:
-                state.status = RoomStatus.IN_PROGRESS
-            elif e.type == GameEvent.GAME_INIT:
-                if e.target_id == user_id:
-                    state.player_data = ConnectFourPlayerData.model_validate(e.data)
-            elif e.type == GameEvent.GAME_STATE_UPDATE:
-                state.game_state = e.data
-            else:
-                logger.info("Unhandled event type in snapshot builder", e.type)
-
-        state.players = players
+        self._apply_events(state, events, user_id, self._max_chat_messages)
+        return state
+
+    async def build_from_store(
+            self,
+            room_id: int,
+            store: EventStore,
+            user_id: str | None = None,
+    ) -> tuple[SnapshotBase, int]:
+        """Returns the snapshot of a room and the seq it was built up to."""
+        cached = await self._project(room_id, store)
+        return cached.state_for(user_id), cached.last_seq
+
+    async def build_json_from_store(
+            self,
+            room_id: int,
+            store: EventStore,
+            user_id: str | None = None,
+    ) -> tuple[str, int]:
+        cached = await self._project(room_id, store)
+        serialized = self._json_cache.get(room_id)
+        if serialized is None or serialized[0] != cached.last_seq:
+            serialized = self._json_cache[room_id] = (
+                cached.last_seq,
+                cached.state.model_dump_json(exclude={"player_data"}),
+            )
+        player_data = cached.player_data.get(user_id) if user_id is not None else None
+        player_data_json = player_data.model_dump_json() if player_data is not None else "null"
+        return f'{serialized[1][:-1]},"player_data":{player_data_json}}}', cached.last_seq
+
+    async def _project(self, room_id: int, store: EventStore) -> "Checkpoint":
+        last_seq = await store.last_seq(room_id)
+        checkpoint = await store.checkpoint(room_id)
+        cached = self._cache.get(room_id)
+        if cached is not None and cached.last_seq > last_seq:
+            # The store was reset under our feet, the cached projection cannot be trusted anymore
+            self._history.pop(room_id, None)
+            self._dropped_seq.pop(room_id, None)
+            cached = None
+        if cached is None or (checkpoint is not None and cached.last_seq < checkpoint.last_seq):
+            cached = self._start(room_id, checkpoint)
+
+        while cached.last_seq < last_seq:
+            events, _ = await store.read_from(
+                room_id,
+                after_seq=cached.last_seq,
+                limit=SNAPSHOT_READ_PAGE_SIZE,
+            )
+            # Another build may have advanced the cache while we were waiting on the store
+            events = [e for e in events if e.seq > cached.last_seq]
+            if not events:
+                break
+            if events[0].seq != cached.last_seq + 1:
+                # The events in between were trimmed while we were reading the store
+                cached = self._start(room_id, await store.checkpoint(room_id))
+                continue
+            logger.info(f"Applying {len(events)} events to cached snapshot for room_id={room_id}")
+            self._fold(room_id, cached, events)
+
+        return cached
+
+    def _fold(self, room_id: int, cached: "Checkpoint", events: list[BaseEvent]) -> None:
+        interval = self._checkpoint_interval
+        if interval is None:
+            cached.fold(events, self._max_chat_messages)
+            return
+        # Seqs are dense, the events are folded up to each multiple of the interval to keep a copy there
+        while events:
+            count = interval - cached.last_seq % interval
+            cached.fold(events[:count], self._max_chat_messages)
+            events = events[count:]
+            history = self._history.get(room_id)
+            if history is None:
+                history = self._history[room_id] = deque(maxlen=self._max_checkpoints)
+            if cached.last_seq % interval == 0 and (not history or history[-1].last_seq < cached.last_seq):
+                if len(history) == history.maxlen:
+                    self._dropped_seq[room_id] = history[0].last_seq
+                history.append(cached.copy())
+
+    async def build_at(
+            self,
+            room_id: int,
+            store: EventStore,
+            seq: int,
+            user_id: str | None = None,
+    ) -> SnapshotBase:
+        """Raises `SeqUnavailable` when the snapshot at `seq` cannot be rebuilt from the store."""
+        await self._project(room_id, store)
+        if seq > await store.last_seq(room_id):
+            raise SnapshotBuilderBase.SeqUnavailable(f"Room {room_id} did not reach seq {seq} yet")
+
+        checkpoints = [c for c in self._history.get(room_id, []) if c.last_seq <= seq]
+        store_checkpoint = await store.checkpoint(room_id)
+        if store_checkpoint is not None and store_checkpoint.last_seq <= seq:
+            checkpoints.append(store_checkpoint)
+        start = max(checkpoints, key=lambda c: c.last_seq, default=None)
+        if (start.last_seq if start is not None else 0) < self._dropped_seq.get(room_id, 0):
+            # Replaying from further back could read the whole history of the room
+            raise SnapshotBuilderBase.SeqUnavailable(
+                f"Checkpoints of room {room_id} before seq {self._history[room_id][0].last_seq} were dropped"
+            )
+        if start is None:
+            start = Checkpoint(last_seq=0, state=SnapshotBase(room_id=room_id))
+        else:
+            start = start.copy()
+
+        while start.last_seq < seq:
+            events, _ = await store.read_from(
+                room_id,
+                after_seq=start.last_seq,
+                limit=min(SNAPSHOT_READ_PAGE_SIZE, seq - start.last_seq),
+            )
+            if not events or events[0].seq != start.last_seq + 1:
+                raise SnapshotBuilderBase.SeqUnavailable(f"Events of room {room_id} before seq {seq} were trimmed")
+            start.fold(events, self._max_chat_messages)
+
+        return start.state_for(user_id)
+
+    def _start(self, room_id: int, checkpoint: "Checkpoint | None") -> "Checkpoint":
+        if checkpoint is None:
+            cached = Checkpoint(last_seq=0, state=SnapshotBase(room_id=room_id))
+        else:
+            # The checkpoint keeps being folded into by the store
+            cached = checkpoint.copy()
+        self._cache[room_id] = cached
+        self._json_cache.pop(room_id, None)
+        return cached
+
+    def discard(self, room_id: int) -> None:
+        self._cache.pop(room_id, None)
+        self._json_cache.pop(room_id, None)
+        self._history.pop(room_id, None)
+        self._dropped_seq.pop(room_id, None)
+
+    @staticmethod
+    def _copy_state(state: SnapshotBase) -> SnapshotBase:
+        # Players and chat messages are never mutated once projected, copying the lists is enough
+        # to keep the cached state isolated from the caller.
+        return state.model_copy(
+            update={
+                "players": list(state.players),
+                "chat_messages": list(state.chat_messages),
+            }
+        )
 
+    @staticmethod
+    def _apply_events(
+            state: SnapshotBase,
+            events: list[BaseEvent],
+            user_id: str | None,
+            max_chat_messages: int | None = None,
+    ) -> None:
+        project(events, RoomSnapshotProjection(state, user_id, max_chat_messages))
+
+
+class RoomSnapshotProjection(Projection):
+
+    def __init__(self, state: SnapshotBase, user_id: str | None, max_chat_messages: int | None = None) -> None:
+        self.state = state
+        self.user_id = user_id
+        self.max_chat_messages = max_chat_messages
+        # Position of each player by id, a player who joined again keeps its first position
+        self._players: dict[str, int] = {}
+        for position, player in enumerate(state.players):
+            self._players.setdefault(player.id, position)
+
+    @handles(RoomEvent.PLAYER_JOINED)
+    def _player_joined(self, e: BaseEvent) -> None:
+        self._players.setdefault(e.data['id'], len(self.state.players))
+        self.state.players.append(
+            SnapshotPlayer(
+                id=e.data['id'],
+                role=e.data['role'],
+                user_name=e.data['user_name'],
+                status=PlayerStatus.CONNECTED
+            )
+        )
+
+    @handles(RoomEvent.PLAYER_LEFT)
+    def _player_left(self, e: BaseEvent) -> None:
+        position = self._players.get(e.data['id'])
+        if position is not None:
+            self.state.players[position] = self.state.players[position].model_copy(
+                update={"status": PlayerStatus.DISCONNECTED}
+            )
+
+    @handles(RoomEvent.ROOM_CLOSED)
+    def _room_closed(self, e: BaseEvent) -> None:
+        self.state.status = RoomStatus.CLOSED
+
+    @handles(RoomEvent.MESSAGE_SENT)
+    def _message_sent(self, e: BaseEvent) -> None:
+        self.state.chat_messages.append(
+            SnapshotChatMessage(
+                sender_id=e.data["sender_id"],
+                value=e.data["value"],
+            )
+        )
+        if self.max_chat_messages is not None and len(self.state.chat_messages) > self.max_chat_messages:
+            del self.state.chat_messages[0]
+
+    @handles(GameEvent.GAME_START)
+    def _game_start(self, e: BaseEvent) -> None:
+        self.state.status = RoomStatus.IN_PROGRESS
+
+    @handles(GameEvent.GAME_INIT)
+    def _game_init(self, e: BaseEvent) -> None:
+        if e.target_id == self.user_id:
+            self.state.player_data = ConnectFourPlayerData.model_validate(e.data)
+
+    @handles(GameEvent.GAME_STATE_UPDATE)
+    def _game_state_update(self, e: BaseEvent) -> None:
+        self.state.game_state = e.data
+
+
+class PlayerDataProjection(Projection):
+
+    def __init__(self, player_data: dict[str, ConnectFourPlayerData]) -> None:
+        self.player_data = player_data
+
+    @handles(GameEvent.GAME_INIT)
+    def _game_init(self, e: BaseEvent) -> None:
+        if e.target_id is not None:
+            self.player_data[e.target_id] = ConnectFourPlayerData.model_validate(e.data)
+
+
+@dataclass
+class Checkpoint:
+    """Projection of a room up to `last_seq`, with the player data of each player kept aside."""
+    last_seq: int
+    state: SnapshotBase
+    player_data: dict[str, ConnectFourPlayerData] = field(default_factory=dict)
+
+    def fold(self, events: list[BaseEvent], max_chat_messages: int | None = None) -> None:
+        project(
+            events,
+            RoomSnapshotProjection(self.state, None, max_chat_messages),
+            PlayerDataProjection(self.player_data),
+        )
+        self.last_seq = events[-1].seq
+
+    def copy(self) -> "Checkpoint":
+        return Checkpoint(
+            last_seq=self.last_seq,
+            state=SnapshotBuilderBase._copy_state(self.state),
+            player_data=dict(self.player_data),
+        )
+
+    def state_for(self, user_id: str | None) -> SnapshotBase:
+        state = SnapshotBuilderBase._copy_state(self.state)
+        state.player_data = self.player_data.get(user_id) if user_id is not None else None
         return state
+
+    def to_dict(self) -> dict:
+        return {
+            "last_seq": self.last_seq,
+            "state": self.state.model_dump(mode="json"),
+            "player_data": {k: v.model_dump(mode="json") for k, v in self.player_data.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Checkpoint":
+        return cls(
+            last_seq=data["last_seq"],
+            state=SnapshotBase.model_validate(data["state"]),
+            player_data={k: ConnectFourPlayerData.model_validate(v) for k, v in data["player_data"].items()},
+        )
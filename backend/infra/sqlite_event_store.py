@@ -0,0 +1,193 @@
+import asyncio
+import contextlib
+import json
+import sqlite3
+from logging import getLogger
+from pathlib import Path
+
+from backend.domain.events import BaseEvent, EventDraft
+from backend.infra.event_store import EventStore
+
+logger = getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    room_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    actor_id TEXT,
+    target_id TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (room_id, seq)
+) WITHOUT ROWID
+"""
+
+COLUMNS = "room_id, seq, type, ts, actor_id, target_id, data"
+
+
+class SqliteEventStore(EventStore):
+    """Durable event store committing the pending appends of every room in a single transaction."""
+
+    _last_seqs: dict[int, int]
+    _pending: list[tuple[BaseEvent, asyncio.Future[None]]]
+
+    def __init__(self, path: Path | str, max_batch_size: int = 1000) -> None:
+        logger.info(f"Initializing SqliteEventStore in {path}")
+        super().__init__()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._max_batch_size = max_batch_size
+        # The writer connection is only used from the writer thread, reads go through their own
+        # connection on the event loop, WAL mode lets them run while a batch is being committed.
+        self._writer = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.execute("PRAGMA synchronous=FULL")
+        self._writer.execute(SCHEMA)
+        self._reader = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+
+        self._last_seqs = {}
+        self._pending = []
+        self._writer_task: asyncio.Task | None = None
+
+    async def _append(
+            self,
+            room_id: int,
+            event_type: str,
+            data: dict | None,
+            actor_id: str | None,
+            target_id: str | None,
+    ) -> BaseEvent:
+        [event] = await self._append_many(room_id, [EventDraft(event_type, data, actor_id, target_id)])
+        return event
+
+    async def _append_many(self, room_id: int, events: list[EventDraft]) -> list[BaseEvent]:
+        last_seq = await self.last_seq(room_id)
+        appended = [
+            BaseEvent(
+                seq=last_seq + index,
+                room_id=room_id,
+                type=draft.type,
+                actor_id=draft.actor_id,
+                target_id=draft.target_id,
+                data=draft.data or {}
+            ) for index, draft in enumerate(events, start=1)
+        ]
+        loop = asyncio.get_running_loop()
+        committed = []
+        for event in appended:
+            future = loop.create_future()
+            self._pending.append((event, future))
+            committed.append(future)
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._write_batches())
+        done = asyncio.gather(*committed)
+        try:
+            await asyncio.shield(done)
+        except asyncio.CancelledError:
+            # The queued events are committed anyway, the room lock is held until they are so that
+            # the next append of the room is assigned the following seq
+            with contextlib.suppress(Exception):
+                await asyncio.shield(done)
+            raise
+        return appended
+
+    async def read_from(
+            self,
+            room_id: int,
+            after_seq: int | None = None,
+            limit: int = 500
+    ) -> tuple[
+        list[BaseEvent], int
+    ]:
+        last_seq = await self.last_seq(room_id)
+        if after_seq is None:
+            start = max(last_seq - limit, 0)
+        else:
+            start = max(after_seq, 0)
+        rows = self._reader.execute(
+            f"SELECT {COLUMNS} FROM events WHERE room_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+            (room_id, start, limit),
+        ).fetchall()
+        return [self._to_event(row) for row in rows], last_seq
+
+    async def last_seq(self, room_id: int) -> int:
+        last_seq = self._last_seqs.get(room_id)
+        if last_seq is None:
+            row = self._reader.execute("SELECT MAX(seq) FROM events WHERE room_id = ?", (room_id,)).fetchone()
+            last_seq = self._last_seqs[room_id] = row[0] or 0
+        return last_seq
+
+    def resident_rooms(self) -> list[int]:
+        return list(self._last_seqs)
+
+    async def archive(self, room_id: int) -> bool:
+        async with self._room_lock(room_id):
+            self._last_seqs.pop(room_id, None)
+        return await super().archive(room_id)
+
+    async def close(self) -> None:
+        if self._writer_task is not None:
+            await self._writer_task
+            self._writer_task = None
+        self._writer.close()
+        self._reader.close()
+
+    async def _write_batches(self) -> None:
+        # Appends queued while a batch is being committed are picked up by the next iteration
+        while self._pending:
+            batch = self._pending[:self._max_batch_size]
+            del self._pending[:self._max_batch_size]
+            try:
+                await asyncio.to_thread(self._insert, [event for event, _ in batch])
+            except Exception as e:
+                logger.exception("Failed to commit a batch of events")
+                for _, committed in batch:
+                    if not committed.done():
+                        committed.set_exception(e)
+            else:
+                # The seqs are advanced as soon as they are committed, whether the appends are still
+                # waiting for them or not
+                for event, committed in batch:
+                    if event.seq > self._last_seqs.get(event.room_id, 0):
+                        self._last_seqs[event.room_id] = event.seq
+                    if not committed.done():
+                        committed.set_result(None)
+
+    def _insert(self, events: list[BaseEvent]) -> None:
+        self._writer.execute("BEGIN")
+        try:
+            self._writer.executemany(
+                f"INSERT INTO events ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [self._to_row(e) for e in events],
+            )
+        except Exception:
+            self._writer.execute("ROLLBACK")
+            raise
+        self._writer.execute("COMMIT")
+
+    @staticmethod
+    def _to_row(event: BaseEvent) -> tuple:
+        dumped = event.model_dump(mode="json")
+        return (
+            dumped["room_id"],
+            dumped["seq"],
+            dumped["type"],
+            dumped["ts"],
+            dumped["actor_id"],
+            dumped["target_id"],
+            json.dumps(dumped["data"]),
+        )
+
+    @staticmethod
+    def _to_event(row: tuple) -> BaseEvent:
+        room_id, seq, event_type, ts, actor_id, target_id, data = row
+        return BaseEvent(
+            room_id=room_id,
+            seq=seq,
+            type=event_type,
+            ts=ts,
+            actor_id=actor_id,
+            target_id=target_id,
+            data=json.loads(data),
+        )
@@ -1,6 +1,6 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Path
 from pydantic import BaseModel
 from sqlmodel import Session
 from starlette import status
@@ -8,7 +8,7 @@ from starlette.responses import Response
 
 from backend.dependencies import get_event_store, get_event_bus, get_snapshot_builder, get_game_store
 from backend.events.bus import EventBus
-from backend.infra.memory_event_store import MemoryEventStore
+from backend.infra.event_store import EventStore
 from backend.infra.memory_game_store import MemoryGameStore
 from backend.infra.snapshots import SnapshotBase, SnapshotBuilderBase
 from backend.models.game_player_model import GamePlayerModel, UserRole
@@ -51,7 +51,7 @@ async def create_game_room(
         game_data: CreateGameRoomData,
         session: Annotated[Session, Depends(get_session)],
         player_data: Annotated[GamePlayerModel | None, Depends(current_player_data)],
-        event_store: Annotated[MemoryEventStore, Depends(get_event_store)],
+        event_store: Annotated[EventStore, Depends(get_event_store)],
         event_bus: Annotated[EventBus, Depends(get_event_bus)],
         game_store: Annotated[MemoryGameStore, Depends(get_game_store)],
 ) -> CreateGameRoomResponse:
@@ -229,7 +229,7 @@ async def join_game_room(
         user_name: str,
         response: Response,
         session: Annotated[Session, Depends(get_session)],
-        event_store: Annotated[MemoryEventStore, Depends(get_event_store)],
+        event_store: Annotated[EventStore, Depends(get_event_store)],
         event_bus: Annotated[EventBus, Depends(get_event_bus)],
         game_store: Annotated[MemoryGameStore, Depends(get_game_store)],
 ) -> GamePlayerModel:
@@ -307,7 +307,7 @@ async def leave_game_room(
         response: Response,
         session: Annotated[Session, Depends(get_session)],
         player_data: Annotated[GamePlayerModel | None, Depends(current_player_data)],
-        event_store: Annotated[MemoryEventStore, Depends(get_event_store)],
+        event_store: Annotated[EventStore, Depends(get_event_store)],
         event_bus: Annotated[EventBus, Depends(get_event_bus)],
 ) -> LeaveGameRoomResponse:
     if player_data is None:
@@ -356,7 +356,7 @@ async def end_game_room(
         response: Response,
         session: Annotated[Session, Depends(get_session)],
         player_data: Annotated[GamePlayerModel | None, Depends(current_player_data)],
-        event_store: Annotated[MemoryEventStore, Depends(get_event_store)],
+        event_store: Annotated[EventStore, Depends(get_event_store)],
         event_bus: Annotated[EventBus, Depends(get_event_bus)],
 ) -> EndGameRoomResponse:
     if player_data is None or player_data.role != UserRole.admin or player_data.room_id != game_room_id:
@@ -393,16 +393,33 @@ async def end_game_room(
         )
 
 
+def snapshot_etag(room_id: int, last_seq: int, user_id: str) -> str:
+    # The snapshot of a user only changes with the seq of the room
+    return f'"{room_id}-{last_seq}-{user_id}"'
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    # If-None-Match is compared weakly, a `W/` tag matches the same strong one and `*` matches any
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
 @router.get(
     '/{game_room_id}/snapshot/',
     response_model=SnapshotBase,
+    responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            "description": "The snapshot matching the If-None-Match header is still current",
+        },
+    },
 )
 async def get_game_room_snapshot(
         game_room_id: int,
         player_data: Annotated[GamePlayerModel | None, Depends(current_player_data)],
-        event_store: Annotated[MemoryEventStore, Depends(get_event_store)],
-        snapshot_builder: Annotated[SnapshotBuilderBase, Depends(get_snapshot_builder)]
-) -> SnapshotBase:
+        event_store: Annotated[EventStore, Depends(get_event_store)],
+        snapshot_builder: Annotated[SnapshotBuilderBase, Depends(get_snapshot_builder)],
+        if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
     if player_data is None or player_data.room_id != game_room_id:
         raise APIException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -415,13 +432,72 @@ async def get_game_room_snapshot(
             )
         )
 
-    events, last_seq = await event_store.read_from(
-        room_id=game_room_id,
-        limit=10000
-    )
+    # Checked before any event is read or projected
+    etag = snapshot_etag(game_room_id, await event_store.last_seq(game_room_id), player_data.id)
+    if if_none_match is not None and etag_matches(etag, if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
-    return await snapshot_builder.build(
+    # The snapshot is the largest response, it is served from the JSON cached by the builder
+    # instead of being validated against the response model and serialized again
+    snapshot, last_seq = await snapshot_builder.build_json_from_store(
         room_id=game_room_id,
-        events=events,
+        store=event_store,
         user_id=player_data.id,
     )
+    return Response(
+        content=snapshot,
+        media_type="application/json",
+        headers={
+            "ETag": snapshot_etag(game_room_id, last_seq, player_data.id),
+            # Clients keep the snapshot but revalidate it on every request
+            "Cache-Control": "no-cache",
+        },
+    )
+
+
+@router.get(
+    '/{game_room_id}/snapshot/at/{seq}/',
+    response_model=SnapshotBase,
+    responses={
+        status.HTTP_403_FORBIDDEN: {
+            "model": ApiErrorDetail,
+            "description": "User is not admin or not in the game room",
+        },
+        status.HTTP_404_NOT_FOUND: {
+            "model": ApiErrorDetail,
+            "description": "The room did not reach this seq, or its events were trimmed",
+        },
+    }
+)
+async def get_game_room_snapshot_at(
+        game_room_id: int,
+        seq: Annotated[int, Path(ge=0)],
+        player_data: Annotated[GamePlayerModel | None, Depends(current_player_data)],
+        event_store: Annotated[EventStore, Depends(get_event_store)],
+        snapshot_builder: Annotated[SnapshotBuilderBase, Depends(get_snapshot_builder)]
+) -> SnapshotBase:
+    if player_data is None or player_data.role != UserRole.admin or player_data.room_id != game_room_id:
+        raise APIException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=ApiErrorDetail(
+                code=ErrorCode.FORBIDDEN,
+                message="You do not have permission to access the history of this game room",
+                role=player_data.role if player_data else None,
+                room_id=player_data.room_id if player_data else None,
+                id=player_data.id if player_data else None,
+            )
+        )
+    try:
+        return await snapshot_builder.build_at(
+            room_id=game_room_id,
+            store=event_store,
+            seq=seq,
+        )
+    except SnapshotBuilderBase.SeqUnavailable:
+        raise APIException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ApiErrorDetail(
+                code=ErrorCode.SNAPSHOT_UNAVAILABLE,
+                message=f"The state of the game room at seq {seq} is not available",
+            )
+        )
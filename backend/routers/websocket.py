@@ -10,11 +10,11 @@ from starlette.websockets import WebSocketDisconnect
 from backend.dependencies import get_connection_manager, get_event_store, get_snapshot_builder, get_event_bus, \
     get_game_store
 from backend.events.bus import EventBus
-from backend.infra.memory_event_store import MemoryEventStore
+from backend.infra.event_store import EventStore
 from backend.infra.memory_game_store import MemoryGameStore
 from backend.infra.snapshots import SnapshotBuilderBase
 from backend.models.game_player_model import GamePlayerModel
-from backend.services.room_streamer import RoomStreamerService
+from backend.services.room_streamer import RoomStreamerService, SubscriberEvicted
 from backend.state.connection_manager import ConnectionManager
 from backend.utils.security import current_player_data
 
@@ -30,10 +30,12 @@ async def game_room_events(
         room_id: int,
         current_user: Annotated[GamePlayerModel | None, Depends(current_player_data)],
         connections: Annotated[ConnectionManager, Depends(get_connection_manager)],
-        event_store: Annotated[MemoryEventStore, Depends(get_event_store)],
+        event_store: Annotated[EventStore, Depends(get_event_store)],
         game_store: Annotated[MemoryGameStore, Depends(get_game_store)],
         snapshot_builder: Annotated[SnapshotBuilderBase, Depends(get_snapshot_builder)],
         event_bus: Annotated[EventBus, Depends(get_event_bus)],
+        batch: bool = False,
+        last_seq: int | None = None,
 ):
     logger.debug("WebSocket connection attempt", room_id, current_user)
     if not current_user or current_user.room_id != room_id:
@@ -47,42 +49,47 @@ async def game_room_events(
     receive_task: asyncio.Task | None = None
 
     try:
-        await RoomStreamerService.send_current_room_state(
-            ws=websocket,
-            room_id=room_id,
-            user_id=current_user.id,
-            store=event_store,
-            snapshot_builder=snapshot_builder,
-        )
-
-        send_task = asyncio.create_task(
-            RoomStreamerService.stream_room_events(
+        # Subscribed before the client is brought up to date, events appended meanwhile are queued
+        async with event_bus.subscribe(room_id, current_user.id) as queue:
+            synced_seq = await RoomStreamerService.send_current_room_state(
                 ws=websocket,
                 room_id=room_id,
                 user_id=current_user.id,
-                event_bus=event_bus,
+                store=event_store,
+                snapshot_builder=snapshot_builder,
+                after_seq=last_seq,
             )
-        )
-        receive_task = asyncio.create_task(
-            RoomStreamerService.receive_client_messages(
-                ws=websocket,
-                current_user=current_user,
-                event_store=event_store,
-                game_store=game_store,
-                event_bus=event_bus,
+
+            send_task = asyncio.create_task(
+                RoomStreamerService.stream_room_events(
+                    ws=websocket,
+                    queue=queue,
+                    batch_frames=batch,
+                    after_seq=synced_seq,
+                )
+            )
+            receive_task = asyncio.create_task(
+                RoomStreamerService.receive_client_messages(
+                    ws=websocket,
+                    current_user=current_user,
+                    event_store=event_store,
+                    game_store=game_store,
+                    event_bus=event_bus,
+                )
             )
-        )
 
-        done, pending = await asyncio.wait(
-            {send_task, receive_task},
-            return_when=asyncio.FIRST_EXCEPTION
-        )
+            done, pending = await asyncio.wait(
+                {send_task, receive_task},
+                return_when=asyncio.FIRST_EXCEPTION
+            )
 
-        for t in done:
-            t.result()
+            for t in done:
+                t.result()
 
     except WebSocketDisconnect:
         pass
+    except SubscriberEvicted as e:
+        logger.info(f"Evicted slow subscriber {current_user.id} of room {room_id} at seq {e.resume_after_seq}")
     except Exception as e:
         logger.error(json.dumps(e))
     finally:
@@ -1,7 +1,7 @@
 import enum
-from typing import Literal
+from typing import Literal, Annotated
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, TypeAdapter
 
 from backend.games.connect_four.schemas import ConnectFourActionData
 
@@ -59,3 +59,8 @@ class ClientMessageGameAction(ClientMessageBase):
 
 
 WSClientMessage = ClientMessagePing | ClientMessageChatMessage | ClientMessageGameStart | ClientMessageGameReset | ClientMessageGameAction
+
+# Validates a raw client frame in a single pass, the `type` tag selects the model to validate against
+client_message_adapter: TypeAdapter[WSClientMessage] = TypeAdapter(
+    Annotated[WSClientMessage, Field(discriminator="type")]
+)
@@ -12,6 +12,7 @@ from backend.schemas.websocket.client import ClientMessageErrorCode
 class WSMessageType(str, enum.Enum):
     SNAPSHOT = "snapshot"
     EVENT = "event"
+    BATCH = "batch"
     PING = "ping"
     RESPONSE = "response"
     ERROR = "error"
@@ -33,6 +34,12 @@ class WSMessageEvent(WSMessageBase):
     event: BaseEvent
 
 
+class WSMessageBatch(WSMessageBase):
+    """Events sent in a single frame to the clients which opted in, in seq order."""
+    type: Literal[WSMessageType.BATCH] = WSMessageType.BATCH
+    events: list[WSMessageEvent]
+
+
 class WSMessagePing(WSMessageBase):
     type: Literal[WSMessageType.PING] = WSMessageType.PING
     timestamp: int
@@ -51,4 +58,12 @@ class WSMessageResponse(WSMessageBase):
     error: WSMessageError | None = None
 
 
-WSServerMessage = WSMessageBase | WSMessageSnapshot | WSMessageEvent | WSMessagePing | WSMessageError | WSMessageResponse
+WSServerMessage = (
+        WSMessageBase
+        | WSMessageSnapshot
+        | WSMessageEvent
+        | WSMessageBatch
+        | WSMessagePing
+        | WSMessageError
+        | WSMessageResponse
+)
@@ -1,19 +1,45 @@
+import asyncio
+import contextlib
 from contextlib import asynccontextmanager
+from datetime import timedelta
 
 from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.responses import JSONResponse
 
+from backend.dependencies import get_event_store, get_game_store, get_snapshot_builder
 from backend.routers.game_auth_router import router as game_auth_router
 from backend.routers.game_room_router import router as game_room_router
 from backend.routers.websocket import router as websocket_router
 from backend.schemas.websocket.client import WSClientMessage
 from backend.schemas.websocket.server import WSServerMessage
+from backend.services.room_archive_service import RoomArchiveService
 from backend.utils.db import create_db_and_tables
 from backend.utils.env import get_env
 from backend.utils.errors import APIException
+from backend.utils.responses import FastJSONResponse
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    create_db_and_tables()
+    archive_task = asyncio.create_task(
+        RoomArchiveService.archive_periodically(
+            event_store=get_event_store(),
+            game_store=get_game_store(),
+            snapshot_builder=get_snapshot_builder(),
+            interval=timedelta(seconds=int(get_env("ROOM_ARCHIVE_INTERVAL_S", default="60"))),
+            idle_timeout=timedelta(seconds=int(get_env("ROOM_IDLE_TIMEOUT_S", default="1800"))),
+        )
+    )
+    yield
+    archive_task.cancel()
+    # An archive pass may still be writing to the store, it has to stop before the store is closed
+    with contextlib.suppress(asyncio.CancelledError):
+        await archive_task
+    await get_event_store().close()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,7 +53,7 @@ app.add_middleware(
 
 @app.exception_handler(APIException)
 def api_error_handler(_, exc: APIException):
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content=exc.detail,
     )
@@ -58,9 +84,3 @@ if get_env("DEV") == "true":
 
 
     app.include_router(types_router)
-
-
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    create_db_and_tables()
-    yield
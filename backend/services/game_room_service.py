@@ -3,9 +3,9 @@ from typing import Sequence
 from sqlalchemy import func
 from sqlmodel import Session, select
 
-from backend.domain.events import RoomEvent
+from backend.domain.events import RoomEvent, EventDraft
 from backend.events.bus import EventBus
-from backend.infra.memory_event_store import MemoryEventStore
+from backend.infra.event_store import EventStore
 from backend.models.game_player_model import UserRole, GamePlayerModel
 from backend.models.game_room_model import GameType, GameRoomModel
 from backend.utils.game_utils import get_room_max_users
@@ -83,7 +83,7 @@ class GameRoomService:
             game_room_id: int,
             role: UserRole,
             user_name: str,
-            event_store: MemoryEventStore,
+            event_store: EventStore,
             event_bus: EventBus,
     ) -> GamePlayerModel:
         game_room = GameRoomService.get_or_error(session, game_room_id)
@@ -108,16 +108,16 @@ class GameRoomService:
         session.commit()
         session.refresh(game_player)
 
-        e = await event_store.append(
+        await event_store.commit(
             room_id=game_room_id,
             event_type=RoomEvent.PLAYER_JOINED,
             data={
                 "id": game_player.id,
                 "user_name": game_player.user_name,
                 "role": game_player.role,
-            }
+            },
+            event_bus=event_bus,
         )
-        await event_bus.publish(e)
 
         return game_player
 
@@ -125,7 +125,7 @@ class GameRoomService:
     async def remove_user(
             session: Session,
             player_id: str,
-            event_store: MemoryEventStore,
+            event_store: EventStore,
             event_bus: EventBus,
     ) -> bool:
         statement = select(GamePlayerModel).where(GamePlayerModel.id == player_id)
@@ -136,29 +136,24 @@ class GameRoomService:
             session.delete(game_player)
             session.commit()
 
-            e = await event_store.append(
-                room_id=game_player.room_id,
-                event_type=RoomEvent.PLAYER_LEFT,
-                data={
-                    "id": user_id,
-                }
-            )
-
-            await event_bus.publish(e)
-
             current_users_count = session.scalar(
                 select(
                     func.count()
                 ).where(GamePlayerModel.room_id == game_player.room_id)
             ) or 0
 
-            if current_users_count == 0:
-                await GameRoomService.end_game_room(
-                    session=session,
-                    game_room_id=game_player.room_id,
-                    event_store=event_store,
-                    event_bus=event_bus,
+            events = [
+                EventDraft(
+                    type=RoomEvent.PLAYER_LEFT,
+                    data={
+                        "id": user_id,
+                    },
                 )
+            ]
+            if current_users_count == 0 and GameRoomService._deactivate(session, game_player.room_id):
+                events.append(EventDraft(type=RoomEvent.ROOM_CLOSED))
+
+            await event_store.commit_many(game_player.room_id, events, event_bus=event_bus)
 
             return True
 
@@ -168,9 +163,17 @@ class GameRoomService:
     async def end_game_room(
             session: Session,
             game_room_id: int,
-            event_store: MemoryEventStore,
+            event_store: EventStore,
             event_bus: EventBus,
     ) -> bool:
+        if not GameRoomService._deactivate(session, game_room_id):
+            return False
+
+        await event_store.commit(game_room_id, RoomEvent.ROOM_CLOSED, event_bus=event_bus)
+        return True
+
+    @staticmethod
+    def _deactivate(session: Session, game_room_id: int) -> bool:
         game_room = GameRoomService.get_or_error(session, game_room_id)
         if not game_room.is_active:
             return False
@@ -178,7 +181,4 @@ class GameRoomService:
         game_room.is_active = False
         session.add(game_room)
         session.commit()
-
-        event = await event_store.append(game_room_id, RoomEvent.ROOM_CLOSED)
-        await event_bus.publish(event)
         return True
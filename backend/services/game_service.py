@@ -1,6 +1,6 @@
 from backend.events.bus import EventBus
 from backend.games.abstract import Game
-from backend.infra.memory_event_store import MemoryEventStore
+from backend.infra.event_store import EventStore
 from backend.infra.memory_game_store import MemoryGameStore
 from backend.models.game_room_model import GameType, GameRoomModel
 from backend.utils.game_utils import get_game_class
@@ -12,7 +12,7 @@ class GameService:
             game_room: GameRoomModel,
             game_type: GameType,
             game_store: MemoryGameStore,
-            event_store: MemoryEventStore,
+            event_store: EventStore,
             event_bus: EventBus,
     ) -> Game:
         cls = get_game_class(game_type)
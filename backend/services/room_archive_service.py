@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime, timezone, timedelta
+from logging import getLogger
+
+from backend.domain.events import RoomEvent
+from backend.infra.event_store import EventStore
+from backend.infra.memory_game_store import MemoryGameStore
+from backend.infra.snapshots import SnapshotBuilderBase, RoomStatus
+
+logger = getLogger(__name__)
+
+
+class RoomArchiveService:
+    @staticmethod
+    async def archive_room(
+            room_id: int,
+            event_store: EventStore,
+            game_store: MemoryGameStore,
+            snapshot_builder: SnapshotBuilderBase,
+            closed: bool,
+    ) -> bool:
+        if not await event_store.archive(room_id):
+            return False
+        snapshot_builder.discard(room_id)
+        # The game of a room which is only idle cannot be rebuilt from its events, it is kept until
+        # the room is closed.
+        if closed:
+            game_store.delete_game(room_id)
+        return True
+
+    @staticmethod
+    async def archive_inactive_rooms(
+            event_store: EventStore,
+            game_store: MemoryGameStore,
+            snapshot_builder: SnapshotBuilderBase,
+            idle_timeout: timedelta,
+    ) -> list[int]:
+        now = datetime.now(timezone.utc)
+        archived = []
+        for room_id in event_store.resident_rooms():
+            events, _ = await event_store.read_from(room_id, limit=1)
+            if events:
+                last_event = events[-1]
+                closed = last_event.type == RoomEvent.ROOM_CLOSED
+                if not closed and now - last_event.ts < idle_timeout:
+                    continue
+            else:
+                # Every event of a room only holding a checkpoint was trimmed for its age
+                checkpoint = await event_store.checkpoint(room_id)
+                if checkpoint is None:
+                    continue
+                closed = checkpoint.state.status == RoomStatus.CLOSED
+            if await RoomArchiveService.archive_room(room_id, event_store, game_store, snapshot_builder, closed):
+                archived.append(room_id)
+
+        if archived:
+            logger.info(f"Archived {len(archived)} inactive rooms: {archived}")
+        return archived
+
+    @staticmethod
+    async def archive_periodically(
+            event_store: EventStore,
+            game_store: MemoryGameStore,
+            snapshot_builder: SnapshotBuilderBase,
+            interval: timedelta,
+            idle_timeout: timedelta,
+    ) -> None:
+        while True:
+            await asyncio.sleep(interval.total_seconds())
+            try:
+                await RoomArchiveService.archive_inactive_rooms(
+                    event_store,
+                    game_store,
+                    snapshot_builder,
+                    idle_timeout,
+                )
+            except Exception:
+                logger.exception("Failed to archive inactive rooms")
@@ -1,4 +1,7 @@
+import json
 import time
+import weakref
+from collections.abc import Awaitable, Callable
 from logging import getLogger
 
 from fastapi import WebSocket
@@ -6,19 +9,59 @@ from pydantic import ValidationError
 
 from backend.domain.events import RoomEvent, BaseEvent, GameEvent
 from backend.events.bus import EventBus
+from backend.events.queue import SubscriberQueue
 from backend.games.abstract import GameException
-from backend.infra.memory_event_store import MemoryEventStore
+from backend.infra.event_store import EventStore
 from backend.infra.memory_game_store import MemoryGameStore
 from backend.infra.snapshots import SnapshotBuilderBase
 from backend.models.game_player_model import GamePlayerModel
 from backend.schemas.websocket.client import ClientMessageChatMessage, ClientMessageErrorCode, ClientMessageBase, \
-    ClientMessageType, ClientMessageGameAction
-from backend.schemas.websocket.server import WSMessageSnapshot, WSMessageType, WSMessageEvent, WSMessagePing, \
+    ClientMessageType, ClientMessageGameAction, ClientMessagePing, ClientMessageGameStart, ClientMessageGameReset, \
+    client_message_adapter
+from backend.schemas.websocket.server import WSMessageType, WSMessageEvent, WSMessagePing, \
     WSMessageResponse, WSMessageError
+from backend.utils.responses import send_model
 
 logger = getLogger(__name__)
 
 
+# Close code sent to a subscriber evicted because it did not keep up with its room
+SLOW_CONSUMER_CLOSE_CODE = 4429
+MAX_BATCH_EVENTS = 100
+# Above this many missed events a reconnecting client is sent a snapshot instead
+MAX_REPLAY_EVENTS = 500
+
+
+class EventFrameCache:
+    """Encoded `WSMessageEvent` frames by event, shared by every stream of a room."""
+
+    def __init__(self) -> None:
+        self._frames: dict[int, str] = {}
+
+    def get(self, event: BaseEvent) -> str:
+        key = id(event)
+        frame = self._frames.get(key)
+        if frame is None:
+            frame = WSMessageEvent(
+                type=WSMessageType.EVENT,
+                seq=event.seq,
+                event=event
+            ).model_dump_json()
+            self._frames[key] = frame
+            # The id of an event can be reused once it is collected, the entry must not outlive it
+            weakref.finalize(event, self._frames.pop, key, None)
+        return frame
+
+
+_event_frames = EventFrameCache()
+
+
+class SubscriberEvicted(Exception):
+    def __init__(self, resume_after_seq: int | None) -> None:
+        self.resume_after_seq = resume_after_seq
+        super().__init__("Subscriber evicted for being too slow")
+
+
 class StreamingError(Exception):
     def __init__(self, error: WSMessageError, event_key: str | None = None) -> None:
         self.error = error
@@ -32,82 +75,190 @@ class RoomStreamerService:
             ws: WebSocket,
             room_id: int,
             user_id: str,
-            store: MemoryEventStore,
+            store: EventStore,
             snapshot_builder: SnapshotBuilderBase,
-    ) -> None:
-        history, current_last = await store.read_from(room_id)
-        snapshot = await snapshot_builder.build(room_id, history, user_id=user_id)
-
-        await ws.send_json(
-            WSMessageSnapshot(
-                type=WSMessageType.SNAPSHOT,
-                last_seq=current_last,
-                data=snapshot,
-            ).model_dump(mode="json")
+            after_seq: int | None = None,
+    ) -> int:
+        """Returns the seq the client was brought up to."""
+        if after_seq is not None:
+            replayed_seq = await RoomStreamerService._replay_missed_events(ws, room_id, user_id, store, after_seq)
+            if replayed_seq is not None:
+                return replayed_seq
+
+        # Same frame as a dumped `WSMessageSnapshot`, built around the cached snapshot JSON
+        snapshot, current_last = await snapshot_builder.build_json_from_store(room_id, store, user_id=user_id)
+        await ws.send_text(
+            f'{{"type":"{WSMessageType.SNAPSHOT.value}","last_seq":{current_last},"data":{snapshot}}}'
         )
+        return current_last
 
     @staticmethod
-    async def stream_room_events(
+    async def _replay_missed_events(
             ws: WebSocket,
             room_id: int,
             user_id: str,
-            event_bus: EventBus
+            store: EventStore,
+            after_seq: int,
+    ) -> int | None:
+        last_seq = await store.last_seq(room_id)
+        # A seq ahead of the room comes from a previous life of the store, a large gap is cheaper
+        # to send as a snapshot
+        if after_seq > last_seq or last_seq - after_seq > MAX_REPLAY_EVENTS:
+            return None
+        checkpoint = await store.checkpoint(room_id)
+        if checkpoint is not None and after_seq < checkpoint.last_seq:
+            # Some of the missed events were folded into the checkpoint
+            return None
+
+        events, _ = await store.read_from(room_id, after_seq=after_seq, limit=MAX_REPLAY_EVENTS)
+        for e in events:
+            # Same as the bus, events targeted at other players are not sent
+            if e.target_id and e.target_id != user_id:
+                continue
+            await RoomStreamerService.send_ws_message_event(ws, e)
+        return events[-1].seq if events else after_seq
+
+    @staticmethod
+    async def stream_room_events(
+            ws: WebSocket,
+            queue: SubscriberQueue,
+            batch_frames: bool = False,
+            after_seq: int | None = None,
     ) -> None:
-        async with event_bus.subscribe(room_id, user_id) as queue:
-            while True:
-                e = await queue.get()
+        last_seq = after_seq
+        while True:
+            item = await queue.get()
+            evicted = item is SubscriberQueue.EVICTED
+            events = [] if evicted else item if isinstance(item, list) else [item]
+            if batch_frames and not evicted:
+                events = list(events)
+                while len(events) < MAX_BATCH_EVENTS and not queue.empty():
+                    item = queue.get_nowait()
+                    if item is SubscriberQueue.EVICTED:
+                        evicted = True
+                        break
+                    events.extend(item if isinstance(item, list) else [item])
+            if after_seq is not None:
+                # The queue is subscribed before the client is brought up to date, these were already sent
+                events = [e for e in events if e.seq > after_seq]
+
+            if batch_frames and len(events) > 1:
+                await RoomStreamerService.send_ws_message_batch(ws, events)
+                last_seq = events[-1].seq
+                events = []
+
+            if evicted:
+                # The client reconnects and resumes from the last event it received
+                await ws.close(
+                    code=SLOW_CONSUMER_CLOSE_CODE,
+                    reason=json.dumps({"resume_after_seq": last_seq}),
+                )
+                raise SubscriberEvicted(last_seq)
+            for e in events:
                 await RoomStreamerService.send_ws_message_event(ws, e)
+                last_seq = e.seq
 
     @staticmethod
     async def send_ws_message_event(ws: WebSocket, event: BaseEvent) -> None:
-        await ws.send_json(
-            WSMessageEvent(
-                type=WSMessageType.EVENT,
-                seq=event.seq,
-                event=event
-            ).model_dump(mode='json')
-        )
+        await ws.send_text(_event_frames.get(event))
 
     @staticmethod
-    async def _handle_ping(ws: WebSocket) -> bool:
-        await ws.send_json(WSMessagePing(
+    async def send_ws_message_batch(ws: WebSocket, events: list[BaseEvent]) -> None:
+        # The frame of each event is shared with the subscribers receiving it on its own
+        frames = ",".join(_event_frames.get(e) for e in events)
+        await ws.send_text(f'{{"type":"{WSMessageType.BATCH.value}","events":[{frames}]}}')
+
+    @staticmethod
+    async def _handle_ping(
+            ws: WebSocket,
+            message: ClientMessagePing,
+            current_user: GamePlayerModel,
+            event_store: EventStore,
+            event_bus: EventBus,
+            game_store: MemoryGameStore,
+    ) -> bool:
+        await send_model(ws, WSMessagePing(
             timestamp=round(time.time() * 1000)
-        ).model_dump(mode="json"))
+        ))
         return True
 
     @staticmethod
     async def _handle_chat_message(
             ws: WebSocket,
+            message: ClientMessageChatMessage,
             current_user: GamePlayerModel,
-            store: MemoryEventStore,
+            event_store: EventStore,
             event_bus: EventBus,
-            raw_json: dict,
-            event_key: str | None = None
+            game_store: MemoryGameStore,
     ) -> bool:
+        text = message.text.strip()
+        if not text:
+            raise RoomStreamerService._malformed_chat_message(message.event_key)
+        await event_store.commit(
+            room_id=current_user.room_id,
+            event_type=RoomEvent.MESSAGE_SENT,
+            actor_id=current_user.id,
+            data={
+                "value": text,
+                "sender_id": current_user.id,
+            },
+            event_bus=event_bus,
+        )
+        return True
+
+    @staticmethod
+    async def _handle_game_message(
+            ws: WebSocket,
+            message: ClientMessageGameStart | ClientMessageGameReset | ClientMessageGameAction,
+            current_user: GamePlayerModel,
+            event_store: EventStore,
+            event_bus: EventBus,
+            game_store: MemoryGameStore,
+    ) -> bool:
+        event = await event_store.append(
+            room_id=current_user.room_id,
+            event_type=GAME_EVENT_TYPES[message.type],
+            actor_id=current_user.id,
+            data=message.data.model_dump(mode="json") if isinstance(message, ClientMessageGameAction) else None,
+        )
+        return await RoomStreamerService._execute_game_event(
+            game_store=game_store,
+            current_user=current_user,
+            event=event,
+            event_key=message.event_key,
+        )
+
+    @staticmethod
+    def _malformed_chat_message(event_key: str | None) -> StreamingError:
+        return StreamingError(
+            error=WSMessageError(
+                code=ClientMessageErrorCode.INVALID_MESSAGE,
+                message="Malformed chat message"
+            ),
+            event_key=event_key,
+        )
+
+    @staticmethod
+    def _invalid_message(raw_message: str, err: ValidationError) -> StreamingError:
+        # Only on the error path: the event key of a message which failed validation is looked up
+        # leniently so that the client still gets a response for it
         try:
-            chat_message = ClientMessageChatMessage.model_validate(raw_json)
-            text = chat_message.text.strip()
-            if not text:
-                raise ClientMessageChatMessage.InvalidMessage
-            event = await store.append(
-                room_id=current_user.room_id,
-                event_type=RoomEvent.MESSAGE_SENT,
-                actor_id=current_user.id,
-                data={
-                    "value": text,
-                    "sender_id": current_user.id,
-                }
-            )
-            await event_bus.publish(event=event)
-            return True
-        except (ValidationError, ClientMessageChatMessage.InvalidMessage):
-            raise StreamingError(
-                error=WSMessageError(
-                    code=ClientMessageErrorCode.INVALID_MESSAGE,
-                    message="Malformed chat message"
-                ),
-                event_key=event_key,
-            )
+            event_key = json.loads(raw_message).get("event_key")
+        except (ValueError, AttributeError):
+            event_key = None
+        if not isinstance(event_key, str):
+            event_key = None
+
+        # The location of an error starts with the tag of the union member which failed
+        if err.errors()[0]["loc"][:1] == (ClientMessageType.CHAT_MESSAGE.value,):
+            return RoomStreamerService._malformed_chat_message(event_key)
+        return StreamingError(
+            error=WSMessageError(
+                code=ClientMessageBase.InvalidMessage.code,
+                message="Invalid message format"
+            ),
+            event_key=event_key,
+        )
 
     @staticmethod
     async def _execute_game_event(
@@ -142,95 +293,58 @@ class RoomStreamerService:
     async def receive_client_messages(
             ws: WebSocket,
             current_user: GamePlayerModel,
-            event_store: MemoryEventStore,
+            event_store: EventStore,
             event_bus: EventBus,
             game_store: MemoryGameStore,
     ) -> None:
         while True:
-            raw_json = await ws.receive_json()
+            raw_message = await ws.receive_text()
             try:
-                message_base = ClientMessageBase.model_validate(raw_json)
-                typ = message_base.type
-                result = False
-
-                if typ == ClientMessageType.PING:
-                    result = await RoomStreamerService._handle_ping(ws)
-                elif typ == ClientMessageType.CHAT_MESSAGE:
-                    result = await RoomStreamerService._handle_chat_message(
-                        ws,
-                        current_user,
-                        event_store,
-                        event_bus,
-                        raw_json,
-                        message_base.event_key
-                    )
-                elif typ == ClientMessageType.GAME_START:
-                    event = await event_store.append(
-                        room_id=current_user.room_id,
-                        event_type=GameEvent.GAME_START,
-                        actor_id=current_user.id,
-                    )
-                    result = await RoomStreamerService._execute_game_event(
-                        game_store=game_store,
-                        current_user=current_user,
-                        event=event,
-                        event_key=message_base.event_key,
-                    )
-                elif typ == ClientMessageType.GAME_RESET:
-                    event = await event_store.append(
-                        room_id=current_user.room_id,
-                        event_type=GameEvent.GAME_RESET,
-                        actor_id=current_user.id,
-                    )
-                    result = await RoomStreamerService._execute_game_event(
-                        game_store=game_store,
-                        current_user=current_user,
-                        event=event,
-                        event_key=message_base.event_key,
-                    )
-                elif typ == ClientMessageType.ACTION:
-                    game_action = ClientMessageGameAction.model_validate(raw_json)
-                    event = await event_store.append(
-                        room_id=current_user.room_id,
-                        event_type=GameEvent.PLAYER_ACTION,
-                        actor_id=current_user.id,
-                        data=game_action.data.model_dump(mode="json")
-                    )
-                    result = await RoomStreamerService._execute_game_event(
-                        game_store=game_store,
-                        current_user=current_user,
-                        event=event,
-                        event_key=message_base.event_key,
-                    )
+                try:
+                    message = client_message_adapter.validate_json(raw_message)
+                except ValidationError as err:
+                    raise RoomStreamerService._invalid_message(raw_message, err)
+
+                handler = _CLIENT_MESSAGE_HANDLERS[message.type]
+                result = await handler(ws, message, current_user, event_store, event_bus, game_store)
 
                 # Acknowledge successful handling if event_key is provided, even if it was already handled
-                if result and message_base.event_key:
-                    await ws.send_json(
+                if result and message.event_key:
+                    await send_model(
+                        ws,
                         WSMessageResponse(
                             success=True,
-                            event_key=message_base.event_key
-                        ).model_dump(mode="json"))
-            except ValidationError:
-                await ws.send_json(
-                    WSMessageError(
-                        code=ClientMessageBase.InvalidMessage.code,
-                        message="Invalid message format"
-                    ).model_dump(mode="json")
-                )
+                            event_key=message.event_key
+                        ))
             except StreamingError as err:
                 if err.event_key:
                     # If the client expects a response, send a WSMessageResponse
-                    await ws.send_json(
+                    await send_model(
+                        ws,
                         WSMessageResponse(
                             success=False,
                             event_key=err.event_key,
                             error=err.error
-                        ).model_dump(mode="json")
+                        )
                     )
                 else:
                     # Otherwise, send a global message that should be displayed in the user's UI with no specific context
-                    await ws.send_json(
-                        err.error.model_dump(mode="json")
-                    )
+                    await send_model(ws, err.error)
             except Exception as e:
                 logger.exception("Unexpected error while processing client message", e)
+
+
+GAME_EVENT_TYPES = {
+    ClientMessageType.GAME_START: GameEvent.GAME_START,
+    ClientMessageType.GAME_RESET: GameEvent.GAME_RESET,
+    ClientMessageType.ACTION: GameEvent.PLAYER_ACTION,
+}
+
+# Each handler returns whether the message was handled and may be acknowledged
+_CLIENT_MESSAGE_HANDLERS: dict[ClientMessageType, Callable[..., Awaitable[bool]]] = {
+    ClientMessageType.PING: RoomStreamerService._handle_ping,
+    ClientMessageType.CHAT_MESSAGE: RoomStreamerService._handle_chat_message,
+    ClientMessageType.GAME_START: RoomStreamerService._handle_game_message,
+    ClientMessageType.GAME_RESET: RoomStreamerService._handle_game_message,
+    ClientMessageType.ACTION: RoomStreamerService._handle_game_message,
+}
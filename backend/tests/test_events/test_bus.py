@@ -8,10 +8,9 @@ from backend.events.bus import EventBus
 from backend.events.subscribers import QueueSubscribers
 
 
-def test_event_bus_should_be_initialized_with_empty_subscribers_and_a_lock():
+def test_event_bus_should_be_initialized_with_empty_subscribers():
     event_bus = EventBus()
     assert isinstance(event_bus._subscribers, QueueSubscribers)
-    assert isinstance(event_bus._lock, asyncio.Lock)
 
 
 @pytest.mark.asyncio
@@ -43,7 +42,7 @@ async def test_event_bus_subscribe_to_room_events():
     async with event_bus.subscribe(room_id=room_id, user_id="user") as q:
         subs = event_bus._subscribers
         assert q in subs.get_by_room_id(room_id)
-        assert q == subs.get_by_user_id("user")
+        assert subs.get_by_user_id("user") == {q}
 
 
 @pytest.mark.asyncio
@@ -54,7 +53,7 @@ async def test_event_bus_subscribe_cleanup():
     async with event_bus.subscribe(room_id, 'user') as q:
         subs = event_bus._subscribers
         assert q in subs.get_by_room_id(room_id)
-        assert q == subs.get_by_user_id('user')
+        assert subs.get_by_user_id('user') == {q}
 
     subs = event_bus._subscribers
     assert room_id not in subs._subscribers_by_room_id or q not in subs.get_by_room_id(room_id)
@@ -112,15 +111,87 @@ async def test_bus_publish_to_a_single_target():
 
 
 @pytest.mark.asyncio
-async def test_bus_publish_to_a_single_non_existant_target():
+async def test_bus_publish_to_a_single_non_existant_target_should_drop_the_event():
     event_bus = EventBus()
-    with pytest.raises(ValueError):
+    room_id = 0
+
+    async with event_bus.subscribe(room_id, "user") as q:
         await event_bus.publish(
             BaseEvent(
-                room_id=0,
+                room_id=room_id,
                 type="event",
                 seq=1,
                 data={},
                 target_id="-unknown-user"
             )
         )
+        event_bus.deliver_batch([BaseEvent(room_id=room_id, type="event", seq=2, target_id="-unknown-user")])
+
+        assert q.empty()
+
+
+@pytest.mark.asyncio
+async def test_event_bus_deliver_should_iterate_the_subscribers_it_started_with():
+    event_bus = EventBus()
+    room_id = 1
+
+    async with event_bus.subscribe(room_id, "user1") as q1:
+        queues = event_bus._subscribers.get_by_room_id(room_id)
+        async with event_bus.subscribe(room_id, "user2") as q2:
+            assert queues == {q1}
+            assert event_bus._subscribers.get_by_room_id(room_id) == {q1, q2}
+
+            event = BaseEvent(room_id=room_id, type="event", seq=1)
+            event_bus.deliver(event)
+
+            assert q1.get_nowait() is event
+            assert q2.get_nowait() is event
+
+
+@pytest.mark.asyncio
+async def test_event_bus_publish_batch_should_put_one_item_per_subscriber():
+    event_bus = EventBus()
+    room_id = 1
+
+    async with event_bus.subscribe(room_id, "user1") as q1:
+        async with event_bus.subscribe(room_id, "user2") as q2:
+            events = [
+                BaseEvent(room_id=room_id, type="event", seq=1),
+                BaseEvent(room_id=room_id, type="event", seq=2, target_id="user1"),
+                BaseEvent(room_id=room_id, type="event", seq=3),
+            ]
+            await event_bus.publish_batch(events)
+
+            assert q1.get_nowait() == events
+            assert q2.get_nowait() == [events[0], events[2]]
+            assert q1.empty() and q2.empty()
+
+
+@pytest.mark.asyncio
+async def test_event_bus_deliver_batch_should_put_a_single_event_as_is():
+    event_bus = EventBus()
+    room_id = 1
+
+    async with event_bus.subscribe(room_id, "user") as q:
+        event = BaseEvent(room_id=room_id, type="event", seq=1)
+        event_bus.deliver_batch([event])
+
+        assert q.get_nowait() is event
+
+
+@pytest.mark.asyncio
+async def test_bus_should_deliver_targeted_events_to_every_connection_of_the_user():
+    event_bus = EventBus()
+    room_id = 1
+
+    async with event_bus.subscribe(room_id, "user") as q1:
+        async with event_bus.subscribe(room_id, "user") as q2:
+            event = BaseEvent(room_id=room_id, type="event", seq=1, target_id="user")
+            event_bus.deliver(event)
+            event_bus.deliver_batch([event, BaseEvent(room_id=room_id, type="event", seq=2)])
+
+            assert q1.get_nowait() is event and q2.get_nowait() is event
+            assert len(q1.get_nowait()) == 2 and len(q2.get_nowait()) == 2
+
+        event_bus.deliver(event)
+        assert q1.get_nowait() is event
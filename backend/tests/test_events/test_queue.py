@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from backend.domain.events import BaseEvent, GameEvent, RoomEvent
+from backend.events.queue import SubscriberQueue, OverflowPolicy, QueueStats
+
+
+def build_event(seq: int, event_type: str = RoomEvent.MESSAGE_SENT) -> BaseEvent:
+    return BaseEvent(room_id=1, seq=seq, type=event_type)
+
+
+@pytest.mark.asyncio
+async def test_subscriber_queue_should_drop_the_oldest_item_when_full():
+    stats = QueueStats()
+    queue = SubscriberQueue(2, OverflowPolicy.DROP_OLDEST, stats)
+    events = [build_event(seq) for seq in range(1, 4)]
+
+    for e in events:
+        queue.put_nowait(e)
+
+    assert [queue.get_nowait(), queue.get_nowait()] == events[1:]
+    assert stats == QueueStats(dropped=1)
+
+
+@pytest.mark.asyncio
+async def test_subscriber_queue_should_evict_the_subscriber_when_full():
+    stats = QueueStats()
+    queue = SubscriberQueue(2, OverflowPolicy.DISCONNECT, stats)
+
+    for seq in range(1, 5):
+        queue.put_nowait(build_event(seq))
+
+    assert queue.evicted
+    assert queue.get_nowait() is SubscriberQueue.EVICTED
+    assert queue.empty()
+    assert stats == QueueStats(evicted=1)
+
+
+@pytest.mark.asyncio
+async def test_subscriber_queue_should_replace_a_queued_latest_wins_event():
+    stats = QueueStats()
+    queue = SubscriberQueue(10, OverflowPolicy.DISCONNECT, stats)
+    update_1 = build_event(1, GameEvent.GAME_STATE_UPDATE)
+    message = build_event(2)
+    update_2 = build_event(3, GameEvent.GAME_STATE_UPDATE)
+
+    queue.put_nowait(update_1)
+    queue.put_nowait(message)
+    queue.put_nowait(update_2)
+
+    assert [queue.get_nowait(), queue.get_nowait()] == [message, update_2]
+    assert queue.empty()
+    assert stats == QueueStats(coalesced=1)
+
+
+@pytest.mark.asyncio
+async def test_subscriber_queue_should_remove_a_superseded_event_from_a_batch():
+    stats = QueueStats()
+    queue = SubscriberQueue(10, OverflowPolicy.DISCONNECT, stats)
+    message = build_event(1)
+    update_1 = build_event(2, GameEvent.GAME_STATE_UPDATE)
+    update_2 = build_event(3, GameEvent.GAME_STATE_UPDATE)
+    init = build_event(4, GameEvent.GAME_INIT)
+
+    queue.put_nowait([message, update_1])
+    queue.put_nowait([update_2, init])
+
+    assert queue.get_nowait() == [message]
+    assert queue.get_nowait() == [update_2, init]
+    assert stats == QueueStats(coalesced=1)
+
+
+@pytest.mark.asyncio
+async def test_subscriber_queue_should_not_replace_a_latest_wins_event_already_handed_out():
+    queue = SubscriberQueue(10, OverflowPolicy.DISCONNECT, QueueStats())
+    update_1 = build_event(1, GameEvent.GAME_STATE_UPDATE)
+    update_2 = build_event(2, GameEvent.GAME_STATE_UPDATE)
+
+    queue.put_nowait(update_1)
+    assert queue.get_nowait() is update_1
+    queue.put_nowait(update_2)
+
+    assert queue.get_nowait() is update_2
+
+
+@pytest.mark.asyncio
+async def test_subscriber_queue_should_make_room_by_replacing_a_latest_wins_event():
+    stats = QueueStats()
+    queue = SubscriberQueue(2, OverflowPolicy.DISCONNECT, stats)
+
+    queue.put_nowait(build_event(1, GameEvent.GAME_STATE_UPDATE))
+    queue.put_nowait(build_event(2))
+    queue.put_nowait(build_event(3, GameEvent.GAME_STATE_UPDATE))
+
+    assert not queue.evicted
+    assert [queue.get_nowait().seq, queue.get_nowait().seq] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_subscriber_queue_should_keep_every_event_without_latest_wins_types():
+    queue = SubscriberQueue(10, OverflowPolicy.DISCONNECT, QueueStats(), latest_wins=frozenset())
+
+    queue.put_nowait(build_event(1, GameEvent.GAME_STATE_UPDATE))
+    queue.put_nowait(build_event(2, GameEvent.GAME_STATE_UPDATE))
+
+    assert queue.qsize() == 2
+
+
+@pytest.mark.asyncio
+async def test_subscriber_queue_should_wake_a_waiting_consumer():
+    queue = SubscriberQueue(10, OverflowPolicy.DISCONNECT, QueueStats())
+    event = build_event(1)
+
+    getter = asyncio.create_task(queue.get())
+    await asyncio.sleep(0)
+    assert not getter.done()
+    queue.put_nowait(event)
+
+    assert await asyncio.wait_for(getter, timeout=1) is event
+
+
+@pytest.mark.asyncio
+async def test_subscriber_queue_should_wait_once_emptied_without_awaiting():
+    queue = SubscriberQueue(10, OverflowPolicy.DISCONNECT, QueueStats())
+    queue.put_nowait(build_event(1))
+    queue.get_nowait()
+
+    getter = asyncio.create_task(queue.get())
+    await asyncio.sleep(0)
+    assert not getter.done()
+    getter.cancel()
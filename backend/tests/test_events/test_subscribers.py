@@ -18,7 +18,7 @@ def test_subscribers_should_add_subscribers_to_store():
         queue,
     )
     assert subscribers._subscribers_by_room_id.get(1) == {queue}
-    assert subscribers._subscribers_by_user_id.get('user') == queue
+    assert subscribers._subscribers_by_user_id.get('user') == {queue}
 
 
 def test_subscribers_get_by_room_id_should_return_a_set_of_queues():
@@ -37,7 +37,7 @@ def test_subscribers_get_by_room_id_should_raise_key_error_if_the_room_id_does_n
     assert subscribers.get_by_room_id(0) == set()
 
 
-def test_subscribers_get_by_user_id_should_return_a_queue():
+def test_subscribers_get_by_user_id_should_return_a_set_of_queues():
     subscibers = QueueSubscribers[int]()
     queue = asyncio.Queue()
     subscibers.add(
@@ -45,12 +45,12 @@ def test_subscribers_get_by_user_id_should_return_a_queue():
         "user",
         queue
     )
-    assert subscibers.get_by_user_id("user")
+    assert subscibers.get_by_user_id("user") == {queue}
 
 
-def test_subscribers_get_by_user_id_should_raise_key_error_if_the_user_id_does_not_exist():
+def test_subscribers_get_by_user_id_should_return_an_empty_set_if_the_user_id_does_not_exist():
     subscribers = QueueSubscribers[int]()
-    assert subscribers.get_by_user_id("0") is None
+    assert subscribers.get_by_user_id("0") == set()
 
 
 def test_remove_subscriber():
@@ -80,3 +80,37 @@ def test_remove_subscriber():
 
     assert len(subscribers._subscribers_by_user_id) == 0
     assert len(subscribers._subscribers_by_room_id) == 0
+
+
+def test_subscribers_should_swap_the_room_set_instead_of_mutating_it():
+    subscribers = QueueSubscribers[int]()
+    queue1 = asyncio.Queue()
+    queue2 = asyncio.Queue()
+    room_id = 0
+
+    subscribers.add(room_id, "user1", queue1)
+    snapshot = subscribers.get_by_room_id(room_id)
+    subscribers.add(room_id, "user2", queue2)
+    subscribers.remove(room_id, "user1", queue1)
+
+    assert isinstance(snapshot, frozenset)
+    assert snapshot == {queue1}
+    assert subscribers.get_by_room_id(room_id) == {queue2}
+
+
+def test_subscribers_should_keep_every_connection_of_a_user():
+    subscribers = QueueSubscribers[int]()
+    queue1 = asyncio.Queue()
+    queue2 = asyncio.Queue()
+    room_id = 0
+
+    subscribers.add(room_id, "user", queue1)
+    subscribers.add(room_id, "user", queue2)
+    assert subscribers.get_by_user_id("user") == {queue1, queue2}
+
+    subscribers.remove(room_id, "user", queue1)
+    assert subscribers.get_by_user_id("user") == {queue2}
+    assert subscribers.get_by_room_id(room_id) == {queue2}
+
+    subscribers.remove(room_id, "user", queue2)
+    assert subscribers._subscribers_by_user_id == {}
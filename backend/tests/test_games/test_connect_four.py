@@ -2,13 +2,12 @@ import pytest
 import time_machine
 from flexmock import flexmock
 
-from backend.domain.events import BaseEvent, GameEvent
+from backend.domain.events import BaseEvent, GameEvent, EventDraft
 from backend.games.abstract import GameException, GameExceptionType, GameStatus, GamePlayer
 from backend.games.connect_four import game as connect_four
 from backend.games.connect_four.game import ConnectFour
 from backend.games.connect_four.schemas import ConnectFourActionData
 from backend.models.game_room_model import GameRoomModel
-from backend.utils.future import build_future
 
 
 @pytest.fixture(scope="function")
@@ -68,16 +67,11 @@ async def test_connect_four_handle_game_start_event(
     current_player = 1
 
     flexmock(connect_four).should_receive("randint").and_return(current_player)
-    flexmock(game).should_receive(
-        "send_game_started_events"
-    ).with_args(actor_id="player1").and_return(
-        build_future(None)).once()
-
     await game.add_player("player1")
     await game.add_player("player2")
 
-    assert mock_event_bus.should_receive("publish").with_args(
-        event=BaseEvent(
+    mock_event_bus.should_receive("deliver_batch").with_args([
+        BaseEvent(
             type=GameEvent.GAME_STATE_UPDATE,
             seq=2,
             actor_id="player1",
@@ -89,8 +83,24 @@ async def test_connect_four_handle_game_start_event(
                 'current_player': 1,
                 'winning_positions': None
             },
-        )
-    ).once().and_return(build_future(None))
+        ),
+        BaseEvent(
+            type=GameEvent.GAME_INIT,
+            seq=3,
+            actor_id="player1",
+            target_id="player1",
+            room_id=game_room.id,
+            data={"player": 1},
+        ),
+        BaseEvent(
+            type=GameEvent.GAME_INIT,
+            seq=4,
+            actor_id="player1",
+            target_id="player2",
+            room_id=game_room.id,
+            data={"player": 2},
+        ),
+    ]).once()
 
     await game.handle_event(
         BaseEvent(
@@ -115,10 +125,7 @@ async def test_connect_four_handle_game_start_event_twice_raises(
     await game.add_player('player1')
     await game.add_player('player2')
 
-    flexmock(game).should_receive(
-        "send_game_started_events"
-    ).with_args(actor_id="player1").and_return(
-        build_future(None)).once()
+    mock_event_bus.should_receive("deliver_batch").once()
 
     await game.handle_event(
         BaseEvent(
@@ -154,13 +161,7 @@ async def test_connect_four_handle_player_action(
     game = ConnectFour(game_room=game_room, event_store=mock_event_store, event_bus=mock_event_bus)
     flexmock(connect_four).should_receive("randint").and_return(1)
 
-    flexmock(game).should_receive(
-        "send_game_started_events"
-    ).with_args(
-        actor_id="player1"
-    ).and_return(
-        build_future(None)
-    ).once()
+    mock_event_bus.should_receive("deliver_batch").once()
 
     await game.add_player('player1')
     await game.add_player('player2')
@@ -176,10 +177,10 @@ async def test_connect_four_handle_player_action(
     assert game.state.status == GameStatus.ongoing
     assert game.state.current_player == 1
 
-    assert mock_event_bus.should_receive("publish").with_args(
-        event=BaseEvent(
+    assert mock_event_bus.should_receive("deliver").with_args(
+        BaseEvent(
             type=GameEvent.GAME_STATE_UPDATE,
-            seq=3,
+            seq=5,
             actor_id="player1",
             room_id=game_room.id,
             data={
@@ -197,7 +198,7 @@ async def test_connect_four_handle_player_action(
                 'winning_positions': None
             },
         )
-    ).once().and_return(build_future(None))
+    ).once()
 
     await game.handle_event(
         BaseEvent(
@@ -245,10 +246,7 @@ async def test_connect_four_handle_player_action_out_of_turn(
     game = ConnectFour(game_room=game_room, event_store=mock_event_store, event_bus=mock_event_bus)
     flexmock(connect_four).should_receive("randint").and_return(1)
 
-    flexmock(game).should_receive(
-        "send_game_started_events"
-    ).with_args(actor_id="player1").and_return(
-        build_future(None)).once()
+    mock_event_bus.should_receive("deliver_batch").once()
 
     await game.add_player('player1')
     await game.add_player('player2')
@@ -290,10 +288,7 @@ async def test_connect_four_handle_player_action_column_full(
     game = ConnectFour(game_room=game_room, event_store=mock_event_store, event_bus=mock_event_bus)
     flexmock(connect_four).should_receive("randint").and_return(1)
 
-    flexmock(game).should_receive(
-        "send_game_started_events"
-    ).with_args(actor_id="player1").and_return(
-        build_future(None)).once()
+    mock_event_bus.should_receive("deliver_batch").once()
 
     await game.add_player('player1')
     await game.add_player('player2')
@@ -369,10 +364,7 @@ async def test_connect_four_handle_player_action_invalid_column(
 ):
     game = ConnectFour(game_room=game_room, event_store=mock_event_store, event_bus=mock_event_bus)
     flexmock(connect_four).should_receive("randint").and_return(1)
-    flexmock(game).should_receive(
-        "send_game_started_events"
-    ).with_args(actor_id="player1").and_return(
-        build_future(None)).once()
+    mock_event_bus.should_receive("deliver_batch").once()
 
     await game.add_player("player1")
     await game.add_player("player2")
@@ -471,10 +463,7 @@ async def test_connect_four_handle_player_action_winning_move(
 ):
     game = ConnectFour(game_room=game_room, event_store=mock_event_store, event_bus=mock_event_bus)
     flexmock(connect_four).should_receive("randint").and_return(1)
-    flexmock(game).should_receive(
-        "send_game_started_events"
-    ).with_args(actor_id="player1").and_return(
-        build_future(None)).once()
+    mock_event_bus.should_receive("deliver_batch").once()
 
     await game.add_player("player1")
     await game.add_player("player2")
@@ -499,10 +488,10 @@ async def test_connect_four_handle_player_action_winning_move(
         [0, 0, 0, 1, 2, 0, 0],
     ]
 
-    assert mock_event_bus.should_receive("publish").with_args(
-        event=BaseEvent(
+    assert mock_event_bus.should_receive("deliver").with_args(
+        BaseEvent(
             type=GameEvent.GAME_STATE_UPDATE,
-            seq=3,
+            seq=5,
             actor_id="player1",
             room_id=game_room.id,
             data={
@@ -520,7 +509,7 @@ async def test_connect_four_handle_player_action_winning_move(
                 'winning_positions': [[3, 3], [2, 3], [1, 3], [0, 3]]
             },
         )
-    ).once().and_return(build_future(None))
+    ).once()
 
     await game.handle_event(
         BaseEvent(
@@ -546,10 +535,7 @@ async def test_connect_four_handle_player_action_draw_move(
     game = ConnectFour(game_room=game_room, event_store=mock_event_store, event_bus=mock_event_bus)
     flexmock(connect_four).should_receive("randint").and_return(2)
 
-    flexmock(game).should_receive(
-        "send_game_started_events"
-    ).with_args(actor_id="player1").and_return(
-        build_future(None)).once()
+    mock_event_bus.should_receive("deliver_batch").once()
 
     await game.add_player("player1")
     await game.add_player("player2")
@@ -574,10 +560,10 @@ async def test_connect_four_handle_player_action_draw_move(
         [2, 1, 2, 2, 2, 1, 2],
     ]
 
-    assert mock_event_bus.should_receive("publish").with_args(
-        event=BaseEvent(
+    assert mock_event_bus.should_receive("deliver").with_args(
+        BaseEvent(
             type=GameEvent.GAME_STATE_UPDATE,
-            seq=3,
+            seq=5,
             actor_id="player2",
             room_id=game_room.id,
             data={
@@ -595,7 +581,7 @@ async def test_connect_four_handle_player_action_draw_move(
                 'winning_positions': None
             },
         )
-    ).once().and_return(build_future(None))
+    ).once()
 
     await game.handle_event(
         BaseEvent(
@@ -681,8 +667,7 @@ async def test_handle_unknown_event_type_raises(
     assert exc_info.value.exception_type == GameExceptionType.unknown_action
 
 
-@pytest.mark.asyncio
-async def test_send_game_started_event_should_dispatch_one_event_per_player(
+def test_game_started_events_should_target_one_event_per_player(
         mock_event_store,
         mock_event_bus
 ):
@@ -695,54 +680,62 @@ async def test_send_game_started_event_should_dispatch_one_event_per_player(
         event_store=mock_event_store,
         event_bus=mock_event_bus
     )
-    await game.add_player('player1')
-    await game.add_player('player2')
+    game.players = {
+        0: GamePlayer(id=0, user_id='player1', status='joined'),
+        1: GamePlayer(id=1, user_id='player2', status='joined'),
+    }
+
+    assert game.game_started_events(actor_id='admin') == [
+        EventDraft(
+            type=GameEvent.GAME_INIT,
+            actor_id='admin',
+            target_id='player1',
+            data={"player": 1},
+        ),
+        EventDraft(
+            type=GameEvent.GAME_INIT,
+            actor_id='admin',
+            target_id='player2',
+            data={"player": 2},
+        ),
+    ]
 
-    mock_event_store.should_receive("append").with_args(
-        room_id=game_room.id,
-        event_type=GameEvent.GAME_INIT,
-        actor_id='admin',
-        target_id='player1',
-        data={
-            "player": 1
-        },
-    ).and_return(
-        build_future(
-            BaseEvent(
-                type=GameEvent.GAME_INIT,
-                seq=1,
-                actor_id='admin',
-                room_id=game_room.id,
-                target_id='player1',
-                data={"player": 1},
-            )
-        )
-    ).once()
 
-    mock_event_store.should_receive("append").with_args(
-        room_id=game_room.id,
-        event_type=GameEvent.GAME_INIT,
-        actor_id='admin',
-        target_id='player2',
-        data={
-            "player": 2
-        },
-    ).and_return(
-        build_future(
-            BaseEvent(
-                type=GameEvent.GAME_INIT,
-                seq=2,
-                actor_id='admin',
-                room_id=game_room.id,
-                target_id='player2',
-                data={"player": 2},
+@pytest.mark.asyncio
+async def test_game_start_should_commit_the_state_update_and_game_init_events_as_one_batch(
+        game_room,
+        mock_event_store,
+        mock_event_bus,
+):
+    game = ConnectFour(game_room=game_room, event_store=mock_event_store, event_bus=mock_event_bus)
+    await game.add_player("player1")
+    await game.add_player("player2")
+
+    mock_event_store.should_call("commit_many").once()
+    mock_event_bus.should_receive("deliver").never()
+
+    async with mock_event_bus.subscribe(game_room.id, "player1") as q1:
+        async with mock_event_bus.subscribe(game_room.id, "player2") as q2:
+            await game.handle_event(
+                BaseEvent(
+                    type=GameEvent.GAME_START,
+                    seq=0,
+                    actor_id="player1",
+                    room_id=game_room.id,
+                ),
             )
-        )
-    ).once()
 
-    mock_event_bus.should_receive("publish").replace_with(lambda *_, **__: build_future(None)).twice()
+            batch_1 = q1.get_nowait()
+            batch_2 = q2.get_nowait()
 
-    await game.send_game_started_events(actor_id='admin')
+    assert [(e.type, e.target_id) for e in batch_1] == [
+        (GameEvent.GAME_STATE_UPDATE, None),
+        (GameEvent.GAME_INIT, "player1"),
+    ]
+    assert [(e.type, e.target_id) for e in batch_2] == [
+        (GameEvent.GAME_STATE_UPDATE, None),
+        (GameEvent.GAME_INIT, "player2"),
+    ]
 
 
 @pytest.mark.asyncio
@@ -778,10 +771,7 @@ async def test_cannot_start_a_restarted_game_if_not_enough_players(
     await game.add_player("player2")
 
     flexmock(connect_four).should_receive("randint").and_return(1)
-    flexmock(game).should_receive(
-        "send_game_started_events"
-    ).with_args(actor_id="player1").and_return(
-        build_future(None)).once()
+    mock_event_bus.should_receive("deliver_batch").once()
 
     await game.handle_event(
         BaseEvent(
@@ -826,10 +816,7 @@ async def test_can_reset_a_finished_game(
     await game.add_player("player2")
 
     flexmock(connect_four).should_receive("randint").and_return(1)
-    flexmock(game).should_receive(
-        "send_game_started_events"
-    ).with_args(actor_id="player1").and_return(
-        build_future(None)).once()
+    mock_event_bus.should_receive("deliver_batch").once()
 
     await game.handle_event(
         BaseEvent(
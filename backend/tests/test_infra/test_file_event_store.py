@@ -0,0 +1,192 @@
+import asyncio
+import threading
+
+import pytest
+import pytest_asyncio
+from flexmock import flexmock
+
+from backend.infra import file_event_store
+from backend.infra.file_event_store import FileEventStore, FsyncPolicy, SEGMENT_SUFFIX
+
+
+@pytest_asyncio.fixture()
+async def event_store(tmp_path):
+    store = FileEventStore(tmp_path, fsync_policy=FsyncPolicy.NEVER)
+    yield store
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_append_to_file_event_store_returning_the_event(event_store):
+    room_id = 1
+
+    event = await event_store.append(
+        room_id=room_id,
+        event_type="event",
+        data={"key": "value"},
+        actor_id="actor",
+        target_id="target",
+    )
+
+    assert event.seq == 1
+    assert await event_store.read_from(room_id) == ([event], 1)
+
+
+@pytest.mark.asyncio
+async def test_read_from_file_event_store_with_limit_and_after_seq(event_store):
+    room_id = 1
+
+    events = [await event_store.append(room_id, "event") for _ in range(5)]
+
+    assert await event_store.read_from(room_id, after_seq=1, limit=2) == (events[1:3], 5)
+    assert await event_store.read_from(room_id, limit=2) == (events[3:], 5)
+    assert await event_store.read_from(room_id, after_seq=5) == ([], 5)
+
+
+@pytest.mark.asyncio
+async def test_get_last_seq_for_file_event_store(event_store):
+    room_id = 1
+
+    assert await event_store.last_seq(room_id) == 0
+
+    await event_store.append(room_id, "event")
+    await event_store.append(room_id + 1, "event")
+    assert await event_store.last_seq(room_id) == 1
+
+
+@pytest.mark.asyncio
+async def test_file_event_store_should_recover_events_after_restart(tmp_path):
+    room_id = 1
+    store = FileEventStore(tmp_path, fsync_policy=FsyncPolicy.ALWAYS)
+    events = [await store.append(room_id, "event", data={"index": i}) for i in range(3)]
+    await store.close()
+
+    store = FileEventStore(tmp_path, fsync_policy=FsyncPolicy.ALWAYS)
+    assert await store.read_from(room_id) == (events, 3)
+
+    event = await store.append(room_id, "event")
+    assert event.seq == 4
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_file_event_store_should_roll_segments(tmp_path):
+    room_id = 1
+    store = FileEventStore(tmp_path, fsync_policy=FsyncPolicy.NEVER, max_segment_bytes=256)
+    events = [await store.append(room_id, "event") for _ in range(10)]
+
+    segments = sorted((tmp_path / str(room_id)).glob(f"*{SEGMENT_SUFFIX}"))
+    assert len(segments) > 1
+    assert await store.read_from(room_id, after_seq=2, limit=6) == (events[2:8], 10)
+    await store.close()
+
+    store = FileEventStore(tmp_path, fsync_policy=FsyncPolicy.NEVER, max_segment_bytes=256)
+    assert await store.read_from(room_id) == (events, 10)
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_file_event_store_should_truncate_a_torn_record(tmp_path):
+    room_id = 1
+    store = FileEventStore(tmp_path, fsync_policy=FsyncPolicy.NEVER)
+    event = await store.append(room_id, "event")
+    await store.append(room_id, "event")
+    await store.close()
+
+    segment = next((tmp_path / str(room_id)).glob(f"*{SEGMENT_SUFFIX}"))
+    segment.write_bytes(segment.read_bytes()[:-3])
+
+    store = FileEventStore(tmp_path, fsync_policy=FsyncPolicy.NEVER)
+    assert await store.read_from(room_id) == ([event], 1)
+    assert (await store.append(room_id, "event")).seq == 2
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_file_event_store_fsyncs_every_event_with_always_policy(tmp_path):
+    store = FileEventStore(tmp_path, fsync_policy=FsyncPolicy.ALWAYS)
+    flexmock(file_event_store.os).should_call("fsync").twice()
+
+    await store.append(1, "event")
+    await store.append(1, "event")
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_file_event_store_fsyncs_dirty_segments_on_flush_with_interval_policy(tmp_path):
+    store = FileEventStore(tmp_path, fsync_policy=FsyncPolicy.INTERVAL, fsync_interval_ms=60_000)
+    flexmock(file_event_store.os).should_call("fsync").twice()
+
+    await store.append(1, "event")
+    await store.append(1, "event")
+    await store.append(2, "event")
+    await store.flush()
+    await store.flush()
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_archive_file_event_store_room_should_drop_its_index(event_store):
+    room_id = 1
+    events = [await event_store.append(room_id, "event") for _ in range(3)]
+
+    assert event_store.resident_rooms() == [room_id]
+    assert await event_store.archive(room_id)
+    assert event_store.resident_rooms() == []
+
+    assert await event_store.read_from(room_id) == (events, 3)
+    assert (await event_store.append(room_id, "event")).seq == 4
+
+
+@pytest.mark.asyncio
+async def test_file_event_store_does_not_close_a_segment_sealed_while_it_is_fsynced(tmp_path):
+    store = FileEventStore(tmp_path, fsync_policy=FsyncPolicy.INTERVAL, fsync_interval_ms=60_000, max_segment_bytes=1)
+    await store.append(1, "event")
+    [segment] = store._rooms[1].segments
+    fsync_started = threading.Event()
+    release_fsync = threading.Event()
+
+    def blocking_fsync():
+        fsync_started.set()
+        release_fsync.wait()
+
+    flexmock(segment).should_receive("fsync").replace_with(blocking_fsync).once()
+    flush_task = asyncio.create_task(store.flush())
+    await asyncio.to_thread(fsync_started.wait)
+
+    try:
+        # The next record does not fit, the segment being fsynced is sealed
+        await store.append(1, "event")
+        assert segment.sealed
+        assert segment._fd is not None
+    finally:
+        release_fsync.set()
+        await flush_task
+    assert segment._fd is None
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_file_event_store_close_waits_for_the_fsync_in_progress(tmp_path):
+    store = FileEventStore(tmp_path, fsync_policy=FsyncPolicy.INTERVAL, fsync_interval_ms=1)
+    await store.append(1, "event")
+    [segment] = store._rooms[1].segments
+    fsync_started = threading.Event()
+    release_fsync = threading.Event()
+
+    def blocking_fsync():
+        fsync_started.set()
+        release_fsync.wait()
+
+    flexmock(segment).should_receive("fsync").replace_with(blocking_fsync).once()
+    await asyncio.to_thread(fsync_started.wait)
+    close_task = asyncio.create_task(store.close())
+
+    try:
+        await asyncio.sleep(0.01)
+        assert not close_task.done()
+        assert segment._fd is not None
+    finally:
+        release_fsync.set()
+        await close_task
+    assert segment._fd is None
@@ -1,6 +1,13 @@
+import asyncio
+from datetime import timedelta
+
 import pytest
+from flexmock import flexmock
 
-from backend.infra.memory_event_store import MemoryEventStore
+from backend.domain.events import EventDraft, RoomEvent
+from backend.events.bus import EventBus
+from backend.infra.event_store import RetentionPolicy
+from backend.infra.memory_event_store import MemoryEventStore, ARCHIVE_SUFFIX
 
 
 def test_memory_event_store_should_initialize():
@@ -20,11 +27,28 @@ async def test_append_to_memory_event_store_returning_the_event():
     )
 
     assert len(event_store._events[room_id]) == 1
-    assert event_store._events[room_id] == [
+    assert [e.to_event(room_id) for e in event_store._events[room_id]] == [
         event
     ]
 
 
+@pytest.mark.asyncio
+async def test_memory_event_store_should_store_compact_records():
+    event_store = MemoryEventStore()
+    room_id = 1
+
+    first = await event_store.append(room_id, RoomEvent.PLAYER_JOINED, actor_id="".join(["us", "er"]))
+    second = await event_store.append(room_id, "custom", data={"key": "value"}, actor_id="".join(["us", "er"]))
+
+    record_1, record_2 = event_store._events[room_id]
+    assert not hasattr(record_1, "__dict__")
+    assert record_1.data is None
+    assert record_1.type is RoomEvent.PLAYER_JOINED
+    assert record_1.actor_id is record_2.actor_id
+    assert record_2.data == {"key": "value"}
+    assert await event_store.read_from(room_id) == ([first, second], 2)
+
+
 @pytest.mark.asyncio
 async def test_read_from_memory_event_store():
     event_store = MemoryEventStore()
@@ -112,6 +136,340 @@ async def test_append_event_with_target_id():
 
     assert event.target_id == "target_user"
     assert len(event_store._events[room_id]) == 1
-    assert event_store._events[room_id] == [
+    assert [e.to_event(room_id) for e in event_store._events[room_id]] == [
         event
     ]
+
+
+@pytest.mark.asyncio
+async def test_read_from_memory_event_store_after_the_last_seq():
+    event_store = MemoryEventStore()
+    room_id = 1
+
+    await event_store.append(room_id, "event")
+    await event_store.append(room_id, "event")
+
+    assert await event_store.read_from(room_id=room_id, after_seq=2) == ([], 2)
+    assert await event_store.read_from(room_id=room_id, after_seq=10) == ([], 2)
+
+
+@pytest.mark.asyncio
+async def test_read_from_memory_event_store_with_negative_after_seq():
+    event_store = MemoryEventStore()
+    room_id = 1
+
+    event = await event_store.append(room_id, "event")
+
+    assert await event_store.read_from(room_id=room_id, after_seq=-1) == ([event], 1)
+
+
+@pytest.mark.asyncio
+async def test_iter_from_memory_event_store_should_page_through_events():
+    event_store = flexmock(MemoryEventStore())
+    room_id = 1
+
+    events = [await event_store.append(room_id, "event") for _ in range(5)]
+    event_store.should_call("read_from").times(3)
+
+    result = [e async for e in event_store.iter_from(room_id, after_seq=0, page_size=2)]
+
+    assert result == events
+
+
+@pytest.mark.asyncio
+async def test_iter_from_memory_event_store_starting_at_seq():
+    event_store = MemoryEventStore()
+    room_id = 1
+
+    events = [await event_store.append(room_id, "event") for _ in range(3)]
+
+    result = [e async for e in event_store.iter_from(room_id, after_seq=1)]
+
+    assert result == events[1:]
+
+
+@pytest.mark.asyncio
+async def test_commit_should_append_the_event_and_deliver_it_to_the_bus():
+    event_store = MemoryEventStore()
+    event_bus = EventBus()
+    room_id = 1
+
+    async with event_bus.subscribe(room_id, "user") as q:
+        event = await event_store.commit(room_id, "event", data={"key": "value"}, event_bus=event_bus)
+
+        assert [e.to_event(room_id) for e in event_store._events[room_id]] == [event]
+        assert q.get_nowait() is event
+
+
+@pytest.mark.asyncio
+async def test_concurrent_commits_should_be_delivered_in_seq_order():
+    event_store = MemoryEventStore()
+    event_bus = EventBus()
+    room_id = 1
+
+    async with event_bus.subscribe(room_id, "user") as q:
+        await asyncio.gather(*[
+            event_store.commit(room_id, "event", event_bus=event_bus) for _ in range(10)
+        ])
+
+        assert [q.get_nowait().seq for _ in range(10)] == list(range(1, 11))
+
+
+@pytest.mark.asyncio
+async def test_append_many_should_assign_contiguous_seqs():
+    event_store = MemoryEventStore()
+    room_id = 1
+
+    await event_store.append(room_id, "event")
+    events = await event_store.append_many(room_id, [
+        EventDraft("first", data={"key": "value"}),
+        EventDraft("second", target_id="user"),
+    ])
+
+    assert [e.seq for e in events] == [2, 3]
+    assert [e.type for e in events] == ["first", "second"]
+    assert events[1].target_id == "user"
+    assert await event_store.read_from(room_id, after_seq=1) == (events, 3)
+
+
+@pytest.mark.asyncio
+async def test_commit_many_should_put_a_single_item_on_each_subscriber_queue():
+    event_store = MemoryEventStore()
+    event_bus = EventBus()
+    room_id = 1
+
+    async with event_bus.subscribe(room_id, "user1") as q1:
+        async with event_bus.subscribe(room_id, "user2") as q2:
+            events = await event_store.commit_many(room_id, [
+                EventDraft("broadcast"),
+                EventDraft("targeted", target_id="user2"),
+            ], event_bus=event_bus)
+
+            assert q1.get_nowait() == events[0]
+            assert q2.get_nowait() == events
+            assert q1.empty() and q2.empty()
+
+
+@pytest.mark.asyncio
+async def test_archive_memory_event_store_room_should_free_it_and_load_it_back(tmp_path):
+    event_store = MemoryEventStore(archive_dir=tmp_path)
+    room_id = 1
+
+    events = [
+        await event_store.append(room_id, RoomEvent.PLAYER_JOINED, data={"id": "user"}, actor_id="user"),
+        await event_store.append(room_id, "custom", target_id="user"),
+    ]
+
+    assert await event_store.archive(room_id)
+    assert room_id not in event_store._events
+    assert room_id not in event_store._locks
+    assert event_store.resident_rooms() == []
+
+    assert await event_store.read_from(room_id) == (events, 2)
+    assert event_store._events[room_id][0].type is RoomEvent.PLAYER_JOINED
+    assert (await event_store.append(room_id, "event")).seq == 3
+
+
+@pytest.mark.asyncio
+async def test_archive_memory_event_store_should_keep_the_blob_of_a_room_loaded_back(tmp_path):
+    event_store = MemoryEventStore(archive_dir=tmp_path)
+    room_id = 1
+    await event_store.append(room_id, "event")
+    assert await event_store.archive(room_id)
+
+    await event_store.read_from(room_id)
+
+    assert [p.name for p in event_store._archive_dir.iterdir()] == [f"{room_id}{ARCHIVE_SUFFIX}"]
+
+
+@pytest.mark.asyncio
+async def test_archive_memory_event_store_should_load_a_room_once_for_concurrent_accesses(tmp_path):
+    event_store = MemoryEventStore(archive_dir=tmp_path)
+    room_id = 1
+    await event_store.append(room_id, "event")
+    assert await event_store.archive(room_id)
+
+    _, appended = await asyncio.gather(event_store.read_from(room_id), event_store.append(room_id, "event"))
+
+    assert appended.seq == 2
+    assert [e.seq for e in (await event_store.read_from(room_id))[0]] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_memory_event_store_should_not_load_the_archives_of_a_previous_process(tmp_path):
+    event_store = MemoryEventStore(archive_dir=tmp_path)
+    room_id = 1
+    await event_store.append(room_id, "event")
+    assert await event_store.archive(room_id)
+
+    event_store = MemoryEventStore(archive_dir=tmp_path)
+
+    assert await event_store.read_from(room_id) == ([], 0)
+
+
+@pytest.mark.asyncio
+async def test_memory_event_store_close_should_remove_its_archives(tmp_path):
+    event_store = MemoryEventStore(archive_dir=tmp_path)
+    await event_store.append(1, "event")
+    assert await event_store.archive(1)
+
+    await event_store.close()
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_archive_memory_event_store_should_keep_the_lock_of_a_room_with_waiting_writers(tmp_path):
+    event_store = MemoryEventStore(archive_dir=tmp_path)
+    room_id = 1
+    await event_store.append(room_id, "event")
+
+    async with event_store._room_lock(room_id):
+        waiting = asyncio.create_task(event_store.append(room_id, "event"))
+        await asyncio.sleep(0)
+        archive = asyncio.create_task(event_store.archive(room_id))
+        await asyncio.sleep(0)
+    event, _ = await asyncio.gather(waiting, archive)
+
+    assert event.seq == 2
+    assert event_store._lock_users == {}
+    assert room_id not in event_store._locks
+    assert (await event_store.append(room_id, "event")).seq == 3
+
+
+@pytest.mark.asyncio
+async def test_archive_memory_event_store_without_archive_dir_should_keep_the_room():
+    event_store = MemoryEventStore()
+    room_id = 1
+
+    event = await event_store.append(room_id, "event")
+
+    assert not await event_store.archive(room_id)
+    assert await event_store.read_from(room_id) == ([event], 1)
+
+
+@pytest.mark.asyncio
+async def test_read_from_unknown_room_should_not_make_it_resident(tmp_path):
+    event_store = MemoryEventStore(archive_dir=tmp_path)
+
+    assert await event_store.read_from(1) == ([], 0)
+    assert event_store.resident_rooms() == []
+
+
+@pytest.mark.asyncio
+async def test_memory_event_store_should_trim_events_past_max_events_into_a_checkpoint():
+    event_store = MemoryEventStore(retention=RetentionPolicy(max_events=10))
+    room_id = 1
+
+    events = [
+        await event_store.append(room_id, RoomEvent.MESSAGE_SENT, data={"sender_id": "user", "value": str(i)})
+        for i in range(11)
+    ]
+
+    # Trimmed to 90% of the limit so the next appends do not compact again
+    assert [e.seq for e in event_store._events[room_id]] == list(range(3, 12))
+    checkpoint = await event_store.checkpoint(room_id)
+    assert checkpoint.last_seq == 2
+    assert [m.value for m in checkpoint.state.chat_messages] == ["0", "1"]
+
+    assert await event_store.last_seq(room_id) == 11
+    assert await event_store.read_from(room_id, after_seq=0, limit=2) == (events[2:4], 11)
+    assert await event_store.read_from(room_id, after_seq=9) == (events[9:], 11)
+    assert (await event_store.append(room_id, "event")).seq == 12
+
+
+@pytest.mark.asyncio
+async def test_memory_event_store_should_trim_events_past_max_bytes():
+    event_store = MemoryEventStore(retention=RetentionPolicy(max_bytes=2000))
+    room_id = 1
+
+    for _ in range(50):
+        await event_store.append(room_id, "event", data={"value": "x" * 100})
+
+    assert sum(e.size() for e in event_store._events[room_id]) == event_store._sizes[room_id]
+    assert event_store._sizes[room_id] <= 2000
+    assert (await event_store.checkpoint(room_id)).last_seq == 50 - len(event_store._events[room_id])
+
+
+@pytest.mark.asyncio
+async def test_memory_event_store_should_trim_events_past_max_age():
+    event_store = MemoryEventStore(retention=RetentionPolicy(max_age=timedelta(minutes=5)))
+    room_id = 1
+
+    await event_store.append(room_id, "event")
+    event_store._events[room_id][0].ts_ms -= 10 * 60 * 1000
+    event = await event_store.append(room_id, "event")
+
+    assert await event_store.read_from(room_id) == ([event], 2)
+    assert (await event_store.checkpoint(room_id)).last_seq == 1
+
+
+@pytest.mark.asyncio
+async def test_archive_memory_event_store_room_should_keep_its_checkpoint(tmp_path):
+    event_store = MemoryEventStore(archive_dir=tmp_path, retention=RetentionPolicy(max_events=2))
+    room_id = 1
+
+    events = [await event_store.append(room_id, "event") for _ in range(3)]
+    checkpoint = await event_store.checkpoint(room_id)
+
+    assert await event_store.archive(room_id)
+    assert room_id not in event_store._checkpoints
+
+    assert await event_store.read_from(room_id) == (events[1:], 3)
+    assert await event_store.checkpoint(room_id) == checkpoint
+
+
+@pytest.mark.asyncio
+async def test_append_with_expected_seq_should_append_when_the_room_did_not_move_on():
+    event_store = MemoryEventStore()
+    room_id = 1
+
+    await event_store.append(room_id, "event", expected_seq=0)
+    events = await event_store.append_many(room_id, [EventDraft("event"), EventDraft("event")], expected_seq=1)
+
+    assert [e.seq for e in events] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_append_with_expected_seq_should_raise_a_conflict_when_the_room_moved_on():
+    event_store = MemoryEventStore()
+    room_id = 1
+
+    await event_store.append(room_id, "event")
+    await event_store.append(room_id, "event")
+
+    with pytest.raises(MemoryEventStore.SeqConflict):
+        await event_store.append(room_id, "event", expected_seq=1)
+    with pytest.raises(MemoryEventStore.SeqConflict):
+        await event_store.append_many(room_id, [EventDraft("event")], expected_seq=3)
+    assert await event_store.last_seq(room_id) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_appends_with_the_same_expected_seq_should_let_a_single_one_through():
+    event_store = MemoryEventStore()
+    room_id = 1
+
+    results = await asyncio.gather(
+        *[event_store.append(room_id, "event", expected_seq=0) for _ in range(5)],
+        return_exceptions=True,
+    )
+
+    assert len([r for r in results if isinstance(r, MemoryEventStore.SeqConflict)]) == 4
+    assert await event_store.last_seq(room_id) == 1
+
+
+@pytest.mark.asyncio
+async def test_commit_with_a_conflicting_expected_seq_should_not_deliver_anything():
+    event_store = MemoryEventStore()
+    event_bus = EventBus()
+    room_id = 1
+    await event_store.append(room_id, "event")
+
+    async with event_bus.subscribe(room_id, "user") as q:
+        with pytest.raises(MemoryEventStore.SeqConflict):
+            await event_store.commit(room_id, "event", event_bus=event_bus, expected_seq=0)
+        with pytest.raises(MemoryEventStore.SeqConflict):
+            await event_store.commit_many(room_id, [EventDraft("event")], event_bus=event_bus, expected_seq=0)
+
+        assert q.empty()
@@ -0,0 +1,65 @@
+from backend.domain.events import BaseEvent, RoomEvent, GameEvent
+from backend.infra.projections import Projection, handles, project
+
+
+class MessageCount(Projection):
+    def __init__(self) -> None:
+        self.count = 0
+
+    @handles(RoomEvent.MESSAGE_SENT)
+    def _message_sent(self, e: BaseEvent) -> None:
+        self.count += 1
+
+
+class SeenTypes(Projection):
+    def __init__(self) -> None:
+        self.types: list[RoomEvent | GameEvent | str] = []
+
+    @handles(RoomEvent.MESSAGE_SENT, GameEvent.GAME_START)
+    def _seen(self, e: BaseEvent) -> None:
+        self.types.append(e.type)
+
+
+class WeightedMessageCount(MessageCount):
+    @handles(RoomEvent.MESSAGE_SENT)
+    def _weighted_message_sent(self, e: BaseEvent) -> None:
+        self.count += 2
+
+    @handles(RoomEvent.ROOM_CLOSED)
+    def _room_closed(self, e: BaseEvent) -> None:
+        self.count = -self.count
+
+
+def events(*event_types: RoomEvent | GameEvent | str) -> list[BaseEvent]:
+    return [BaseEvent(room_id=0, seq=seq, type=t) for seq, t in enumerate(event_types, start=1)]
+
+
+def test_project_should_feed_every_projection_in_a_single_pass():
+    message_count = MessageCount()
+    seen_types = SeenTypes()
+
+    project(
+        events(RoomEvent.MESSAGE_SENT, GameEvent.GAME_START, RoomEvent.PLAYER_JOINED, RoomEvent.MESSAGE_SENT),
+        message_count,
+        seen_types,
+    )
+
+    assert message_count.count == 2
+    assert seen_types.types == [RoomEvent.MESSAGE_SENT, GameEvent.GAME_START, RoomEvent.MESSAGE_SENT]
+
+
+def test_projection_should_dispatch_plain_string_types_to_the_enum_handlers():
+    message_count = MessageCount()
+
+    project(events("message.sent", "unknown.type"), message_count)
+
+    assert message_count.count == 1
+
+
+def test_projection_subclass_should_inherit_and_override_handlers():
+    weighted = WeightedMessageCount()
+
+    project(events(RoomEvent.MESSAGE_SENT, RoomEvent.ROOM_CLOSED), weighted)
+
+    assert weighted.count == -2
+    assert RoomEvent.ROOM_CLOSED not in MessageCount._handlers
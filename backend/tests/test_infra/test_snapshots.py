@@ -1,9 +1,12 @@
 import pytest
+from flexmock import flexmock
 
 from backend.domain.events import BaseEvent, RoomEvent, GameEvent
 from backend.games.connect_four.schemas import ConnectFourPlayerData
+from backend.infra.event_store import RetentionPolicy
+from backend.infra.memory_event_store import MemoryEventStore
 from backend.infra.snapshots import SnapshotBuilderBase, SnapshotBase, SnapshotPlayer, RoomStatus, SnapshotChatMessage, \
-    PlayerStatus
+    PlayerStatus, SNAPSHOT_READ_PAGE_SIZE
 from backend.models.game_player_model import UserRole
 
 
@@ -222,3 +225,247 @@ async def test_snapshot_builder_returns_player_related_data_only_for_specified_u
     assert snapshot_user_1.player_data == ConnectFourPlayerData(
         player=1
     )
+
+
+@pytest.mark.asyncio
+async def test_build_from_store_should_return_the_snapshot_and_its_last_seq(snapshot_builder):
+    room_id = 0
+    store = MemoryEventStore()
+    await store.append(room_id, RoomEvent.PLAYER_JOINED, data={"id": "0", "user_name": "admin", "role": "admin"})
+    await store.append(room_id, RoomEvent.MESSAGE_SENT, data={"sender_id": "0", "value": "Hello"})
+
+    snapshot, last_seq = await snapshot_builder.build_from_store(room_id, store)
+
+    assert last_seq == 2
+    assert snapshot == SnapshotBase(
+        room_id=room_id,
+        players=[SnapshotPlayer(user_name="admin", id="0", role=UserRole.admin)],
+        chat_messages=[SnapshotChatMessage(sender_id="0", value="Hello")],
+    )
+
+
+@pytest.mark.asyncio
+async def test_build_from_store_should_only_read_events_after_the_cached_seq(snapshot_builder):
+    room_id = 0
+    store = flexmock(MemoryEventStore())
+    await store.append(room_id, RoomEvent.MESSAGE_SENT, data={"sender_id": "0", "value": "Hello"})
+    await snapshot_builder.build_from_store(room_id, store)
+
+    await store.append(room_id, RoomEvent.MESSAGE_SENT, data={"sender_id": "0", "value": "World"})
+    store.should_call("read_from").with_args(room_id, after_seq=1, limit=SNAPSHOT_READ_PAGE_SIZE).once()
+    snapshot, last_seq = await snapshot_builder.build_from_store(room_id, store)
+
+    assert last_seq == 2
+    assert [m.value for m in snapshot.chat_messages] == ["Hello", "World"]
+
+
+@pytest.mark.asyncio
+async def test_build_from_store_should_page_through_the_whole_history(snapshot_builder):
+    room_id = 0
+    store = MemoryEventStore()
+    for i in range(SNAPSHOT_READ_PAGE_SIZE + 1):
+        await store.append(room_id, RoomEvent.MESSAGE_SENT, data={"sender_id": "0", "value": str(i)})
+
+    snapshot, last_seq = await snapshot_builder.build_from_store(room_id, store)
+
+    assert last_seq == SNAPSHOT_READ_PAGE_SIZE + 1
+    assert len(snapshot.chat_messages) == SNAPSHOT_READ_PAGE_SIZE + 1
+
+
+@pytest.mark.asyncio
+async def test_build_from_store_should_not_leak_changes_to_the_cached_snapshot(snapshot_builder):
+    room_id = 0
+    store = MemoryEventStore()
+    await store.append(room_id, RoomEvent.PLAYER_JOINED, data={"id": "0", "user_name": "admin", "role": "admin"})
+
+    snapshot, _ = await snapshot_builder.build_from_store(room_id, store)
+    snapshot.players.clear()
+    snapshot.status = RoomStatus.CLOSED
+
+    await store.append(room_id, RoomEvent.PLAYER_LEFT, data={"id": "0"})
+    snapshot, _ = await snapshot_builder.build_from_store(room_id, store)
+
+    assert snapshot.status == RoomStatus.WAITING_FOR_PLAYERS
+    assert snapshot.players == [
+        SnapshotPlayer(user_name="admin", id="0", role=UserRole.admin, status=PlayerStatus.DISCONNECTED)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_build_from_store_should_keep_player_data_per_user(snapshot_builder):
+    room_id = 0
+    store = MemoryEventStore()
+    await store.append(room_id, GameEvent.GAME_INIT, data={"player": 1}, target_id="user_1")
+    await store.append(room_id, GameEvent.GAME_INIT, data={"player": 2}, target_id="user_2")
+
+    snapshot_user_1, _ = await snapshot_builder.build_from_store(room_id, store, user_id="user_1")
+    snapshot_user_2, _ = await snapshot_builder.build_from_store(room_id, store, user_id="user_2")
+
+    assert snapshot_user_1.player_data == ConnectFourPlayerData(player=1)
+    assert snapshot_user_2.player_data == ConnectFourPlayerData(player=2)
+
+
+@pytest.mark.asyncio
+async def test_build_from_store_should_project_a_room_once_for_all_of_its_users(snapshot_builder):
+    room_id = 0
+    store = flexmock(MemoryEventStore())
+    await store.append(room_id, RoomEvent.PLAYER_JOINED, data={"id": "user_1", "user_name": "admin", "role": "admin"})
+    await store.append(room_id, GameEvent.GAME_INIT, data={"player": 1}, target_id="user_1")
+    store.should_call("read_from").once()
+
+    snapshot_user_1, _ = await snapshot_builder.build_from_store(room_id, store, user_id="user_1")
+    snapshot_user_2, _ = await snapshot_builder.build_from_store(room_id, store, user_id="user_2")
+
+    assert snapshot_user_1.players == snapshot_user_2.players
+    assert snapshot_user_1.player_data == ConnectFourPlayerData(player=1)
+    assert snapshot_user_2.player_data is None
+
+
+@pytest.mark.asyncio
+async def test_build_json_from_store_should_splice_the_player_data_into_the_cached_room_snapshot(snapshot_builder):
+    room_id = 0
+    store = MemoryEventStore()
+    await store.append(room_id, RoomEvent.PLAYER_JOINED, data={"id": "user_1", "user_name": "admin", "role": "admin"})
+    await store.append(room_id, GameEvent.GAME_INIT, data={"player": 1}, target_id="user_1")
+
+    for user_id in ("user_1", "user_2", None):
+        snapshot_json, last_seq = await snapshot_builder.build_json_from_store(room_id, store, user_id=user_id)
+        snapshot, _ = await snapshot_builder.build_from_store(room_id, store, user_id=user_id)
+        assert last_seq == 2
+        assert SnapshotBase.model_validate_json(snapshot_json) == snapshot
+
+
+@pytest.mark.asyncio
+async def test_build_json_from_store_should_serialize_the_room_again_once_it_changed(snapshot_builder):
+    room_id = 0
+    store = MemoryEventStore()
+    await store.append(room_id, RoomEvent.MESSAGE_SENT, data={"sender_id": "0", "value": "Hello"})
+    first, _ = await snapshot_builder.build_json_from_store(room_id, store, user_id="0")
+    assert (await snapshot_builder.build_json_from_store(room_id, store, user_id="1"))[0] == first
+
+    await store.append(room_id, RoomEvent.ROOM_CLOSED)
+    snapshot_json, last_seq = await snapshot_builder.build_json_from_store(room_id, store, user_id="0")
+
+    assert last_seq == 2
+    assert SnapshotBase.model_validate_json(snapshot_json).status == RoomStatus.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_build_from_store_should_rebuild_when_the_store_was_reset(snapshot_builder):
+    room_id = 0
+    store = MemoryEventStore()
+    await store.append(room_id, RoomEvent.ROOM_CLOSED)
+    await snapshot_builder.build_from_store(room_id, store)
+
+    snapshot, last_seq = await snapshot_builder.build_from_store(room_id, MemoryEventStore())
+
+    assert last_seq == 0
+    assert snapshot == SnapshotBase(room_id=room_id)
+
+
+@pytest.mark.asyncio
+async def test_build_from_store_should_start_from_the_checkpoint_of_a_trimmed_store(snapshot_builder):
+    room_id = 0
+    store = MemoryEventStore(retention=RetentionPolicy(max_events=3))
+    events = [
+        await store.append(room_id, RoomEvent.PLAYER_JOINED, data={"id": "0", "user_name": "admin", "role": "admin"}),
+        await store.append(room_id, GameEvent.GAME_INIT, data={"player": 1}, target_id="0"),
+        await store.append(room_id, RoomEvent.MESSAGE_SENT, data={"sender_id": "0", "value": "Hello"}),
+        await store.append(room_id, GameEvent.GAME_START),
+        await store.append(room_id, RoomEvent.MESSAGE_SENT, data={"sender_id": "0", "value": "World"}),
+    ]
+    assert (await store.checkpoint(room_id)).last_seq > 0
+
+    snapshot, last_seq = await snapshot_builder.build_from_store(room_id, store, user_id="0")
+
+    assert last_seq == 5
+    assert snapshot == await snapshot_builder.build(room_id, events, user_id="0")
+
+
+@pytest.mark.asyncio
+async def test_build_from_store_should_restart_from_the_checkpoint_when_the_cache_is_behind(snapshot_builder):
+    room_id = 0
+    store = MemoryEventStore(retention=RetentionPolicy(max_events=2))
+    await store.append(room_id, RoomEvent.MESSAGE_SENT, data={"sender_id": "0", "value": "0"})
+    await snapshot_builder.build_from_store(room_id, store)
+
+    for i in range(1, 6):
+        await store.append(room_id, RoomEvent.MESSAGE_SENT, data={"sender_id": "0", "value": str(i)})
+    snapshot, last_seq = await snapshot_builder.build_from_store(room_id, store)
+
+    assert last_seq == 6
+    assert [m.value for m in snapshot.chat_messages] == [str(i) for i in range(6)]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_builder_should_keep_the_last_chat_messages():
+    room_id = 0
+    snapshot_builder = SnapshotBuilderBase(max_chat_messages=2)
+    store = MemoryEventStore(retention=RetentionPolicy(max_events=2, max_chat_messages=2))
+    for i in range(5):
+        await store.append(room_id, RoomEvent.MESSAGE_SENT, data={"sender_id": "0", "value": str(i)})
+
+    snapshot, _ = await snapshot_builder.build_from_store(room_id, store)
+
+    assert [m.value for m in snapshot.chat_messages] == ["3", "4"]
+
+
+@pytest.mark.asyncio
+async def test_build_at_should_replay_from_the_closest_checkpoint():
+    snapshot_builder = SnapshotBuilderBase(checkpoint_interval=2)
+    room_id = 0
+    store = flexmock(MemoryEventStore())
+    events = [
+        await store.append(room_id, RoomEvent.MESSAGE_SENT, data={"sender_id": "0", "value": str(i)})
+        for i in range(1, 6)
+    ]
+    await snapshot_builder.build_from_store(room_id, store)
+
+    store.should_call("read_from").with_args(room_id, after_seq=2, limit=1).once()
+    snapshot = await snapshot_builder.build_at(room_id, store, seq=3)
+
+    assert snapshot == await snapshot_builder.build(room_id, events[:3])
+
+
+@pytest.mark.asyncio
+async def test_build_at_should_replay_from_the_store_checkpoint_of_a_trimmed_room(snapshot_builder):
+    room_id = 0
+    store = MemoryEventStore(retention=RetentionPolicy(max_events=2))
+    events = [
+        await store.append(room_id, RoomEvent.MESSAGE_SENT, data={"sender_id": "0", "value": str(i)})
+        for i in range(1, 6)
+    ]
+    checkpoint_seq = (await store.checkpoint(room_id)).last_seq
+
+    snapshot = await snapshot_builder.build_at(room_id, store, seq=4)
+
+    assert snapshot == await snapshot_builder.build(room_id, events[:4])
+    with pytest.raises(SnapshotBuilderBase.SeqUnavailable):
+        await snapshot_builder.build_at(room_id, store, seq=checkpoint_seq - 1)
+
+
+@pytest.mark.asyncio
+async def test_build_at_should_fail_for_a_seq_older_than_the_checkpoints_kept():
+    snapshot_builder = SnapshotBuilderBase(checkpoint_interval=2, max_checkpoints=2)
+    room_id = 0
+    store = MemoryEventStore()
+    events = [
+        await store.append(room_id, RoomEvent.MESSAGE_SENT, data={"sender_id": "0", "value": str(i)})
+        for i in range(1, 8)
+    ]
+    await snapshot_builder.build_from_store(room_id, store)
+
+    assert [c.last_seq for c in snapshot_builder._history[room_id]] == [4, 6]
+    assert await snapshot_builder.build_at(room_id, store, seq=5) == await snapshot_builder.build(room_id, events[:5])
+    with pytest.raises(SnapshotBuilderBase.SeqUnavailable):
+        await snapshot_builder.build_at(room_id, store, seq=3)
+
+
+@pytest.mark.asyncio
+async def test_build_at_should_fail_for_a_seq_the_room_did_not_reach(snapshot_builder):
+    room_id = 0
+    store = MemoryEventStore()
+    await store.append(room_id, RoomEvent.ROOM_CLOSED)
+
+    with pytest.raises(SnapshotBuilderBase.SeqUnavailable):
+        await snapshot_builder.build_at(room_id, store, seq=2)
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+
+import pytest
+import pytest_asyncio
+from flexmock import flexmock
+
+from backend.domain.events import RoomEvent
+from backend.infra.sqlite_event_store import SqliteEventStore
+
+
+@pytest_asyncio.fixture()
+async def event_store(tmp_path):
+    store = SqliteEventStore(tmp_path / "events.db")
+    yield store
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_event_store_should_use_wal_mode(event_store):
+    assert event_store._writer.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+
+@pytest.mark.asyncio
+async def test_append_to_sqlite_event_store_returning_the_event(event_store):
+    room_id = 1
+
+    event = await event_store.append(
+        room_id=room_id,
+        event_type=RoomEvent.PLAYER_JOINED,
+        data={"id": "user", "role": "admin"},
+        actor_id="actor",
+        target_id="target",
+    )
+
+    assert event.seq == 1
+    assert await event_store.read_from(room_id) == ([event], 1)
+
+
+@pytest.mark.asyncio
+async def test_read_from_sqlite_event_store_with_limit_and_after_seq(event_store):
+    room_id = 1
+
+    events = [await event_store.append(room_id, "event") for _ in range(5)]
+
+    assert await event_store.read_from(room_id, after_seq=1, limit=2) == (events[1:3], 5)
+    assert await event_store.read_from(room_id, limit=2) == (events[3:], 5)
+    assert await event_store.read_from(room_id, after_seq=5) == ([], 5)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_event_store_should_recover_events_after_restart(tmp_path):
+    room_id = 1
+    store = SqliteEventStore(tmp_path / "events.db")
+    events = [await store.append(room_id, "event", data={"index": i}) for i in range(3)]
+    await store.close()
+
+    store = SqliteEventStore(tmp_path / "events.db")
+    assert await store.last_seq(room_id) == 3
+    assert await store.read_from(room_id) == (events, 3)
+    assert (await store.append(room_id, "event")).seq == 4
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_event_store_commits_concurrent_appends_in_a_single_transaction(event_store):
+    flexmock(event_store).should_call("_insert").once()
+
+    events = await asyncio.gather(*[
+        event_store.append(room_id, "event") for room_id in range(10)
+    ])
+
+    assert [e.seq for e in events] == [1] * 10
+    for room_id in range(10):
+        assert await event_store.read_from(room_id) == ([events[room_id]], 1)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_event_store_assigns_dense_seqs_to_concurrent_appends_in_a_room(event_store):
+    room_id = 1
+
+    events = await asyncio.gather(*[
+        event_store.append(room_id, "event") for _ in range(10)
+    ])
+
+    assert sorted(e.seq for e in events) == list(range(1, 11))
+    assert await event_store.last_seq(room_id) == 10
+
+
+@pytest.mark.asyncio
+async def test_sqlite_event_store_fails_every_append_of_a_failed_batch(event_store):
+    flexmock(event_store).should_receive("_insert").and_raise(RuntimeError)
+
+    with pytest.raises(RuntimeError):
+        await event_store.append(1, "event")
+
+    flexmock(event_store).should_call("_insert")
+    assert (await event_store.append(1, "event")).seq == 1
+
+
+@pytest.mark.asyncio
+async def test_sqlite_event_store_keeps_appending_to_a_room_after_an_append_was_cancelled_mid_commit(event_store):
+    insert = event_store._insert
+    insert_started = threading.Event()
+    release_insert = threading.Event()
+
+    def blocking_insert(events):
+        insert_started.set()
+        release_insert.wait()
+        insert(events)
+
+    flexmock(event_store).should_receive("_insert").replace_with(blocking_insert)
+    cancelled = asyncio.create_task(event_store.append(1, RoomEvent.MESSAGE_SENT))
+    other = asyncio.create_task(event_store.append(2, RoomEvent.MESSAGE_SENT))
+    await asyncio.to_thread(insert_started.wait)
+    cancelled.cancel()
+    release_insert.set()
+
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    assert (await asyncio.wait_for(other, timeout=1.0)).seq == 1
+
+    event = await asyncio.wait_for(event_store.append(1, RoomEvent.MESSAGE_SENT), timeout=1.0)
+    assert event.seq == 2
+    assert [e.seq for e in (await event_store.read_from(1))[0]] == [1, 2]
@@ -2,6 +2,7 @@ import pytest
 import time_machine
 from starlette import status
 
+from backend.domain.events import RoomEvent, GameEvent
 from backend.games.abstract import Game
 from backend.infra.snapshots import SnapshotBase, RoomStatus
 from backend.models.game_player_model import GamePlayerModel, UserRole
@@ -502,8 +503,12 @@ def test_get_game_room_snapshot(
         chat_messages=[],
     )
 
-    mock_snapshot_builder.should_receive('build').once().and_return(
-        build_future(snapshot)
+    mock_snapshot_builder.should_receive('build_json_from_store').with_args(
+        room_id=1,
+        store=mock_event_store,
+        user_id=str,
+    ).once().and_return(
+        build_future((snapshot.model_dump_json(), 0))
     )
 
     response = client.get("/game_rooms/1/snapshot")
@@ -513,6 +518,73 @@ def test_get_game_room_snapshot(
     assert data == snapshot.model_dump(mode="json")
 
 
+@pytest.mark.asyncio
+async def test_get_game_room_snapshot_should_answer_not_modified_when_the_etag_matches(
+        client,
+        mock_event_store,
+        mock_snapshot_builder,
+):
+    player = GamePlayerModel(role=UserRole.player, room_id=1)
+    client.cookies[AUTHORIZATION_COOKIE] = create_access_token(AccessTokenData(player=player))
+    await mock_event_store.append(1, RoomEvent.ROOM_CLOSED)
+    mock_snapshot_builder.should_receive('build_json_from_store').and_return(
+        build_future((SnapshotBase(room_id=1).model_dump_json(), 1))
+    ).once()
+
+    response = client.get("/game_rooms/1/snapshot")
+    etag = response.headers["ETag"]
+    assert response.status_code == status.HTTP_200_OK
+
+    mock_event_store.should_receive('read_from').never()
+    response = client.get("/game_rooms/1/snapshot", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("if_none_match", ["W/{etag}", '"other", {etag}', "*"])
+async def test_get_game_room_snapshot_should_answer_not_modified_to_a_weak_or_any_etag(
+        if_none_match,
+        client,
+        mock_event_store,
+        mock_snapshot_builder,
+):
+    player = GamePlayerModel(role=UserRole.player, room_id=1)
+    client.cookies[AUTHORIZATION_COOKIE] = create_access_token(AccessTokenData(player=player))
+    mock_snapshot_builder.should_receive('build_json_from_store').and_return(
+        build_future((SnapshotBase(room_id=1).model_dump_json(), 0))
+    ).once()
+
+    etag = client.get("/game_rooms/1/snapshot").headers["ETag"]
+    response = client.get("/game_rooms/1/snapshot", headers={"If-None-Match": if_none_match.format(etag=etag)})
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_get_game_room_snapshot_should_send_the_snapshot_again_once_the_room_changed(
+        client,
+        mock_event_store,
+        mock_snapshot_builder,
+):
+    player = GamePlayerModel(role=UserRole.player, room_id=1)
+    client.cookies[AUTHORIZATION_COOKIE] = create_access_token(AccessTokenData(player=player))
+    mock_snapshot_builder.should_receive('build_json_from_store').and_return(
+        build_future((SnapshotBase(room_id=1).model_dump_json(), 0)),
+        build_future((SnapshotBase(room_id=1, status=RoomStatus.CLOSED).model_dump_json(), 1)),
+    ).one_by_one().twice()
+
+    etag = client.get("/game_rooms/1/snapshot").headers["ETag"]
+    await mock_event_store.append(1, RoomEvent.ROOM_CLOSED)
+    response = client.get("/game_rooms/1/snapshot", headers={"If-None-Match": etag})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert response.json()["status"] == RoomStatus.CLOSED.value
+
+
 def test_get_game_room_snapshot_should_fail_if_not_in_room(
         client,
 ):
@@ -581,3 +653,36 @@ async def test_game_room_should_deactivate_room_after_all_players_leave(
 
     refreshed_game_room = GameRoomService.get_or_error(session, game_room.id)
     assert refreshed_game_room.is_active is False
+
+
+@pytest.mark.asyncio
+async def test_get_game_room_snapshot_at_should_return_the_state_of_the_room_at_the_seq(
+        client,
+        mock_event_store,
+):
+    admin = GamePlayerModel(role=UserRole.admin, room_id=1)
+    client.cookies[AUTHORIZATION_COOKIE] = create_access_token(AccessTokenData(player=admin))
+    await mock_event_store.append(1, GameEvent.GAME_START)
+    await mock_event_store.append(1, RoomEvent.ROOM_CLOSED)
+
+    response = client.get("/game_rooms/1/snapshot/at/1/")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] == RoomStatus.IN_PROGRESS.value
+
+    response = client.get("/game_rooms/1/snapshot/at/3/")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["code"] == ErrorCode.SNAPSHOT_UNAVAILABLE.value
+
+
+def test_get_game_room_snapshot_at_should_fail_if_not_admin(
+        client,
+):
+    player = GamePlayerModel(role=UserRole.player, room_id=1)
+    client.cookies[AUTHORIZATION_COOKIE] = create_access_token(AccessTokenData(player=player))
+
+    response = client.get("/game_rooms/1/snapshot/at/0/")
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json()["code"] == ErrorCode.FORBIDDEN.value
@@ -2,7 +2,7 @@ import pytest
 from flexmock import flexmock
 from starlette.websockets import WebSocketDisconnect, WebSocket
 
-from backend.events.bus import EventBus
+from backend.events.queue import SubscriberQueue
 from backend.infra.memory_event_store import MemoryEventStore
 from backend.infra.snapshots import SnapshotBuilderBase
 from backend.models.game_player_model import GamePlayerModel, UserRole
@@ -55,15 +55,16 @@ def test_websocket_connection_restores_history(client):
         room_id=room_id,
         user_id=player.id,
         store=MemoryEventStore,
-        snapshot_builder=SnapshotBuilderBase
+        snapshot_builder=SnapshotBuilderBase,
+        after_seq=None,
     ).and_return(
-        build_future(None)
+        build_future(3)
     ).once()
     flexmock(RoomStreamerService).should_receive("stream_room_events").with_args(
         ws=WebSocket,
-        room_id=room_id,
-        user_id=player.id,
-        event_bus=EventBus
+        queue=SubscriberQueue,
+        batch_frames=False,
+        after_seq=3,
     ).and_return(
         build_future(None)
     ).once()
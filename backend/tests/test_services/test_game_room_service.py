@@ -147,8 +147,8 @@ async def test_add_user_to_game_room(
     game_room = GameRoomService.create(session, GameType.connect_four, "securepassword")
     user_name = "admin"
 
-    mock_event_store.should_call('append').once()
-    mock_event_bus.should_call('publish').once()
+    mock_event_store.should_call('commit').once()
+    mock_event_bus.should_call('deliver').once()
 
     player = await GameRoomService.add_user(
         session=session,
@@ -253,8 +253,10 @@ async def test_ending_a_game_room_should_set_the_room_as_inactive_and_send_an_ev
 ):
     game_room = GameRoomService.create(session, GameType.connect_four, "securepassword")
 
-    mock_event_store.should_call('append').with_args(game_room.id, RoomEvent.ROOM_CLOSED).once()
-    mock_event_bus.should_call('publish').once()
+    mock_event_store.should_call('commit').with_args(
+        game_room.id, RoomEvent.ROOM_CLOSED, event_bus=mock_event_bus
+    ).once()
+    mock_event_bus.should_call('deliver').once()
 
     result = await GameRoomService.end_game_room(
         session=session,
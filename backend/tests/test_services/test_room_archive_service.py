@@ -0,0 +1,107 @@
+from datetime import timedelta, datetime, timezone
+
+import pytest
+from flexmock import flexmock
+
+from backend.domain.events import RoomEvent, BaseEvent
+from backend.infra.snapshots import Checkpoint, SnapshotBase, RoomStatus
+from backend.services.room_archive_service import RoomArchiveService
+from backend.utils.future import build_future
+
+
+@pytest.mark.asyncio
+async def test_archive_room_should_free_the_snapshots_and_the_game_of_a_closed_room(
+        mock_event_store,
+        mock_game_store,
+        mock_snapshot_builder,
+):
+    mock_event_store.should_receive("archive").with_args(1).and_return(build_future(True)).once()
+    mock_snapshot_builder.should_receive("discard").with_args(1).once()
+    mock_game_store.should_receive("delete_game").with_args(1).once()
+
+    assert await RoomArchiveService.archive_room(1, mock_event_store, mock_game_store, mock_snapshot_builder, closed=True)
+
+
+@pytest.mark.asyncio
+async def test_archive_room_should_keep_the_game_of_an_idle_room(
+        mock_event_store,
+        mock_game_store,
+        mock_snapshot_builder,
+):
+    mock_event_store.should_receive("archive").with_args(1).and_return(build_future(True)).once()
+    mock_snapshot_builder.should_receive("discard").with_args(1).once()
+    mock_game_store.should_receive("delete_game").never()
+
+    assert await RoomArchiveService.archive_room(1, mock_event_store, mock_game_store, mock_snapshot_builder, closed=False)
+
+
+@pytest.mark.asyncio
+async def test_archive_room_should_do_nothing_when_the_store_cannot_archive(
+        mock_event_store,
+        mock_game_store,
+        mock_snapshot_builder,
+):
+    mock_event_store.should_receive("archive").and_return(build_future(False)).once()
+    mock_snapshot_builder.should_receive("discard").never()
+    mock_game_store.should_receive("delete_game").never()
+
+    assert not await RoomArchiveService.archive_room(1, mock_event_store, mock_game_store, mock_snapshot_builder, closed=True)
+
+
+@pytest.mark.asyncio
+async def test_archive_inactive_rooms_should_archive_closed_and_idle_rooms(
+        mock_event_store,
+        mock_game_store,
+        mock_snapshot_builder,
+):
+    now = datetime.now(timezone.utc)
+    last_events = {
+        1: BaseEvent(room_id=1, seq=3, type=RoomEvent.ROOM_CLOSED, ts=now),
+        2: BaseEvent(room_id=2, seq=8, type=RoomEvent.MESSAGE_SENT, ts=now - timedelta(hours=1)),
+        3: BaseEvent(room_id=3, seq=5, type=RoomEvent.MESSAGE_SENT, ts=now),
+    }
+    mock_event_store.should_receive("resident_rooms").and_return([1, 2, 3])
+    mock_event_store.should_receive("read_from").replace_with(
+        lambda room_id, limit: build_future(([last_events[room_id]], last_events[room_id].seq))
+    )
+    flexmock(RoomArchiveService).should_receive("archive_room").with_args(
+        1, mock_event_store, mock_game_store, mock_snapshot_builder, True
+    ).and_return(build_future(True)).once()
+    flexmock(RoomArchiveService).should_receive("archive_room").with_args(
+        2, mock_event_store, mock_game_store, mock_snapshot_builder, False
+    ).and_return(build_future(True)).once()
+
+    archived = await RoomArchiveService.archive_inactive_rooms(
+        mock_event_store,
+        mock_game_store,
+        mock_snapshot_builder,
+        idle_timeout=timedelta(minutes=30),
+    )
+
+    assert archived == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_archive_inactive_rooms_should_archive_a_room_only_holding_a_checkpoint(
+        mock_event_store,
+        mock_game_store,
+        mock_snapshot_builder,
+):
+    checkpoint = Checkpoint(last_seq=4, state=SnapshotBase(room_id=1, status=RoomStatus.CLOSED))
+    mock_event_store.should_receive("resident_rooms").and_return([1, 2])
+    mock_event_store.should_receive("read_from").replace_with(lambda room_id, limit: build_future(([], 4)))
+    mock_event_store.should_receive("checkpoint").replace_with(
+        lambda room_id: build_future(checkpoint if room_id == 1 else None)
+    )
+    flexmock(RoomArchiveService).should_receive("archive_room").with_args(
+        1, mock_event_store, mock_game_store, mock_snapshot_builder, True
+    ).and_return(build_future(True)).once()
+
+    archived = await RoomArchiveService.archive_inactive_rooms(
+        mock_event_store,
+        mock_game_store,
+        mock_snapshot_builder,
+        idle_timeout=timedelta(minutes=30),
+    )
+
+    assert archived == [1]
@@ -1,4 +1,5 @@
 import asyncio
+import json
 import contextlib
 from asyncio import Future
 from typing import Callable, Any, AsyncGenerator, Coroutine
@@ -12,49 +13,51 @@ from backend.events.bus import EventBus
 from backend.factories.game_player_factory import GamePlayerFactory
 from backend.games.abstract import GameException, GameExceptionType
 from backend.games.connect_four.schemas import ConnectFourActionData
+from backend.infra.event_store import RetentionPolicy
+from backend.infra.memory_event_store import MemoryEventStore
 from backend.infra.snapshots import SnapshotBase
 from backend.models.game_player_model import GamePlayerModel
 from backend.models.game_room_model import GameType
 from backend.schemas.websocket.client import ClientMessageType, ClientMessageErrorCode, ClientMessageGameAction
+from backend.schemas.websocket.server import WSMessageEvent, WSMessageBatch
 from backend.services.game_room_service import GameRoomService
 from backend.services.game_service import GameService
-from backend.services.room_streamer import RoomStreamerService, StreamingError
+from backend.services.room_streamer import RoomStreamerService, StreamingError, SubscriberEvicted, \
+    SLOW_CONSUMER_CLOSE_CODE, EventFrameCache
 from backend.utils.future import build_future
 
 
+def ws_frame(message: dict) -> str:
+    return json.dumps(message, separators=(",", ":"))
+
+
 @pytest.mark.asyncio
 async def test_send_current_room_state(
         mock_event_store,
         mock_snapshot_builder,
 ):
     room_id = 0
-    events = []
     snapshot = SnapshotBase(room_id=room_id)
-    mock_event_store.should_receive('read_from').with_args(
-        room_id
-    ).once().and_return(
-        build_future((events, 0))
-    )
-    mock_snapshot_builder.should_receive('build').with_args(
+    mock_snapshot_builder.should_receive('build_json_from_store').with_args(
         room_id,
-        events,
+        mock_event_store,
         user_id="user"
     ).once().and_return(
         build_future(
-            snapshot
+            (snapshot.model_dump_json(), 0)
         )
     )
 
     ws = flexmock()
-    ws.should_receive('send_json').with_args(
+    ws.should_receive('send_text').with_args(ws_frame(
         {
             "type": "snapshot",
             "last_seq": 0,
             "data": snapshot.model_dump(mode="json"),
         }
-    ).once().and_return(build_future(None))
+    )).once().and_return(build_future(None))
 
-    await RoomStreamerService.send_current_room_state(
+    synced_seq = await RoomStreamerService.send_current_room_state(
         ws,  # type: ignore[arg-type]
         room_id,
         user_id="user",
@@ -62,6 +65,70 @@ async def test_send_current_room_state(
         snapshot_builder=mock_snapshot_builder
     )
 
+    assert synced_seq == 0
+
+
+@pytest.mark.asyncio
+async def test_send_current_room_state_should_replay_the_missed_events_of_a_resuming_client(
+        mock_snapshot_builder,
+):
+    room_id = 0
+    store = MemoryEventStore()
+    await store.append(room_id, RoomEvent.PLAYER_JOINED, actor_id="user")
+    missed = await store.append(room_id, RoomEvent.MESSAGE_SENT, actor_id="other")
+    await store.append(room_id, GameEvent.GAME_STATE_UPDATE, target_id="other")
+    mine = await store.append(room_id, GameEvent.GAME_STATE_UPDATE, target_id="user")
+    mock_snapshot_builder.should_receive('build_from_store').never()
+    ws = flexmock()
+    sent = []
+
+    async def send_ws_message_event(_, event):
+        sent.append(event)
+
+    flexmock(RoomStreamerService).should_receive('send_ws_message_event').replace_with(send_ws_message_event)
+
+    synced_seq = await RoomStreamerService.send_current_room_state(
+        ws,  # type: ignore[arg-type]
+        room_id,
+        user_id="user",
+        store=store,
+        snapshot_builder=mock_snapshot_builder,
+        after_seq=1,
+    )
+
+    assert [e.seq for e in sent] == [missed.seq, mine.seq]
+    assert synced_seq == mine.seq
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("after_seq", [0, 1, 5])
+async def test_send_current_room_state_should_send_a_snapshot_when_the_missed_events_are_gone(
+        after_seq,
+        mock_snapshot_builder,
+):
+    room_id = 0
+    store = MemoryEventStore(retention=RetentionPolicy(max_events=2))
+    for _ in range(4):
+        await store.append(room_id, GameEvent.GAME_STATE_UPDATE, data={"board": []})
+    snapshot = SnapshotBase(room_id=room_id)
+    mock_snapshot_builder.should_receive('build_json_from_store').and_return(
+        build_future((snapshot.model_dump_json(), 4))
+    ).once()
+    flexmock(RoomStreamerService).should_receive('send_ws_message_event').never()
+    ws = flexmock()
+    ws.should_receive('send_text').and_return(build_future(None)).once()
+
+    synced_seq = await RoomStreamerService.send_current_room_state(
+        ws,  # type: ignore[arg-type]
+        room_id,
+        user_id="user",
+        store=store,
+        snapshot_builder=mock_snapshot_builder,
+        after_seq=after_seq,
+    )
+
+    assert synced_seq == 4
+
 
 @pytest.mark.asyncio
 async def test_stream_room_events_should_send_ws_message_events_when_they_arrive_on_the_bus():
@@ -76,46 +143,45 @@ async def test_stream_room_events_should_send_ws_message_events_when_they_arrive
         type=RoomEvent.PLAYER_JOINED,
     )
 
-    send_task = asyncio.create_task(
-        RoomStreamerService.stream_room_events(
-            ws,  # type: ignore[arg-type]
-            room_id,
-            user_id,
-            mock_event_bus
+    async with mock_event_bus.subscribe(room_id, user_id) as queue:
+        send_task = asyncio.create_task(
+            RoomStreamerService.stream_room_events(
+                ws,  # type: ignore[arg-type]
+                queue,
+            )
         )
-    )
 
-    async def task_func():
-        flexmock(RoomStreamerService).should_receive('send_ws_message_event').with_args(
-            ws,
-            event
-        ).twice().and_return(
-            build_future(None),
-            build_future(None),
-        ).one_by_one()
-
-        await mock_event_bus.publish(
-            event
-        )
-        await mock_event_bus.publish(
-            event
-        )
+        async def task_func():
+            flexmock(RoomStreamerService).should_receive('send_ws_message_event').with_args(
+                ws,
+                event
+            ).twice().and_return(
+                build_future(None),
+                build_future(None),
+            ).one_by_one()
+
+            await mock_event_bus.publish(
+                event
+            )
+            await mock_event_bus.publish(
+                event
+            )
 
-    test_task = asyncio.create_task(
-        task_func()
-    )
+        test_task = asyncio.create_task(
+            task_func()
+        )
 
-    done, pending = await asyncio.wait(
-        {send_task, test_task},
-        return_when=asyncio.FIRST_COMPLETED,
-        timeout=1.0
-    )
+        done, pending = await asyncio.wait(
+            {send_task, test_task},
+            return_when=asyncio.FIRST_COMPLETED,
+            timeout=1.0
+        )
 
-    for t in done:
-        t.result()
+        for t in done:
+            t.result()
 
-    for t in pending:
-        t.cancel()
+        for t in pending:
+            t.cancel()
 
 
 @pytest.mark.asyncio
@@ -127,18 +193,47 @@ async def test_send_ws_message_event() -> None:
         type="test_event"
     )
     ws = flexmock()
-    ws.should_receive("send_json").once().with_args(
-        {
-            "type": "event",
-            "seq": event.seq,
-            "event": event.model_dump(mode="json"),
-        }
-    ).and_return(build_future(None))
+    frames = []
+
+    async def send_text(frame):
+        frames.append(frame)
+
+    ws.should_receive("send_text").once().replace_with(send_text)
     await RoomStreamerService.send_ws_message_event(
         ws,  # type: ignore[arg-type]
         event
     )
 
+    assert json.loads(frames[0]) == {
+        "type": "event",
+        "seq": event.seq,
+        "event": event.model_dump(mode="json"),
+    }
+
+
+@pytest.mark.asyncio
+async def test_send_ws_message_event_should_encode_an_event_once_for_every_subscriber() -> None:
+    event = BaseEvent(room_id=1, seq=1, type="test_event")
+    ws_1 = flexmock()
+    ws_2 = flexmock()
+    ws_1.should_receive("send_text").and_return(build_future(None)).once()
+    ws_2.should_receive("send_text").and_return(build_future(None)).once()
+    flexmock(WSMessageEvent).should_call("model_dump_json").once()
+
+    await RoomStreamerService.send_ws_message_event(ws_1, event)  # type: ignore[arg-type]
+    await RoomStreamerService.send_ws_message_event(ws_2, event)  # type: ignore[arg-type]
+
+
+def test_event_frame_cache_should_forget_collected_events() -> None:
+    cache = EventFrameCache()
+    event = BaseEvent(room_id=1, seq=1, type="test_event")
+
+    frame = cache.get(event)
+
+    assert cache.get(event) is frame
+    del event
+    assert cache._frames == {}
+
 
 @contextlib.asynccontextmanager
 async def perform_receive_client_messages_test(
@@ -155,8 +250,8 @@ async def perform_receive_client_messages_test(
         result.set_result(None)
         return build_future(None)
 
-    ws.should_receive('receive_json').and_return(
-        build_future(message),
+    ws.should_receive('receive_text').and_return(
+        build_future(json.dumps(message)),
         # The loop should break after the first message,
         # but we need another value to be awaited when the
         # loop restarts
@@ -220,10 +315,10 @@ async def test_room_streamer_should_receive_client_ping(
                 "type": ClientMessageType.PING
             },
     ) as complete_future:
-        ws.should_receive('send_json').with_args({
+        ws.should_receive('send_text').with_args(ws_frame({
             "type": ClientMessageType.PING.value,
             "timestamp": 1735729200000  # 2025-01-01 12:00:00 in milliseconds
-        }).once().replace_with(
+        })).once().replace_with(
             lambda _: complete_future()
         )
 
@@ -252,11 +347,50 @@ async def test_room_streamer_sends_an_error_on_missing_type(
                 # No "type" field
             },
     ) as complete_future:
-        ws.should_receive('send_json').with_args({
+        ws.should_receive('send_text').with_args(ws_frame({
             "type": "error",
             "code": ClientMessageErrorCode.INVALID_MESSAGE.value,
             "message": "Invalid message format"
-        }).once().replace_with(
+        })).once().replace_with(
+            lambda _: complete_future()
+        )
+
+
+@pytest.mark.asyncio
+async def test_room_streamer_sends_an_error_response_on_unknown_type_with_event_key(
+        mock_event_store,
+        mock_event_bus,
+        mock_game_store
+):
+    ws = flexmock()
+    current_user = GamePlayerModel(
+        id="user1",
+        user_name="Player 1",
+        role="player",
+        room_id=1,
+    )
+
+    async with perform_receive_client_messages_test(
+            ws=ws,
+            mock_event_store=mock_event_store,
+            mock_event_bus=mock_event_bus,
+            mock_game_store=mock_game_store,
+            current_user=current_user,
+            message={
+                "type": "unknown",
+                "event_key": "test_event_key",
+            },
+    ) as complete_future:
+        ws.should_receive('send_text').with_args(ws_frame({
+            "type": "response",
+            "event_key": "test_event_key",
+            "success": False,
+            "error": {
+                "type": "error",
+                "code": ClientMessageErrorCode.INVALID_MESSAGE.value,
+                "message": "Invalid message format"
+            }
+        })).once().replace_with(
             lambda _: complete_future()
         )
 
@@ -288,8 +422,8 @@ async def test_room_streamer_publishes_a_message_event_to_bus(
                 "text": message_value
             },
     ) as complete_future:
-        mock_event_bus.should_receive('publish').with_args(
-            event=BaseEvent(
+        mock_event_bus.should_receive('deliver').with_args(
+            BaseEvent(
                 room_id=current_user.room_id,
                 actor_id=current_user.id,
                 type=RoomEvent.MESSAGE_SENT,
@@ -300,7 +434,7 @@ async def test_room_streamer_publishes_a_message_event_to_bus(
                 seq=1,  # seq is set by the event store, so it will be 1 here
             )
         ).once().replace_with(
-            lambda event: complete_future()
+            lambda event: asyncio.ensure_future(complete_future())
         )
 
 
@@ -329,11 +463,11 @@ async def test_room_streamer_sends_an_error_on_missing_chat_text(
                 # No "text" field
             },
     ) as complete_future:
-        ws.should_receive('send_json').with_args({
+        ws.should_receive('send_text').with_args(ws_frame({
             "type": "error",
             "code": ClientMessageErrorCode.INVALID_MESSAGE.value,
             "message": "Malformed chat message"
-        }).once().replace_with(
+        })).once().replace_with(
             lambda _: complete_future()
         )
 
@@ -367,8 +501,8 @@ async def test_room_streamer_sends_response_on_event_key(
                 "event_key": event_key
             },
     ) as complete_future:
-        mock_event_bus.should_receive('publish').with_args(
-            event=BaseEvent(
+        mock_event_bus.should_receive('deliver').with_args(
+            BaseEvent(
                 room_id=current_user.room_id,
                 actor_id=current_user.id,
                 type=RoomEvent.MESSAGE_SENT,
@@ -378,15 +512,13 @@ async def test_room_streamer_sends_response_on_event_key(
                 },
                 seq=1,  # seq is set by the event store, so it will be 1 here
             )
-        ).once().replace_with(
-            lambda event: build_future(None)
-        )
-        ws.should_receive('send_json').with_args({
+        ).once()
+        ws.should_receive('send_text').with_args(ws_frame({
             "type": "response",
             "event_key": event_key,
             "success": True,
             "error": None
-        }).once().replace_with(
+        })).once().replace_with(
             lambda _: complete_future()
         )
 
@@ -418,7 +550,7 @@ async def test_room_streamer_sends_error_response_on_malformed_chat_message(
                 "event_key": event_key
             },
     ) as complete_future:
-        ws.should_receive('send_json').with_args({
+        ws.should_receive('send_text').with_args(ws_frame({
             "type": "response",
             "event_key": event_key,
             "success": False,
@@ -427,7 +559,7 @@ async def test_room_streamer_sends_error_response_on_malformed_chat_message(
                 "code": ClientMessageErrorCode.INVALID_MESSAGE.value,
                 "message": "Malformed chat message"
             }
-        }).once().replace_with(
+        })).once().replace_with(
             lambda _: complete_future()
         )
 
@@ -637,3 +769,218 @@ async def test_execute_game_event_succeeds(
         event_key=None,
     )
     assert result is True
+
+
+@pytest.mark.asyncio
+async def test_stream_room_events_should_close_the_socket_with_a_resume_hint_when_evicted():
+    event_bus = EventBus(max_queue_size=1)
+    ws = flexmock()
+    room_id = 0
+    events = [BaseEvent(room_id=room_id, seq=seq, type=RoomEvent.MESSAGE_SENT) for seq in range(1, 5)]
+    flexmock(RoomStreamerService).should_receive('send_ws_message_event').and_return(build_future(None))
+    ws.should_receive('close').with_args(
+        code=SLOW_CONSUMER_CLOSE_CODE,
+        reason='{"resume_after_seq": 1}',
+    ).and_return(build_future(None)).once()
+
+    async with event_bus.subscribe(room_id, "user") as queue:
+        send_task = asyncio.create_task(
+            RoomStreamerService.stream_room_events(
+                ws,  # type: ignore[arg-type]
+                queue,
+            )
+        )
+        await asyncio.sleep(0)
+        event_bus.deliver(events[0])
+        await asyncio.sleep(0)
+        for e in events[1:]:
+            event_bus.deliver(e)
+
+        with pytest.raises(SubscriberEvicted):
+            await asyncio.wait_for(send_task, timeout=1.0)
+    assert event_bus.stats.evicted == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_room_events_should_send_queued_events_in_a_single_batch_frame():
+    event_bus = EventBus()
+    ws = flexmock()
+    room_id = 0
+    events = [BaseEvent(room_id=room_id, seq=seq, type=RoomEvent.MESSAGE_SENT) for seq in range(1, 4)]
+    frames = []
+
+    async def send_text(text):
+        frames.append(text)
+
+    ws.should_receive('send_text').replace_with(send_text)
+
+    async with event_bus.subscribe(room_id, "user") as queue:
+        send_task = asyncio.create_task(
+            RoomStreamerService.stream_room_events(
+                ws,  # type: ignore[arg-type]
+                queue,
+                batch_frames=True,
+            )
+        )
+        event_bus.deliver(events[0])
+        event_bus.deliver_batch(events[1:])
+        await asyncio.sleep(0)
+        send_task.cancel()
+
+    assert len(frames) == 1
+    assert WSMessageBatch.model_validate_json(frames[0]) == WSMessageBatch(
+        events=[WSMessageEvent(seq=e.seq, event=e) for e in events]
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_room_events_should_send_a_single_queued_event_as_an_event_frame_when_batching():
+    event_bus = EventBus()
+    ws = flexmock()
+    room_id = 0
+    event = BaseEvent(room_id=room_id, seq=1, type=RoomEvent.MESSAGE_SENT)
+    flexmock(RoomStreamerService).should_receive('send_ws_message_batch').never()
+    flexmock(RoomStreamerService).should_receive('send_ws_message_event').with_args(
+        ws,
+        event,
+    ).and_return(build_future(None)).once()
+
+    async with event_bus.subscribe(room_id, "user") as queue:
+        send_task = asyncio.create_task(
+            RoomStreamerService.stream_room_events(
+                ws,  # type: ignore[arg-type]
+                queue,
+                batch_frames=True,
+            )
+        )
+        event_bus.deliver(event)
+        await asyncio.sleep(0)
+        send_task.cancel()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("batch_frames", [False, True])
+async def test_stream_room_events_should_skip_the_events_the_client_was_brought_up_to(batch_frames):
+    event_bus = EventBus()
+    ws = flexmock()
+    room_id = 0
+    events = [BaseEvent(room_id=room_id, seq=seq, type=RoomEvent.MESSAGE_SENT) for seq in range(1, 5)]
+    sent = []
+
+    async def send_ws_message_event(_, event):
+        sent.append(event)
+
+    flexmock(RoomStreamerService).should_receive('send_ws_message_event').replace_with(send_ws_message_event)
+
+    async def send_ws_message_batch(_, batch):
+        sent.extend(batch)
+
+    flexmock(RoomStreamerService).should_receive('send_ws_message_batch').replace_with(send_ws_message_batch)
+
+    async with event_bus.subscribe(room_id, "user") as queue:
+        # Delivered while the client was sent a snapshot up to seq 2
+        event_bus.deliver(events[0])
+        event_bus.deliver_batch(events[1:3])
+        send_task = asyncio.create_task(
+            RoomStreamerService.stream_room_events(
+                ws,  # type: ignore[arg-type]
+                queue,
+                batch_frames=batch_frames,
+                after_seq=2,
+            )
+        )
+        await asyncio.sleep(0)
+        event_bus.deliver(events[3])
+        await asyncio.sleep(0)
+        send_task.cancel()
+
+    assert [e.seq for e in sent] == [3, 4]
+
+
+@pytest.mark.asyncio
+async def test_stream_room_events_should_send_the_events_appended_while_the_client_is_brought_up_to_date(
+        mock_snapshot_builder,
+):
+    room_id = 0
+    event_bus = EventBus()
+    store = MemoryEventStore()
+    await store.append(room_id, RoomEvent.PLAYER_JOINED, actor_id="user")
+    ws = flexmock()
+    ws.should_receive('send_text').and_return(build_future(None))
+    sent = []
+
+    async def send_ws_message_event(_, event):
+        sent.append(event)
+
+    flexmock(RoomStreamerService).should_receive('send_ws_message_event').replace_with(send_ws_message_event)
+
+    async def build_json_from_store(*args, **kwargs):
+        # Another player writes to the room while the snapshot is built
+        await store.commit(room_id, RoomEvent.MESSAGE_SENT, actor_id="other", event_bus=event_bus)
+        return SnapshotBase(room_id=room_id).model_dump_json(), 1
+
+    mock_snapshot_builder.should_receive('build_json_from_store').replace_with(build_json_from_store)
+
+    async with event_bus.subscribe(room_id, "user") as queue:
+        synced_seq = await RoomStreamerService.send_current_room_state(
+            ws,  # type: ignore[arg-type]
+            room_id,
+            user_id="user",
+            store=store,
+            snapshot_builder=mock_snapshot_builder,
+        )
+        send_task = asyncio.create_task(
+            RoomStreamerService.stream_room_events(
+                ws,  # type: ignore[arg-type]
+                queue,
+                after_seq=synced_seq,
+            )
+        )
+        await asyncio.sleep(0)
+        send_task.cancel()
+
+    assert [e.seq for e in sent] == [2]
+
+
+@pytest.mark.asyncio
+async def test_stream_room_events_should_not_redeliver_events_of_an_offline_player_covered_by_the_snapshot(
+        mock_snapshot_builder,
+):
+    room_id = 0
+    event_bus = EventBus()
+    store = MemoryEventStore()
+    await store.commit(room_id, RoomEvent.PLAYER_JOINED, actor_id="user", event_bus=event_bus)
+    # Committed while the user is not connected, the snapshot brings it to the user
+    await store.commit(room_id, GameEvent.GAME_INIT, target_id="user", event_bus=event_bus)
+    ws = flexmock()
+    ws.should_receive('send_text').and_return(build_future(None))
+    mock_snapshot_builder.should_receive('build_json_from_store').and_return(
+        build_future((SnapshotBase(room_id=room_id).model_dump_json(), 2))
+    )
+    sent = []
+
+    async def send_ws_message_event(_, event):
+        sent.append(event)
+
+    flexmock(RoomStreamerService).should_receive('send_ws_message_event').replace_with(send_ws_message_event)
+
+    async with event_bus.subscribe(room_id, "user") as queue:
+        synced_seq = await RoomStreamerService.send_current_room_state(
+            ws,  # type: ignore[arg-type]
+            room_id,
+            user_id="user",
+            store=store,
+            snapshot_builder=mock_snapshot_builder,
+        )
+        send_task = asyncio.create_task(
+            RoomStreamerService.stream_room_events(
+                ws,  # type: ignore[arg-type]
+                queue,
+                after_seq=synced_seq,
+            )
+        )
+        update = await store.commit(room_id, GameEvent.GAME_STATE_UPDATE, target_id="user", event_bus=event_bus)
+        await asyncio.sleep(0)
+        send_task.cancel()
+
+    assert sent == [update]
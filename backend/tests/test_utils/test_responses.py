@@ -0,0 +1,20 @@
+import json
+
+from backend.domain.events import BaseEvent, RoomEvent
+from backend.infra.snapshots import SnapshotBase
+from backend.schemas.websocket.server import WSMessageEvent
+from backend.utils.responses import dump_json, FastJSONResponse
+
+
+def test_dump_json_should_serialize_a_model_like_the_standard_library():
+    event = BaseEvent(room_id=1, seq=1, type=RoomEvent.MESSAGE_SENT, data={"value": "Héllo"})
+    message = WSMessageEvent(seq=event.seq, event=event)
+
+    assert json.loads(dump_json(message)) == message.model_dump(mode="json")
+
+
+def test_fast_json_response_should_render_models_and_plain_content():
+    snapshot = SnapshotBase(room_id=1)
+
+    assert json.loads(FastJSONResponse(snapshot).body) == snapshot.model_dump(mode="json")
+    assert json.loads(FastJSONResponse({"data": [1, "é"]}).body) == {"data": [1, "é"]}
@@ -3,10 +3,32 @@ from typing import Literal
 
 from dotenv import load_dotenv
 
+EnvKey = Literal[
+    "CORS_ORIGINS",
+    "JWT_SECRET_KEY",
+    "BACKEND_COOKIE_DOMAIN",
+    "DEV",
+    "EVENT_STORE",
+    "EVENT_STORE_PATH",
+    "EVENT_STORE_FSYNC",
+    "EVENT_STORE_FSYNC_INTERVAL_MS",
+    "EVENT_STORE_ARCHIVE_PATH",
+    "ROOM_ARCHIVE_INTERVAL_S",
+    "ROOM_IDLE_TIMEOUT_S",
+    "ROOM_RETENTION_MAX_EVENTS",
+    "ROOM_RETENTION_MAX_BYTES",
+    "ROOM_RETENTION_MAX_AGE_S",
+    "SNAPSHOT_MAX_CHAT_MESSAGES",
+    "SNAPSHOT_CHECKPOINT_INTERVAL",
+    "SNAPSHOT_MAX_CHECKPOINTS",
+    "SUBSCRIBER_QUEUE_SIZE",
+    "SUBSCRIBER_OVERFLOW_POLICY",
+]
 
-def get_env(key: Literal["CORS_ORIGINS", "JWT_SECRET_KEY", "BACKEND_COOKIE_DOMAIN", "DEV"]) -> str:
+
+def get_env(key: EnvKey, default: str | None = None) -> str:
     load_dotenv()
-    value = os.getenv(key)
+    value = os.getenv(key, default)
     if value is None:
         raise ValueError(f"Environment variable {key} is not set.")
     return value
@@ -17,6 +17,7 @@ class ErrorCode(str, enum.Enum):
     ROOM_FULL = "game_room_full"
     GAME_ROOM_DOES_NOT_EXIST = "game_room_does_not_exist"
     MISSING_QUERY_PARAMS = "missing_query_params"
+    SNAPSHOT_UNAVAILABLE = "snapshot_unavailable"
 
     GAME_DOES_NOT_EXIST = "game_does_not_exist"
 
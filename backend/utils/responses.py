@@ -0,0 +1,30 @@
+from typing import Any
+
+import pydantic_core
+from fastapi import WebSocket
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+try:
+    import orjson  # type: ignore[import-not-found]
+except ImportError:  # orjson is optional, pydantic's serializer is used without it
+    orjson = None
+
+
+def dump_json(content: Any) -> bytes:
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    if orjson is not None:
+        return orjson.dumps(content)
+    return pydantic_core.to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by pydantic's serializer, or orjson when it is installed."""
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+async def send_model(ws: WebSocket, message: BaseModel) -> None:
+    await ws.send_text(message.model_dump_json())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Compare concurrent writers of a room holding a lock across their read-decide-append cycle with
+writers appending optimistically with `expected_seq` and retrying on conflict.
+
+Each writer reads the last seq of the room, awaits `--work-us` microseconds to simulate the
+decision (validating a move, reading the session...), then appends.
+
+Usage:
+    uv run python -m scripts.benchmarks.append_contention --rooms 20 --writers 1,4,16,64
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+
+from backend.infra.event_store import EventStore
+from backend.infra.memory_event_store import MemoryEventStore
+
+
+async def locked_writer(store: EventStore, locks: dict[int, asyncio.Lock], room_id: int, appends: int,
+                        work: float) -> int:
+    for _ in range(appends):
+        async with locks[room_id]:
+            await store.last_seq(room_id)
+            await asyncio.sleep(work)
+            await store.append(room_id, "event")
+    return 0
+
+
+async def optimistic_writer(store: EventStore, room_id: int, appends: int, work: float) -> int:
+    conflicts = 0
+    for _ in range(appends):
+        while True:
+            expected_seq = await store.last_seq(room_id)
+            await asyncio.sleep(work)
+            try:
+                await store.append(room_id, "event", expected_seq=expected_seq)
+                break
+            except EventStore.SeqConflict:
+                conflicts += 1
+    return conflicts
+
+
+async def run(name: str, rooms: int, writers: int, appends: int, work: float, optimistic: bool) -> None:
+    store = MemoryEventStore()
+    locks: dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+    tasks = []
+    for room_id in range(rooms):
+        for _ in range(writers):
+            if optimistic:
+                tasks.append(optimistic_writer(store, room_id, appends, work))
+            else:
+                tasks.append(locked_writer(store, locks, room_id, appends, work))
+
+    start = time.perf_counter()
+    conflicts = sum(await asyncio.gather(*tasks))
+    duration = time.perf_counter() - start
+
+    total = rooms * writers * appends
+    assert all([await store.last_seq(room_id) == writers * appends for room_id in range(rooms)])
+    print(
+        f"{name:<12} writers/room: {writers:>3}"
+        f" | {total / duration:>10,.0f} appends/s"
+        f" | conflicts: {conflicts / total:>6.2f} per append"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--writers", type=str, default="1,4,16,64", help="Comma separated writers per room")
+    parser.add_argument("--appends", type=int, default=50, help="Appends done by each writer")
+    parser.add_argument("--work-us", type=int, default=0, help="Time between reading the seq and appending")
+    args = parser.parse_args()
+
+    work = args.work_us / 1_000_000
+    for writers in (int(w) for w in args.writers.split(",")):
+        await run("room lock", args.rooms, writers, args.appends, work, optimistic=False)
+        await run("expected_seq", args.rooms, writers, args.appends, work, optimistic=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Measure EventBus.publish latency across many rooms while clients keep connecting and disconnecting.
+
+A baseline bus reproducing the previous implementation (a global asyncio.Lock taken by publish,
+subscribe and unsubscribe, and a copy of the room subscribers on every publish) is run for comparison.
+
+Usage:
+    uv run python -m scripts.benchmarks.bus_churn --rooms 10000 --publishes 100000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from backend.domain.events import BaseEvent, RoomEvent
+from backend.events.bus import EventBus
+from backend.events.queue import SubscriberQueue
+
+
+class GlobalLockEventBus(EventBus):
+    def __init__(self):
+        super().__init__()
+        self._lock = asyncio.Lock()
+
+    async def publish(self, event: BaseEvent) -> None:
+        async with self._lock:
+            for q in list(self._subscribers.get_by_room_id(event.room_id)):
+                q.put_nowait(event)
+
+    @asynccontextmanager
+    async def subscribe(self, room_id: int, user_id: str) -> AsyncIterator[SubscriberQueue]:
+        q = SubscriberQueue(self._max_queue_size, self._overflow_policy, self.stats, self._latest_wins)
+        async with self._lock:
+            self._subscribers.add(room_id, user_id, q)
+        try:
+            yield q
+        finally:
+            async with self._lock:
+                self._subscribers.remove(room_id, user_id, q)
+
+
+async def hold_subscription(bus: EventBus, room_id: int, user_id: str, stop: asyncio.Event) -> None:
+    async with bus.subscribe(room_id, user_id) as q:
+        await stop.wait()
+        while not q.empty():
+            q.get_nowait()
+
+
+async def churn(bus: EventBus, rooms: int, stop: asyncio.Event) -> int:
+    connections = 0
+    while not stop.is_set():
+        room_id = random.randrange(rooms)
+        async with bus.subscribe(room_id, f"churn-{room_id}-{connections}"):
+            await asyncio.sleep(0)
+        connections += 1
+    return connections
+
+
+async def run(name: str, bus: EventBus, rooms: int, subscribers: int, churners: int, publishes: int) -> None:
+    stop = asyncio.Event()
+    holders = [
+        asyncio.create_task(hold_subscription(bus, room_id, f"user-{room_id}-{i}", stop))
+        for room_id in range(rooms)
+        for i in range(subscribers)
+    ]
+    churn_tasks = [asyncio.create_task(churn(bus, rooms, stop)) for _ in range(churners)]
+    await asyncio.sleep(0)
+
+    latencies = []
+    event = BaseEvent(room_id=0, seq=1, type=RoomEvent.MESSAGE_SENT, data={"sender_id": "0", "value": "Hello"})
+    start = time.perf_counter()
+    for i in range(publishes):
+        room_event = event.model_copy(update={"room_id": i % rooms})
+        before = time.perf_counter()
+        await bus.publish(room_event)
+        latencies.append(time.perf_counter() - before)
+        if i % 100 == 0:
+            # Let the churning clients run between publishes
+            await asyncio.sleep(0)
+    duration = time.perf_counter() - start
+
+    stop.set()
+    connections = sum(await asyncio.gather(*churn_tasks))
+    await asyncio.gather(*holders)
+
+    latencies.sort()
+    print(
+        f"{name:<20} {publishes / duration:>10,.0f} publishes/s"
+        f" | p50: {statistics.median(latencies) * 1_000_000:>6.1f} us"
+        f" | p99: {latencies[int(len(latencies) * 0.99)] * 1_000_000:>6.1f} us"
+        f" | churned connections: {connections:,}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=10_000)
+    parser.add_argument("--subscribers", type=int, default=2, help="Long lived subscribers per room")
+    parser.add_argument("--churners", type=int, default=100, help="Clients connecting and disconnecting in a loop")
+    parser.add_argument("--publishes", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{args.rooms} rooms x {args.subscribers} subscribers, {args.churners} churning clients")
+    await run("global lock", GlobalLockEventBus(), args.rooms, args.subscribers, args.churners, args.publishes)
+    await run("copy-on-write", EventBus(), args.rooms, args.subscribers, args.churners, args.publishes)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
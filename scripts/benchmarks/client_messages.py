@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Measure the client messages a single connection can parse per second, validating each
+frame in one pass with the discriminated union adapter against decoding it to a dict, validating
+`ClientMessageBase` then the concrete message.
+
+Usage:
+    uv run python -m scripts.benchmarks.client_messages --messages 100000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+
+from backend.schemas.websocket.client import ClientMessageBase, ClientMessageChatMessage, ClientMessageGameAction, \
+    ClientMessagePing, ClientMessageType, client_message_adapter
+
+MESSAGES = {
+    "ping": json.dumps({"type": "ping"}),
+    "chat_message": json.dumps({"type": "chat_message", "text": "Hello, World!", "event_key": "V1StGXR8_Z5jdHi6B"}),
+    "action": json.dumps({"type": "action", "data": {"player": 1, "column": 3}, "event_key": "3pGGaX5bq9Tx3o0XU"}),
+}
+
+CONCRETE_MESSAGES: dict[ClientMessageType, type[ClientMessageBase]] = {
+    ClientMessageType.PING: ClientMessagePing,
+    ClientMessageType.CHAT_MESSAGE: ClientMessageChatMessage,
+    ClientMessageType.ACTION: ClientMessageGameAction,
+}
+
+
+def parse_twice(raw_message: str) -> ClientMessageBase:
+    raw_json = json.loads(raw_message)
+    message_base = ClientMessageBase.model_validate(raw_json)
+    return CONCRETE_MESSAGES[message_base.type].model_validate(raw_json)
+
+
+def parse_once(raw_message: str) -> ClientMessageBase:
+    return client_message_adapter.validate_json(raw_message)
+
+
+def run(name: str, parse: Callable[[str], ClientMessageBase], kind: str, messages: int) -> None:
+    raw_message = MESSAGES[kind]
+    start = time.perf_counter()
+    for _ in range(messages):
+        parse(raw_message)
+    duration = time.perf_counter() - start
+    print(f"{name:<16} {kind:<14} | {messages / duration:>10,.0f} messages/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for kind in MESSAGES:
+        run("validated twice", parse_twice, kind, args.messages)
+        run("single pass", parse_once, kind, args.messages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Measure the memory held per event by the MemoryEventStore, compared to keeping the pydantic events.
+
+Usage:
+    uv run python -m scripts.benchmarks.event_memory --events 100000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+
+from backend.domain.events import BaseEvent, RoomEvent
+from backend.infra.memory_event_store import MemoryEventStore
+
+SENDERS = ["V1StGXR8_Z5jdHi6B-myT", "3pGGaX5bq9Tx3o0XUmJrK", "kS8H0xbZJcXhq2QmwVYtD"]
+ROOM_ID = 1
+
+
+def chat_message(index: int) -> tuple[str, dict]:
+    # Ids coming out of a websocket frame are fresh strings, not the literals above
+    sender_id = json.loads(json.dumps(SENDERS[index % len(SENDERS)]))
+    return sender_id, {"sender_id": sender_id, "value": f"Message number {index}"}
+
+
+async def store_pydantic_events(events: int) -> list[BaseEvent]:
+    stored = []
+    for i in range(events):
+        sender_id, data = chat_message(i)
+        stored.append(BaseEvent(seq=i + 1, room_id=ROOM_ID, type=RoomEvent.MESSAGE_SENT, actor_id=sender_id, data=data))
+    return stored
+
+
+async def store_compact_events(events: int) -> MemoryEventStore:
+    store = MemoryEventStore()
+    for i in range(events):
+        sender_id, data = chat_message(i)
+        await store.append(ROOM_ID, RoomEvent.MESSAGE_SENT, data=data, actor_id=sender_id)
+    return store
+
+
+async def measure(build: Callable[[int], Awaitable[object]], events: int) -> tuple[float, float]:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = await build(events)
+    duration = time.perf_counter() - start
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size / events, duration
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{args.events} chat messages in a single room")
+    for name, build in (("pydantic BaseEvent", store_pydantic_events), ("StoredEvent", store_compact_events)):
+        per_event, duration = await measure(build, args.events)
+        print(f"{name:<20} {per_event:>8.0f} bytes/event | append: {args.events / duration:>10,.0f} events/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Compare append throughput and replay latency of the event stores.
+
+Usage:
+    uv run python -m scripts.benchmarks.event_stores --rooms 50 --events 2000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from backend.infra.event_store import EventStore
+from backend.infra.file_event_store import FileEventStore, FsyncPolicy
+from backend.infra.memory_event_store import MemoryEventStore
+from backend.infra.sqlite_event_store import SqliteEventStore
+
+CHAT_MESSAGE = {"sender_id": "V1StGXR8_Z5jdHi6B-myT", "value": "Good game, well played!"}
+
+
+async def bench_append(store: EventStore, rooms: int, events: int) -> float:
+    async def write_room(room_id: int) -> None:
+        for _ in range(events):
+            await store.append(room_id, "message.sent", data=CHAT_MESSAGE, actor_id=CHAT_MESSAGE["sender_id"])
+
+    start = time.perf_counter()
+    await asyncio.gather(*[write_room(room_id) for room_id in range(rooms)])
+    return time.perf_counter() - start
+
+
+async def bench_replay(store: EventStore, rooms: int) -> float:
+    start = time.perf_counter()
+    for room_id in range(rooms):
+        async for _ in store.iter_from(room_id, page_size=1000):
+            pass
+    return (time.perf_counter() - start) / rooms
+
+
+async def bench_tail_read(store: EventStore, rooms: int, events: int, iterations: int = 1000) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        await store.read_from(i % rooms, after_seq=events - 10)
+    return (time.perf_counter() - start) / iterations
+
+
+async def run(name: str, factory: Callable[[], EventStore], rooms: int, events: int) -> None:
+    store = factory()
+    append_duration = await bench_append(store, rooms, events)
+    if isinstance(store, (FileEventStore, SqliteEventStore)):
+        await store.close()
+        # Replay from a cold store so nothing is served from what the append phase left in memory
+        store = factory()
+    replay = await bench_replay(store, rooms)
+    tail_read = await bench_tail_read(store, rooms, events)
+    if isinstance(store, (FileEventStore, SqliteEventStore)):
+        await store.close()
+
+    total = rooms * events
+    print(
+        f"{name:<22} append: {total / append_duration:>10,.0f} events/s"
+        f" | full replay: {replay * 1000:>8.2f} ms/room"
+        f" | last 10 events: {tail_read * 1_000_000:>8.1f} us"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--events", type=int, default=2000, help="Events appended to each room")
+    args = parser.parse_args()
+
+    print(f"{args.rooms} rooms x {args.events} events")
+    await run("memory", MemoryEventStore, args.rooms, args.events)
+    for policy in (FsyncPolicy.NEVER, FsyncPolicy.INTERVAL, FsyncPolicy.ALWAYS):
+        with tempfile.TemporaryDirectory() as directory:
+            await run(
+                f"file (fsync={policy.value})",
+                lambda: FileEventStore(Path(directory), fsync_policy=policy),
+                args.rooms,
+                # One fsync per event is orders of magnitude slower, keep the run short
+                args.events if policy != FsyncPolicy.ALWAYS else max(args.events // 20, 20),
+            )
+    with tempfile.TemporaryDirectory() as directory:
+        # Rooms append concurrently, so every commit carries one event per room
+        await run(
+            "sqlite (group commit)",
+            lambda: SqliteEventStore(Path(directory) / "events.db"),
+            args.rooms,
+            max(args.events // 20, 20),
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
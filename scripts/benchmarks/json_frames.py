@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Measure the serialization of snapshot and event frames, dumping the models to dicts encoded by the
+standard library (what `send_json` and `JSONResponse` do) against serializing them straight to JSON.
+
+Usage:
+    uv run python -m scripts.benchmarks.json_frames --iterations 20000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+
+from pydantic import BaseModel
+
+from backend.domain.events import BaseEvent, GameEvent
+from backend.infra.snapshots import SnapshotBase, SnapshotChatMessage, SnapshotPlayer, PlayerStatus
+from backend.models.game_player_model import UserRole
+from backend.schemas.websocket.server import WSMessageEvent, WSMessageSnapshot
+from backend.utils.responses import dump_json, orjson
+
+BOARD = {
+    "grid": [[0] * 7 for _ in range(6)],
+    "status": "ongoing",
+    "can_start": True,
+    "current_player": 1,
+    "winning_positions": None,
+}
+
+
+def event_frame() -> BaseModel:
+    event = BaseEvent(room_id=1, seq=42, type=GameEvent.GAME_STATE_UPDATE, actor_id="player", data=BOARD)
+    return WSMessageEvent(seq=event.seq, event=event)
+
+
+def snapshot_frame() -> BaseModel:
+    snapshot = SnapshotBase(
+        room_id=1,
+        players=[
+            SnapshotPlayer(id=f"player{i}", role=UserRole.player, user_name=f"Player {i}", status=PlayerStatus.CONNECTED)
+            for i in range(10)
+        ],
+        chat_messages=[SnapshotChatMessage(sender_id=f"player{i % 10}", value=f"Message {i}") for i in range(100)],
+        game_state=BOARD,
+    )
+    return WSMessageSnapshot(last_seq=42, data=snapshot)
+
+
+def stdlib(message: BaseModel) -> str:
+    return json.dumps(message.model_dump(mode="json"), separators=(",", ":"), ensure_ascii=False)
+
+
+def model_dump_json(message: BaseModel) -> str:
+    return message.model_dump_json()
+
+
+def run(name: str, serialize: Callable[[BaseModel], object], frame: str, message: BaseModel, iterations: int) -> None:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        serialize(message)
+    duration = time.perf_counter() - start
+    print(f"{name:<18} {frame:<9} | {duration / iterations * 1_000_000:>8.1f} us/frame")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    serializers: list[tuple[str, Callable[[BaseModel], object]]] = [
+        ("dict + json", stdlib),
+        ("model_dump_json", model_dump_json),
+    ]
+    if orjson is not None:
+        serializers.append(("dict + orjson", lambda message: orjson.dumps(message.model_dump(mode="json"))))
+    serializers.append(("dump_json", dump_json))
+
+    for frame, message in (("event", event_frame()), ("snapshot", snapshot_frame())):
+        for name, serialize in serializers:
+            run(name, serialize, frame, message, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
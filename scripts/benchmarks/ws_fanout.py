@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Measure the CPU spent fanning room events out to WebSocket subscribers, encoding the frame of every
+event once for the room against encoding it again for each subscriber.
+
+Sockets are replaced by no-op writers, so only the serialization cost is measured.
+
+Usage:
+    uv run python -m scripts.benchmarks.ws_fanout --spectators 1,10,100,500 --events 500
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+from backend.domain.events import BaseEvent, GameEvent
+from backend.schemas.websocket.server import WSMessageEvent, WSMessageType
+from backend.services.room_streamer import RoomStreamerService
+
+BOARD = {
+    "grid": [[0] * 7 for _ in range(6)],
+    "status": "ongoing",
+    "can_start": True,
+    "current_player": 1,
+    "winning_positions": None,
+}
+
+
+class NullWebSocket:
+    async def send_text(self, data: str) -> None:
+        pass
+
+    async def send_json(self, data: dict) -> None:
+        # What starlette does before writing the frame
+        json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+async def send_per_subscriber(ws: NullWebSocket, event: BaseEvent) -> None:
+    await ws.send_json(
+        WSMessageEvent(
+            type=WSMessageType.EVENT,
+            seq=event.seq,
+            event=event
+        ).model_dump(mode="json")
+    )
+
+
+async def run(name: str, send, spectators: int, events: int) -> float:
+    sockets = [NullWebSocket() for _ in range(spectators)]
+    room_events = [
+        BaseEvent(room_id=1, seq=seq, type=GameEvent.GAME_STATE_UPDATE, actor_id="player", data=BOARD)
+        for seq in range(1, events + 1)
+    ]
+    start = time.perf_counter()
+    for event in room_events:
+        for ws in sockets:
+            await send(ws, event)
+    duration = time.perf_counter() - start
+    print(
+        f"{name:<16} spectators: {spectators:>4}"
+        f" | {duration / events * 1_000_000:>9.1f} us/event"
+        f" | {events * spectators / duration:>10,.0f} frames/s"
+    )
+    return duration
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spectators", type=str, default="1,10,100,500", help="Comma separated subscribers per room")
+    parser.add_argument("--events", type=int, default=500)
+    args = parser.parse_args()
+
+    for spectators in (int(s) for s in args.spectators.split(",")):
+        await run("per subscriber", send_per_subscriber, spectators, args.events)
+        await run("encoded once", RoomStreamerService.send_ws_message_event, spectators, args.events)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())